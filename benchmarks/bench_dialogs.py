@@ -0,0 +1,185 @@
+"""
+Benchmarks for running many dialogs at once, against the offline transport of
+:mod:`benchmarks.fake_discord`.
+
+For each dialog type and number of concurrent dialogs this reports:
+
+- REST calls to start a dialog and per user interaction
+- latency from a user's reaction until the dialog handled it, i.e. the page has
+  been edited or the result has been returned
+- CPU time spent per reaction event
+- memory per live dialog, while all dialogs wait for reactions
+
+Run from the repository root::
+
+    python -m benchmarks.bench_dialogs [--max 10000] [--latency 0.05] [--router]
+"""
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from collections import namedtuple
+from discord import Embed
+from disputils import Confirmation, EmbedPaginator, MultipleChoice, ReactionRouter
+from .fake_discord import FakeClient, FakeUser
+
+
+COUNTS = (1, 10, 100, 1000, 10000)
+
+Result = namedtuple(
+    "Result",
+    (
+        "dialogs",
+        "calls_to_start",
+        "calls_per_interaction",
+        "latency_ms",
+        "cpu_us_per_event",
+        "bytes_per_dialog",
+    ),
+)
+
+Scenario = namedtuple("Scenario", ("name", "start", "emoji", "ends"))
+
+PAGES = [Embed(title=f"page {i}", description="Some content. " * 20) for i in range(5)]
+OPTIONS = [f"option {i}" for i in range(5)]
+
+
+def _paginator(client, channel, user):
+    return EmbedPaginator(client, PAGES).run([user], channel, timeout=3600)
+
+
+def _multiple_choice(client, channel, user):
+    return MultipleChoice(client, OPTIONS, "Choose").run([user], channel, timeout=3600)
+
+
+def _confirmation(client, channel, user):
+    return Confirmation(client).confirm("Sure?", user, channel, timeout=3600)
+
+
+SCENARIOS = (
+    Scenario("EmbedPaginator", _paginator, "▶", ends=False),
+    Scenario("MultipleChoice", _multiple_choice, "2⃣", ends=True),
+    Scenario("Confirmation", _confirmation, "✅", ends=True),
+)
+
+
+async def settle(client: FakeClient):
+    """ Wait until the dialogs stopped making REST calls. """
+
+    transport = client.transport
+    total = -1
+    while total != transport.total:
+        total = transport.total
+        if transport.latency:
+            await asyncio.sleep(transport.latency * 1.5)
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+
+async def run_scenario(
+    scenario: Scenario, count: int, latency: float = 0.0, router: bool = False
+) -> Result:
+    client = FakeClient(latency)
+    installed = ReactionRouter(client) if router else None
+    if installed is not None:
+        installed.install()
+    transport = client.transport
+
+    gc.collect()
+    tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+
+    users, tasks = [], []
+    for _ in range(count):
+        user = FakeUser()
+        users.append(user)
+        channel = client.channel()
+        tasks.append(asyncio.ensure_future(scenario.start(client, channel, user)))
+
+    await settle(client)
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0] - memory_before
+    tracemalloc.stop()
+    calls_to_start = transport.total
+
+    messages = [
+        m for c in client._channels.values() for m in c.messages.values()
+    ]  # one per dialog, in the order they were started
+    loop = asyncio.get_event_loop()
+    done_at = {}
+    for task, message in zip(tasks, messages):
+        task.add_done_callback(lambda _, m=message: done_at.setdefault(m, loop.time()))
+    edits_before = {m: len(m.edited_at) for m in messages}
+
+    transport.reset()
+    cpu = time.process_time()
+    clicked_at = {}
+    for user, message in zip(users, messages):
+        clicked_at[message] = loop.time()
+        message.click(user, scenario.emoji)
+
+    if scenario.ends:
+        await asyncio.wait(tasks)
+    await settle(client)
+    cpu = time.process_time() - cpu
+
+    latencies = []
+    for message, clicked in clicked_at.items():
+        if scenario.ends:
+            handled = done_at.get(message)
+        else:
+            edits = message.edited_at[edits_before[message] :]
+            handled = edits[0] if edits else None
+        if handled is not None:
+            latencies.append(handled - clicked)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if installed is not None:
+        installed.uninstall()
+        await asyncio.sleep(0)  # lets the router stop listening
+
+    return Result(
+        count,
+        calls_to_start / count,
+        transport.total / count,
+        sum(latencies) / len(latencies) * 1e3 if latencies else float("nan"),
+        cpu / count * 1e6,
+        memory / count,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--max", type=int, default=COUNTS[-1], help="max. dialogs")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per call")
+    parser.add_argument("--router", action="store_true", help="use ReactionRouter")
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+
+    for scenario in SCENARIOS:
+        print(f"\n{scenario.name}")
+        print(
+            f"{'dialogs':>8} {'calls/start':>12} {'calls/click':>12} "
+            f"{'latency (ms)':>13} {'cpu/event (µs)':>15} {'bytes/dialog':>13}"
+        )
+        for count in COUNTS:
+            if count > args.max:
+                break
+
+            result = loop.run_until_complete(
+                run_scenario(scenario, count, args.latency, args.router)
+            )
+            print(
+                f"{result.dialogs:>8} {result.calls_to_start:>12.1f} "
+                f"{result.calls_per_interaction:>12.1f} {result.latency_ms:>13.2f} "
+                f"{result.cpu_us_per_event:>15.1f} {result.bytes_per_dialog:>13.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Microbenchmark for :meth:`disputils.EmbedPaginator.formatted_page`.
+
+Turning a page should cost the same no matter how many pages the paginator has.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_formatting
+"""
+
+import timeit
+from discord import Embed
+from disputils import EmbedPaginator
+
+
+PAGE_COUNTS = (10, 100, 1000, 5000)
+REPEAT = 200
+
+
+def make_pages(count: int):
+    return [
+        Embed(title=f"page {i}", description="Some content. " * 20).add_field(
+            name="field", value=str(i)
+        )
+        for i in range(count)
+    ]
+
+
+def bench_page_turn(count: int):
+    pages = make_pages(count)
+    paginator = EmbedPaginator(None, pages)
+    middle = count // 2
+
+    def cold():  # first time a page is shown
+        paginator.pages = pages
+        paginator.formatted_page(middle)
+
+    def warm():  # page has been shown before
+        paginator.formatted_page(middle)
+
+    cold_time = min(timeit.repeat(cold, number=REPEAT, repeat=5)) / REPEAT
+    warm_time = min(timeit.repeat(warm, number=REPEAT, repeat=5)) / REPEAT
+
+    return cold_time, warm_time
+
+
+def main():
+    print(f"{'pages':>8} {'cold (µs)':>12} {'cached (µs)':>12}")
+    for count in PAGE_COUNTS:
+        cold_time, warm_time = bench_page_turn(count)
+        print(f"{count:>8} {cold_time * 1e6:>12.2f} {warm_time * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Memory used by idle paginators.
+
+Each paginator is given its own, equal pages and has built its first page, like a
+dialog waiting for a reaction. Compares keeping the pages as embeds with the compact
+mode, which stores them serialized and only builds the displayed page, and with
+sharing one copy of the pages between all paginators.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_memory
+"""
+
+import asyncio
+import gc
+import tracemalloc
+from discord import Embed
+from disputils import EmbedPaginator
+
+
+DIALOGS = 1000
+PAGES = 10
+
+MODES = (
+    ("list", {}),
+    ("compact", {"compact": True}),
+    ("compact+zlib", {"compact": True, "compress": True}),
+    ("shared", {"shared": True}),
+)
+
+
+def make_pages(count: int):
+    pages = []
+    for i in range(count):
+        page = Embed(title=f"Leaderboard {i + 1}", description="Top players")
+        for rank in range(10):
+            page.add_field(name=f"#{i * 10 + rank + 1}", value=f"player {rank}: 1234")
+        pages.append(page)
+
+    return pages
+
+
+async def bytes_per_dialog(kwargs: dict) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    paginators = []
+    for _ in range(DIALOGS):
+        paginator = EmbedPaginator(None, make_pages(PAGES), **kwargs)
+        await paginator.get_page(0)
+        paginators.append(paginator)
+
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return (after - before) / DIALOGS
+
+
+def main():
+    loop = asyncio.get_event_loop()
+
+    print(f"{DIALOGS} idle paginators with {PAGES} pages each\n")
+    print(f"{'mode':>14} {'bytes/dialog':>14}")
+    for name, kwargs in MODES:
+        size = loop.run_until_complete(bytes_per_dialog(kwargs))
+        print(f"{name:>14} {size:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Edits needed to reach a page of a long paginator.
+
+Compares stepping with ▶, the ±10 skip controls, and replying with the page number
+or with text on the page. Every edit is a REST call, so this is also roughly the
+number of round trips until the user sees the page.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_navigation [--pages 400] [--target 200]
+"""
+
+import argparse
+import asyncio
+from discord import Embed
+from disputils import ControlEmojis, EmbedPaginator
+from .bench_dialogs import settle
+from .fake_discord import FakeClient, FakeUser
+
+
+def make_pages(count: int):
+    return [
+        Embed(title=f"Entry {i + 1}", description=f"keyword{i + 1}")
+        for i in range(count)
+    ]
+
+
+async def navigate(method: str, pages: int, target: int) -> int:
+    client = FakeClient()
+    channel = client.channel()
+    user = FakeUser()
+    paginator = EmbedPaginator(
+        client,
+        make_pages(pages),
+        control_emojis=ControlEmojis(skip_back="⏪", skip_forward="⏩"),
+        jump=True,
+        search=True,
+    )
+    task = asyncio.ensure_future(paginator.run([user], channel, timeout=3600))
+    await settle(client)
+    message = next(iter(channel.messages.values()))
+    edits = len(message.edited_at)
+
+    if method == "step":
+        for _ in range(target - 1):
+            message.click(user, "▶")
+            await settle(client)
+    elif method == "skip":
+        for _ in range((target - 1) // 10):
+            message.click(user, "⏩")
+            await settle(client)
+        for _ in range((target - 1) % 10):
+            message.click(user, "▶")
+            await settle(client)
+    elif method == "jump":
+        channel.say(user, str(target), reply_to=message)
+        await settle(client)
+    else:
+        channel.say(user, f"keyword{target}", reply_to=message)
+        await settle(client)
+
+    assert message.embeds[0].title == f"Entry {target}", message.embeds[0].title
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    return len(message.edited_at) - edits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--target", type=int, default=200, help="page number")
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+
+    print(f"Reaching page {args.target} of {args.pages}\n")
+    print(f"{'method':>8} {'edits':>7}")
+    for method in ("step", "skip", "jump", "search"):
+        edits = loop.run_until_complete(navigate(method, args.pages, args.target))
+        print(f"{method:>8} {edits:>7}")
+
+
+if __name__ == "__main__":
+    main()
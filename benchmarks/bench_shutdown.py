@@ -0,0 +1,78 @@
+"""
+Closing all open dialogs with :meth:`disputils.DialogManager.close_all`.
+
+Reports the time to close all paginators and what is left behind afterwards: tasks
+that are still pending and ``wait_for`` listeners that haven't been released.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_shutdown [--latency 0.01] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+from discord import Embed
+from disputils import DialogManager, EmbedPaginator
+from .fake_discord import FakeClient, FakeUser
+
+
+COUNTS = (1, 10, 100, 1000)
+
+PAGES = [Embed(title=f"page {i}") for i in range(5)]
+
+
+async def bench_close_all(count: int, latency: float, concurrency: int):
+    client = FakeClient(latency)
+    manager = DialogManager(client)
+    manager.install()
+
+    user = FakeUser()
+    tasks = [
+        asyncio.ensure_future(
+            EmbedPaginator(client, PAGES).run([user], client.channel(), timeout=3600)
+        )
+        for _ in range(count)
+    ]
+    while len(manager) < count or client.transport.calls["add_reaction"] < count * 5:
+        await asyncio.sleep(latency or 0.001)
+
+    loop = asyncio.get_event_loop()
+    started_at = loop.time()
+    forced = await manager.close_all("closed", concurrency=concurrency)
+    duration = loop.time() - started_at
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    pending = len([t for t in asyncio.all_tasks() if not t.done()]) - 1  # this one
+    listeners = sum(
+        not future.cancelled()
+        for listeners in client._listeners.values()
+        for future, _ in listeners
+    )
+
+    return duration, forced, pending, listeners
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds per call")
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+
+    print(
+        f"{'dialogs':>8} {'total (s)':>10} {'per dialog (ms)':>16} {'forced':>7} "
+        f"{'pending tasks':>14} {'listeners':>10}"
+    )
+    for count in COUNTS:
+        duration, forced, pending, listeners = loop.run_until_complete(
+            bench_close_all(count, args.latency, args.concurrency)
+        )
+        print(
+            f"{count:>8} {duration:>10.2f} {duration / count * 1e3:>16.2f} "
+            f"{forced:>7} {pending:>14} {listeners:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
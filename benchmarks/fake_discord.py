@@ -0,0 +1,405 @@
+"""
+Offline stand-ins for the parts of discord.py used by disputils.
+
+REST calls are counted by a :class:`Transport` and take a configurable simulated
+latency instead of going to Discord. Users are simulated by :meth:`FakeMessage.click`
+and :meth:`FakeChannel.say`, which dispatch the same events as the gateway would.
+
+Like with discord.py, the message objects returned by REST calls are snapshots. Only
+the copy of a message cached by the client is updated by gateway events, and
+partial messages have no state at all.
+
+.. code-block:: py
+
+    client = FakeClient(latency=0.05)
+    channel = client.channel()
+    message = await channel.send("hi")
+    message.click(FakeUser(), "👍")  # dispatches raw_reaction_add
+"""
+
+import asyncio
+import itertools
+from collections import Counter
+import discord
+
+
+_ids = itertools.count(1000)
+
+
+class Transport:
+    """
+    Counts REST calls and delays them by ``latency`` seconds.
+
+    :param latency: Simulated round trip time of every call.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.log = []
+
+    async def request(self, name: str):
+        """ Simulate a REST call. """
+
+        self.calls[name] += 1
+        self.log.append((name, asyncio.get_event_loop().time()))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0)
+
+    @property
+    def total(self) -> int:
+        """ Number of calls made so far. """
+
+        return sum(self.calls.values())
+
+    def reset(self):
+        self.calls.clear()
+        self.log.clear()
+
+
+class _Response:
+    """ The parts of an HTTP response read by :class:`discord.HTTPException`. """
+
+    def __init__(self, status: int, reason: str):
+        self.status = status
+        self.reason = reason
+
+
+class FakeUser:
+    """ A user or member interacting with dialogs. """
+
+    def __init__(self, name="user", user_id=None, bot=False):
+        self.id = user_id or next(_ids)
+        self.name = name
+        self.bot = bot
+        self.avatar_url = ""
+
+    def __str__(self):
+        return self.name
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeReaction:
+    """
+    The reactions with one emoji on a message, as seen by the client: ``me`` tells
+    whether the client user is one of them.
+    """
+
+    def __init__(self, emoji: str, count: int = 0, me: bool = False):
+        self.emoji = emoji
+        self.count = count
+        self.me = me
+
+
+class StoredMessage:
+    """
+    A message as Discord stores it. Its reactions are always up to date, unlike
+    the ones of the :class:`FakeMessage` objects the client works with.
+    ``edited_at`` holds the loop time at which each edit completed.
+    """
+
+    def __init__(self, channel, content=None, embed=None):
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = content
+        self.embeds = [embed] if embed is not None else []
+        self.users = {}  # IDs of the users who reacted, by emoji
+        self.deleted = False
+        self.edited_at = []
+
+    @property
+    def client(self):
+        return self.channel.client
+
+    @property
+    def state(self):
+        return self.client._connection
+
+    def message(self):
+        """ Build a message object like the REST API returns it. """
+
+        message = FakeMessage(self.channel, self.id, self.content)
+        message.embeds = list(self.embeds)
+        message.reactions = [
+            FakeReaction(emoji, len(users), self.client.user.id in users)
+            for emoji, users in self.users.items()
+            if users
+        ]
+        return message
+
+    def _cached(self):
+        """ The copy cached by the client, which gateway events update. """
+
+        return self.state._get_message(self.id)
+
+    def _event(self, emoji: str, user, event_type: str):
+        data = {
+            "message_id": self.id,
+            "channel_id": self.channel.id,
+            "user_id": user.id,
+        }
+        if self.channel.guild_id is not None:
+            data["guild_id"] = self.channel.guild_id
+
+        event = discord.RawReactionActionEvent(
+            data, discord.PartialEmoji(name=emoji), event_type
+        )
+        if event_type == "REACTION_ADD":
+            event.member = user
+        return event
+
+    def edit(self, content, embeds):
+        self.content = content
+        self.embeds = embeds
+        self.edited_at.append(asyncio.get_event_loop().time())
+
+        cached = self._cached()
+        if cached is not None:
+            cached.content, cached.embeds = content, list(embeds)
+
+    def delete(self):
+        self.deleted = True
+
+        cached = self._cached()
+        if cached is not None:
+            self.state._messages.remove(cached)
+
+    def add(self, emoji: str, user):
+        users = self.users.setdefault(emoji, set())
+        if user.id in users:
+            return
+        users.add(user.id)
+
+        cached = self._cached()
+        if cached is not None:
+            cached._add_reaction(emoji, user.id == self.client.user.id)
+        self.client.dispatch(
+            "raw_reaction_add", self._event(emoji, user, "REACTION_ADD")
+        )
+
+    def remove(self, emoji: str, user):
+        users = self.users.get(emoji)
+        if users is None or user.id not in users:
+            return
+        users.discard(user.id)
+
+        cached = self._cached()
+        if cached is not None:
+            cached._remove_reaction(emoji, user.id == self.client.user.id)
+        self.client.dispatch(
+            "raw_reaction_remove", self._event(emoji, user, "REACTION_REMOVE")
+        )
+
+    def clear(self):
+        self.users.clear()
+
+        cached = self._cached()
+        if cached is not None:
+            cached.reactions = []
+
+    def click(self, user, emoji: str):
+        """ Simulate a user adding a reaction. """
+
+        self.add(emoji, user)
+
+    def unclick(self, user, emoji: str):
+        """ Simulate a user removing a reaction. """
+
+        self.remove(emoji, user)
+
+
+class FakePartialMessage:
+    """
+    A message known only by its ID, like :class:`discord.PartialMessage`. Its
+    methods make the same REST calls as the ones of a :class:`FakeMessage`, but it
+    has no content or reactions.
+    """
+
+    def __init__(self, channel, message_id: int):
+        self.id = message_id
+        self.channel = channel
+
+    @property
+    def client(self):
+        return self.channel.client
+
+    @property
+    def transport(self):
+        return self.channel.transport
+
+    @property
+    def stored(self) -> StoredMessage:
+        """ The message as Discord stores it. """
+
+        stored = self.channel.messages.get(self.id)
+        if stored is None or stored.deleted:
+            raise discord.NotFound(_Response(404, "Not Found"), "Unknown Message")
+        return stored
+
+    @property
+    def edited_at(self):
+        return self.stored.edited_at
+
+    async def fetch(self):
+        await self.transport.request("fetch_message")
+        return self.stored.message()
+
+    async def edit(self, **fields):
+        await self.transport.request("edit")
+        stored = self.stored
+        content = fields.get("content", stored.content)
+        embeds = stored.embeds
+        if "embed" in fields:
+            embeds = [fields["embed"]] if fields["embed"] is not None else []
+        stored.edit(content, embeds)
+        return stored.message()
+
+    async def delete(self):
+        await self.transport.request("delete")
+        self.stored.delete()
+
+    async def add_reaction(self, emoji):
+        await self.transport.request("add_reaction")
+        self.stored.add(str(emoji), self.client.user)
+
+    async def remove_reaction(self, emoji, member):
+        await self.transport.request("remove_reaction")
+        self.stored.remove(str(emoji), member)
+
+    async def clear_reactions(self):
+        await self.transport.request("clear_reactions")
+        self.stored.clear()
+
+    def click(self, user, emoji: str):
+        """ Simulate a user adding a reaction. """
+
+        self.stored.click(user, emoji)
+
+    def unclick(self, user, emoji: str):
+        """ Simulate a user removing a reaction. """
+
+        self.stored.unclick(user, emoji)
+
+
+class FakeMessage(FakePartialMessage):
+    """
+    A message of a :class:`FakeChannel`, like :class:`discord.Message`.
+
+    As with discord.py, ``reactions`` is a snapshot taken when the message was
+    received. Only the copy cached by the client is updated by reaction events,
+    see :meth:`FakeClient.cached_message`. Editing the message updates its content
+    in place.
+    """
+
+    def __init__(self, channel, message_id: int = None, content=None):
+        super().__init__(channel, message_id or next(_ids))
+        self.content = content
+        self.embeds = []
+        self.reactions = []
+        self.reference = None
+
+    async def edit(self, **fields):
+        edited = await super().edit(**fields)
+        self.content, self.embeds = edited.content, edited.embeds
+
+    def _add_reaction(self, emoji: str, me: bool):
+        reaction = next((r for r in self.reactions if r.emoji == emoji), None)
+        if reaction is None:
+            reaction = FakeReaction(emoji)
+            self.reactions.append(reaction)
+        reaction.count += 1
+        reaction.me = reaction.me or me
+
+    def _remove_reaction(self, emoji: str, me: bool):
+        reaction = next((r for r in self.reactions if r.emoji == emoji), None)
+        if reaction is None:
+            return
+        reaction.count -= 1
+        if me:
+            reaction.me = False
+        if reaction.count <= 0:
+            self.reactions.remove(reaction)
+
+
+class FakeGuild:
+    """ A guild, only providing an ID. """
+
+    def __init__(self):
+        self.id = next(_ids)
+
+
+class FakeChannel:
+    """ A text channel of a :class:`FakeClient`. """
+
+    def __init__(self, client, guild: FakeGuild = None):
+        self.id = next(_ids)
+        self.client = client
+        self.guild = guild
+        self.guild_id = guild.id if guild is not None else None
+        self.messages = {}
+
+    @property
+    def transport(self):
+        return self.client.transport
+
+    async def send(self, content=None, *, embed=None):
+        await self.transport.request("send")
+        stored = StoredMessage(self, content, embed)
+        self.messages[stored.id] = stored
+
+        # the gateway echoes the message, which the client caches
+        self.client._connection._messages.append(stored.message())
+        return stored.message()
+
+    def get_partial_message(self, message_id):
+        return FakePartialMessage(self, message_id)
+
+    async def fetch_message(self, message_id):
+        return await FakePartialMessage(self, message_id).fetch()
+
+    def say(self, author, content, reply_to=None):
+        """
+        Simulate a user sending a message to the channel, optionally as a reply to
+        ``reply_to``.
+        """
+
+        message = FakeMessage(self, content=content)
+        message.author = author
+        if reply_to is not None:
+            message.reference = discord.MessageReference(
+                message_id=reply_to.id, channel_id=self.id
+            )
+        self.client.dispatch("message", message)
+        return message
+
+
+class FakeClient(discord.Client):
+    """ A :class:`discord.Client` that never connects. """
+
+    def __init__(self, latency: float = 0.0, **options):
+        super().__init__(**options)
+        self.transport = Transport(latency)
+        self._connection.user = FakeUser("bot", bot=True)
+        self._channels = {}
+
+    def channel(self, guild: bool = True) -> FakeChannel:
+        """ Create a channel, in a new guild unless ``guild`` is ``False``. """
+
+        channel = FakeChannel(self, FakeGuild() if guild else None)
+        self._channels[channel.id] = channel
+        return channel
+
+    def get_channel(self, channel_id):
+        return self._channels.get(channel_id)
+
+    def cached_message(self, message_id):
+        """ The copy of a message cached by the client, if there is one. """
+
+        return self._connection._get_message(message_id)
@@ -0,0 +1,31 @@
+# makes pytest put the repository root on sys.path, so tests can import disputils
+# and the benchmarks without installing them
+import asyncio
+import pytest
+
+
+try:
+    _all_tasks = asyncio.all_tasks
+except AttributeError:  # Python 3.6
+    _all_tasks = asyncio.Task.all_tasks
+
+
+@pytest.fixture
+def run():
+    """
+    Run coroutines on a fresh event loop. Tasks left running, e.g. by installed
+    helpers, are cancelled before the loop is closed after the test.
+    """
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        yield loop.run_until_complete
+    finally:
+        tasks = _all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+        asyncio.set_event_loop(None)
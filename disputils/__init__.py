@@ -1,4 +1,41 @@
 from .pagination import EmbedPaginator, BotEmbedPaginator, ControlEmojis
-from .confirmation import Confirmation, BotConfirmation
-from .multiple_choice import MultipleChoice, BotMultipleChoice
+from .confirmation import (
+    Confirmation,
+    BotConfirmation,
+    QuorumConfirmation,
+    BotQuorumConfirmation,
+)
+from .multiple_choice import (
+    MultipleChoice,
+    BotMultipleChoice,
+    PaginatedMultipleChoice,
+    BotPaginatedMultipleChoice,
+)
+from .sources import (
+    PageSource,
+    ListPageSource,
+    CallablePageSource,
+    CompactPageSource,
+    IterPageSource,
+    TextPageSource,
+    TablePageSource,
+    OptionSource,
+    ListOptionSource,
+)
+from .packing import Field, Column, chunked, pack_fields, format_table, table_fields
+from .search import PageIndex
+from .shared import SharedPages
+from .router import ReactionRouter
+from .manager import DialogManager
+from .cleanup import CleanupQueue
+from .ratelimit import RateLimitBudget
+from .metrics import DialogEvent, DialogObserver, MetricsAggregator
+from .state import (
+    DialogState,
+    Lease,
+    StateStore,
+    LeasingStateStore,
+    MemoryStateStore,
+    SQLiteStateStore,
+)
 from . import abc
@@ -1,15 +1,220 @@
+import asyncio
+import json
+import time
 from abc import ABC
-from discord import Message, Embed, TextChannel, errors
-from typing import Optional
+from discord import Message, Embed, RawReactionActionEvent, TextChannel, errors
+from typing import Awaitable, Iterable, Optional, Set, Tuple, Union
+from .cleanup import CleanupQueue
+from .manager import DialogManager
+from .metrics import (
+    DialogEvent,
+    DialogObserver,
+    EDIT,
+    INTERACTIVE,
+    PUBLISH,
+    QUIT,
+    REACTION,
+    REPLY,
+    REQUEST,
+    RESULT,
+    SEED,
+    SHED,
+    TIMEOUT,
+)
+from .ratelimit import (
+    COALESCE,
+    PAUSE_SEEDING,
+    REMOVE_REACTION,
+    RateLimitBudget,
+    route_of,
+)
+from .router import ReactionListener
+
+
+try:
+    _current_task = asyncio.current_task
+except AttributeError:  # Python 3.6
+    _current_task = asyncio.Task.current_task
 
 
 class Dialog(ABC):
-    """ Abstract base class defining a general embed dialog interaction. """
+    """
+    Abstract base class defining a general embed dialog interaction.
+
+    Control reactions are added in the background while the dialog already listens
+    for user interaction. By default they are added one after another, so they
+    appear in order. Set ``seed_concurrency`` to a higher value to add up to that
+    many reactions at once, in which case their order is not guaranteed.
+
+    Set ``observer`` to a :class:`~disputils.metrics.DialogObserver` to receive the
+    events of the dialog, otherwise the observer installed for the client is used.
+
+    A dialog can be used as an async context manager, which makes sure it is
+    cleaned up with :meth:`cancel` when the block is left, e.g. because the task
+    running it was cancelled.
+
+    .. code-block:: py
+
+        async with EmbedPaginator(client, pages) as paginator:
+            await paginator.run(channel=channel)
+    """
+
+    __slots__ = (
+        "_client",
+        "_embed",
+        "message",
+        "color",
+        "seed_concurrency",
+        "_seeding",
+        "_started_at",
+        "_time_to_interactive",
+        "_editing",
+        "_pending_edit",
+        "_displayed",
+        "_tasks",
+        "_listener",
+        "_manager",
+        "_closed",
+        "_close_msg",
+        "_task",
+        "_done",
+        "_cleanup_queue",
+        "_budget",
+        "observer",
+        "_observer",
+    )
 
     def __init__(self, *args, **kwargs):
         self._embed: Optional[Embed] = None
         self.message: Optional[Message] = None
         self.color: hex = kwargs.get("color") or kwargs.get("colour") or 0x000000
+        self.seed_concurrency: int = kwargs.get("seed_concurrency", 1)
+        self._seeding: Optional[asyncio.Future] = None
+        self._editing: Optional[asyncio.Future] = None
+        self._pending_edit: Optional[dict] = None
+        # fingerprint of the content and the embed of the message
+        self._displayed: Optional[Tuple[int, int]] = None
+        self._tasks: Set[asyncio.Future] = set()
+        self._listener: Optional[ReactionListener] = None
+        self._manager: Optional[DialogManager] = None
+        self._closed = False
+        self._close_msg: Optional[str] = None
+        self._task: Optional[asyncio.Future] = None  # running the dialog
+        self._done: Optional[asyncio.Future] = None  # resolved when a run ended
+        self._cleanup_queue: Optional[CleanupQueue] = None
+        self._budget: Optional[RateLimitBudget] = None
+        self._started_at: Optional[float] = None
+        self._time_to_interactive: Optional[float] = None
+        self.observer: Optional[DialogObserver] = kwargs.get("observer")
+        self._observer: Optional[DialogObserver] = None
+
+    @property
+    def time_to_interactive(self) -> Optional[float]:
+        """
+        Seconds from starting the last run until the dialog message was published
+        and the dialog listened for reactions. ``None`` if it never got there.
+        """
+
+        return self._time_to_interactive
+
+    def _start_interaction(self):
+        self._started_at = time.perf_counter()
+        self._time_to_interactive = None
+        self._closed = False
+        self._close_msg = None
+        self._observer = self.observer or DialogObserver.of(self._client)
+        self._task = _current_task()
+        self._done = asyncio.get_event_loop().create_future()
+        self._cleanup_queue = CleanupQueue.of(self._client)
+        self._budget = RateLimitBudget.of(self._client)
+
+    def _mark_interactive(self):
+        self._time_to_interactive = time.perf_counter() - self._started_at
+        self._emit(INTERACTIVE, self._time_to_interactive)
+
+    def _emit(self, kind: str, duration: float = None, **data):
+        """ Pass an event to the observer, if there is one. """
+
+        if self._observer is None:
+            return
+
+        event = DialogEvent(kind, self, time.time() - (duration or 0), duration, data)
+        try:
+            self._observer.on_event(event)
+        except Exception as exc:  # a broken observer shouldn't end the dialog
+            asyncio.get_event_loop().call_exception_handler(
+                {"message": "Exception in dialog observer", "exception": exc}
+            )
+
+    async def _request(self, kind: str, coro: Awaitable, **data):
+        """
+        Await a REST call, passing its duration to the observer and counting it
+        against the rate-limit budget.
+        """
+
+        route = channel_id = None
+        if self._budget is not None and self.message is not None:
+            route = route_of(kind, data.get("method"))
+            channel_id = self.message.channel.id
+            if route is not None:
+                seeder = self if kind == SEED else None
+                self._budget.spend(route, channel_id, seeder)
+
+        if self._observer is None and route is None:
+            return await coro
+
+        started_at = time.perf_counter()
+        try:
+            return await coro
+        except errors.HTTPException as exc:
+            if route is not None and exc.status == 429:
+                self._budget.exhaust(route, channel_id)
+            raise
+        finally:
+            if self._observer is not None:
+                self._emit(kind, time.perf_counter() - started_at, **data)
+
+    def _shedding(self, action: str) -> bool:
+        """ Whether to shed an optional REST call, recording it if so. """
+
+        if self._budget is None or self.message is None:
+            return False
+
+        if not self._budget.should_shed(action, self.message.channel.id, self):
+            return False
+
+        self._budget.record_shed(action)
+        self._emit(SHED, action=action)
+        return True
+
+    async def _wait_for_budget(self, action: str, max_delay: float = None):
+        """ Delay an optional REST call while it is shed. """
+
+        if self._shedding(action):
+            await self._budget.wait(action, self.message.channel.id, self, max_delay)
+
+    async def _wait(
+        self, listener: ReactionListener, timeout: Optional[float]
+    ) -> Optional[Union[RawReactionActionEvent, Message]]:
+        """ Wait for the next reaction, passing it or a timeout to the observer. """
+
+        try:
+            reaction = await listener.wait(timeout)
+        except asyncio.TimeoutError:
+            self._emit(TIMEOUT)
+            raise
+
+        if reaction is not None and not isinstance(reaction, RawReactionActionEvent):
+            self._emit(REPLY, user_id=reaction.author.id)
+        elif reaction is not None:
+            self._emit(
+                REACTION,
+                emoji=str(reaction.emoji),
+                user_id=reaction.user_id,
+                removed=reaction.event_type == "REACTION_REMOVE",
+            )
+
+        return reaction
 
     async def _publish(self, channel: Optional[TextChannel], **kwargs) -> TextChannel:
         if channel is None and self.message is None:
@@ -18,16 +223,266 @@ class Dialog(ABC):
             )
 
         if channel is None:
-            try:
-                await self.message.edit(**kwargs)
-            except errors.NotFound:
-                self.message = None
+            displayed = self._cached_fingerprint()
+            fingerprint = self._fingerprint(kwargs.get("content"), kwargs.get("embed"))
+            if "content" not in kwargs:  # editing keeps the content, if it's known
+                fingerprint = (
+                    (displayed[0], fingerprint[1]) if displayed is not None else None
+                )
+
+            # e.g. a dialog run again on its message, which wasn't edited meanwhile
+            if fingerprint is None or fingerprint != displayed:
+                try:
+                    await self._request(PUBLISH, self.message.edit(**kwargs))
+                except errors.NotFound:
+                    self.message = None
+            self._displayed = fingerprint
 
         if self.message is None:
-            self.message = await channel.send(**kwargs)
+            self.message = await self._request(PUBLISH, channel.send(**kwargs))
+            self._displayed = self._fingerprint(
+                kwargs.get("content"), kwargs.get("embed")
+            )
 
         return self.message.channel
 
+    @staticmethod
+    def _fingerprint(content: Optional[str], embed: Optional[Embed]) -> Tuple[int, int]:
+        """ Identify the content of the dialog message, to skip no-op edits. """
+
+        data = embed.to_dict() if embed is not None else None
+        # Discord returns an empty string for messages without content
+        return hash(content or None), hash(json.dumps(data, sort_keys=True))
+
+    def _cached_fingerprint(self) -> Optional[Tuple[int, int]]:
+        """ Identify the content of the message cached by the client, if it is. """
+
+        # unlike the dialog, the cached copy is also updated by edits made elsewhere
+        message = self._client._connection._get_message(self.message.id)
+        if message is None:
+            return None
+
+        embed = message.embeds[0] if message.embeds else None
+        return self._fingerprint(message.content, embed)
+
+    def _listen(
+        self,
+        emojis: Iterable[str],
+        user_ids: Optional[Iterable[int]] = None,
+        removals: bool = False,
+        replies: bool = False,
+    ) -> ReactionListener:
+        """ Listen for reactions on, and optionally replies to, the dialog message. """
+
+        self._listener = ReactionListener(
+            self._client, self.message.id, emojis, user_ids, removals, replies
+        )
+        if self._closed:
+            self._listener.close()
+
+        return self._listener
+
+    def _manage(self, user_ids: Optional[Iterable[int]] = None):
+        """ Register with the dialog manager of the client, if there is one. """
+
+        self._manager = DialogManager.of(self._client)
+        if self._manager is not None:
+            self._manager.add(self, user_ids)
+
+    def _unmanage(self):
+        if self._manager is not None:
+            self._manager.remove(self)
+            self._manager = None
+
+    def _stop_interaction(self):
+        """
+        Stop listening and background work at once, even if the task running the
+        dialog is being cancelled.
+        """
+
+        self._unmanage()
+        if self._listener is not None:
+            self._listener.close()
+        if self._seeding is not None:
+            self._seeding.cancel()
+        for task in self._tasks:
+            task.cancel()
+
+    @property
+    def running(self) -> bool:
+        """ Whether the dialog has been started and hasn't ended yet. """
+
+        return self._done is not None and not self._done.done()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.cancel()
+
+    async def cancel(self, text: str = None):
+        """
+        End the running dialog and wait until it has cleaned up.
+
+        The dialog stops listening right away and quits with ``text``. If the task
+        running the dialog has been cancelled before it could clean up, the dialog
+        is cleaned up here instead.
+
+        :param text: message text to display when dialog is closed. If ``None``,
+            the message is deleted.
+        :type text: :class:`str`, optional
+
+        :rtype: ``None``
+        """
+
+        if not self.running:
+            return
+
+        self._close(text)
+
+        task = self._task
+        if task is not None and task is not _current_task() and not task.done():
+            await asyncio.wait((self._done, task), return_when=asyncio.FIRST_COMPLETED)
+            if not self.running:
+                return
+
+        # the run was aborted, e.g. by cancelling its task, and can't clean up
+        self._stop_interaction()
+        self._done.set_result(None)
+        await self._cancel_tasks()
+        if self.message is not None:
+            await self.quit(text)
+
+    def _touch(self):
+        if self._manager is not None:
+            self._manager.touch(self)
+
+    def _close(self, text: str = None):
+        """
+        Stop listening for reactions. The running dialog then quits with ``text``.
+        """
+
+        self._closed = True
+        self._close_msg = text
+        if self._listener is not None:
+            self._listener.close()
+
+    def _seed_reactions(self, emojis: Iterable[str]) -> asyncio.Future:
+        """
+        Add reactions to the dialog message in the background.
+
+        When the message is reused, reactions the client already added to it are
+        kept and its other reactions are removed, as far as the copy of the message
+        cached by the client tells. If it isn't cached, all reactions are added.
+        """
+
+        emojis = tuple(emojis)
+        extra = ()
+
+        present = self._own_reactions()
+        if present is not None:
+            extra = tuple(e for e in present if e not in emojis)
+            emojis = tuple(e for e in emojis if e not in present)
+
+        self._seeding = asyncio.ensure_future(
+            self._reconcile_reactions(self.message, emojis, extra)
+        )
+        return self._seeding
+
+    def _own_reactions(self) -> Optional[Set[str]]:
+        """ Emojis the client reacted with, if the client has the message cached. """
+
+        # only the cached copy of a message is updated by reaction events, not the
+        # one returned when sending or fetching it
+        message = self._client._connection._get_message(self.message.id)
+        if message is None:
+            return None
+
+        return {str(r.emoji) for r in message.reactions if r.me}
+
+    async def _reconcile_reactions(
+        self, message: Message, missing: Iterable[str], extra: Iterable[str]
+    ):
+        await self._add_reactions(message, missing)
+
+        for emoji in extra:
+            try:
+                await self._request(
+                    REQUEST,
+                    message.remove_reaction(emoji, self._client.user),
+                    method="remove_reaction",
+                )
+            except errors.HTTPException:
+                pass
+
+    async def _add_reactions(self, message: Message, emojis: Iterable[str]):
+        if self.seed_concurrency <= 1:
+            for emoji in emojis:
+                await self._add_reaction(message, emoji)
+            return
+
+        semaphore = asyncio.Semaphore(self.seed_concurrency)
+
+        async def add(emoji: str):
+            async with semaphore:
+                await self._add_reaction(message, emoji)
+
+        await asyncio.gather(*(add(e) for e in emojis))
+
+    async def _add_reaction(self, message: Message, emoji: str):
+        await self._wait_for_budget(PAUSE_SEEDING)
+        try:
+            await self._request(SEED, message.add_reaction(emoji), emoji=emoji)
+        except errors.HTTPException:
+            pass  # a missing reaction shouldn't end the dialog or the other ones
+
+    async def _stop_seeding(self):
+        """ Stop adding reactions, so they aren't added after cleaning up. """
+
+        seeding, self._seeding = self._seeding, None
+        if seeding is None or seeding.done():
+            return
+
+        seeding.cancel()
+        try:
+            await seeding
+        except asyncio.CancelledError:
+            pass
+
+    def _spawn(self, coro: Awaitable) -> asyncio.Future:
+        """ Run a coroutine in the background, bound to the lifetime of the dialog. """
+
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Future):
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+
+        # failed requests (e.g. missing permissions) don't end the dialog
+        exc = task.exception()
+        if exc is not None and not isinstance(exc, errors.HTTPException):
+            asyncio.get_event_loop().call_exception_handler(
+                {
+                    "message": "Unhandled exception in dialog task",
+                    "exception": exc,
+                    "future": task,
+                }
+            )
+
+    async def _cancel_tasks(self):
+        """ Cancel the background tasks of the dialog and wait until they are done. """
+
+        tasks = tuple(self._tasks)
+        for task in tasks:
+            task.cancel()
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     async def quit(self, text: str = None):
         """
         Quit the dialog.
@@ -38,15 +493,68 @@ class Dialog(ABC):
         :rtype: ``None``
         """
 
+        await self._request(QUIT, self._quit(text), text=text)
+
+    async def _quit(self, text: Optional[str]):
+        await self._stop_seeding()
+
+        message = self.message
         if text is None:
-            await self.message.delete()
+            self._pending_edit = None  # no use editing a deleted message
             self.message = None
+            await self._cleanup(
+                self._request(REQUEST, message.delete(), method="delete")
+            )
+        else:
+            await self._cleanup(self._close_message(message, text))
+
+    async def _cleanup(self, coro: Awaitable):
+        """ Run a cleanup, in the background if a cleanup queue is installed. """
+
+        if self._cleanup_queue is None:
+            await coro
         else:
+            self._cleanup_queue.submit(coro)
+
+    async def _close_message(
+        self, message: Message, text: Optional[str], clear: bool = True
+    ):
+        """ Display the final text and remove the reactions of a message. """
+
+        if text is not None:
             await self.display(text)
-            try:
-                await self.message.clear_reactions()
-            except errors.Forbidden:
-                pass
+        if clear:
+            await self._clear_reactions(message)
+
+    async def _clear_reactions(self, message: Message = None):
+        """ Remove all reactions from the dialog message, if permitted. """
+
+        message = message or self.message
+        try:
+            await self._request(
+                REQUEST, message.clear_reactions(), method="clear_reactions"
+            )
+        except errors.Forbidden:
+            pass
+
+    async def _remove_reaction(self, reaction: RawReactionActionEvent):
+        """ Remove a user's reaction, so they can use it again. """
+
+        if self._shedding(REMOVE_REACTION):
+            return
+
+        await self._request(
+            REQUEST,
+            self.message.remove_reaction(reaction.emoji, reaction.member),
+            method="remove_reaction",
+        )
+
+    def _finish(self, result=None):
+        """ End the run and pass its result to the observer. """
+
+        if self._done is not None and not self._done.done():
+            self._done.set_result(result)
+        self._emit(RESULT, result=result)
 
     async def update(self, text: str, color: hex = None, hide_author: bool = False):
         """
@@ -74,9 +582,37 @@ class Dialog(ABC):
         """
         This will edit the dialog message.
 
+        Nothing is sent if the message already displays the given text and embed.
+        Edits of a message are sent one at a time. If the message is displayed again
+        while an edit is still in progress, only the latest content is sent
+        afterwards and all waiting calls return once it has been edited.
+
         :param text: The new text.
         :param embed: The new embed.
         :rtype: ``None``
         """
 
-        await self.message.edit(content=text, embed=embed)
+        self._pending_edit = {"content": text, "embed": embed}
+
+        if self._editing is None or self._editing.done():
+            self._editing = asyncio.ensure_future(self._send_edits())
+
+        await asyncio.shield(self._editing)
+
+    async def _send_edits(self):
+        while self._pending_edit is not None and self.message is not None:
+            # under rate-limit pressure, more edits pile up and coalesce meanwhile,
+            # but the latest one is still made after a bounded delay
+            if self._budget is not None:
+                await self._wait_for_budget(COALESCE, self._budget.coalesce_delay)
+            if self._pending_edit is None or self.message is None:
+                break
+
+            fields, self._pending_edit = self._pending_edit, None
+
+            fingerprint = self._fingerprint(fields["content"], fields["embed"])
+            if fingerprint == self._displayed:
+                continue
+
+            await self._request(EDIT, self.message.edit(**fields))
+            self._displayed = fingerprint
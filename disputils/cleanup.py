@@ -0,0 +1,121 @@
+import asyncio
+import discord
+from typing import Awaitable, Callable, Optional, Set
+from weakref import WeakKeyDictionary
+from .extension import ClientExtension
+
+
+class CleanupQueue(ClientExtension):
+    """
+    Runs the cleanup of ended dialogs in the background.
+
+    Without a queue, dialogs clear their reactions, delete their message or display
+    their final text before returning their result. Once a queue is installed,
+    dialogs of that client hand these REST calls to the queue and return right
+    away. Cleanups that are already queued still run after uninstalling it.
+
+    .. code-block:: py
+
+        cleanup = CleanupQueue(client, concurrency=5)
+        cleanup.install()
+        ...
+        await cleanup.flush(timeout=10)  # before shutting down
+
+    :param client: The :class:`discord.Client` whose dialogs to clean up.
+    :param concurrency: Maximal number of cleanups running at once.
+    :param on_error: Function called with the exception of a failed cleanup. By
+        default failures are passed to the event loop's exception handler.
+    """
+
+    _extensions = WeakKeyDictionary()
+
+    def __init__(
+        self,
+        client: discord.Client,
+        concurrency: int = 5,
+        on_error: Callable[[BaseException], None] = None,
+    ):
+        super().__init__(client)
+        self.concurrency = concurrency
+        self.on_error = on_error
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Future] = set()
+        self._failed = 0
+
+    def __len__(self):
+        return len(self._tasks)
+
+    @property
+    def failed(self) -> int:
+        """ Number of cleanups that failed so far. """
+
+        return self._failed
+
+    def submit(self, coro: Awaitable) -> asyncio.Future:
+        """
+        Queue a cleanup.
+
+        :param coro: The coroutine doing the cleanup.
+        :return: Future of the cleanup.
+        :rtype: :class:`asyncio.Future`
+        """
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        task = asyncio.ensure_future(self._run(coro))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    async def _run(self, coro: Awaitable):
+        async with self._semaphore:
+            await coro
+
+    def _task_done(self, task: asyncio.Future):
+        self._tasks.discard(task)
+        if task.cancelled() or task.exception() is None:
+            return
+
+        self._failed += 1
+        if self.on_error is not None:
+            self.on_error(task.exception())
+        else:
+            asyncio.get_event_loop().call_exception_handler(
+                {
+                    "message": "Dialog cleanup failed",
+                    "exception": task.exception(),
+                    "future": task,
+                }
+            )
+
+    async def flush(self, timeout: float = None) -> int:
+        """
+        Wait until all queued cleanups are done, including ones queued meanwhile.
+
+        :param timeout: Seconds to wait. Cleanups still pending afterwards are
+            cancelled.
+        :return: The number of cancelled cleanups.
+        :rtype: :class:`int`
+        """
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        while self._tasks:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+
+            await asyncio.wait(tuple(self._tasks), timeout=remaining)
+
+        pending = tuple(self._tasks)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+        return len(pending)
@@ -2,19 +2,28 @@ import discord
 from discord.ext import commands
 import asyncio
 from .abc import Dialog
-from typing import Optional
+from .metrics import REQUEST
+from typing import Dict, Iterable, Optional, Set, Tuple, Union
 
 
 class Confirmation(Dialog):
-    """ Represents a message to let the user confirm a specific action. """
+    """
+    Represents a message to let the user confirm a specific action.
+
+    :param kwargs: Options of every dialog, e.g. ``seed_concurrency`` or
+        ``observer``. See :class:`~disputils.abc.Dialog`.
+    """
+
+    __slots__ = ("emojis", "_confirmed")
 
     def __init__(
         self,
         client: discord.Client,
         color: hex = 0x000000,
         message: discord.Message = None,
+        **kwargs
     ):
-        super().__init__(color=color)
+        super().__init__(color=color, **kwargs)
 
         self._client = client
         self.color = color
@@ -36,6 +45,7 @@ class Confirmation(Dialog):
         channel: discord.TextChannel = None,
         hide_author: bool = False,
         timeout: int = 20,
+        keep_reactions: bool = False,
     ) -> bool or None:
         """
         Run the confirmation.
@@ -57,6 +67,11 @@ class Confirmation(Dialog):
         :param timeout:
             Seconds to wait until stopping to listen for user interaction.
 
+        :param keep_reactions: Only remove the reaction of the user afterwards, so
+            the message can be used for another confirmation without adding the
+            reactions again.
+        :type keep_reactions: bool, optional
+
         :return: True when it's been confirmed, otherwise False. Will return None when a
             timeout occurs.
         :rtype: :class:`bool`, optional
@@ -68,43 +83,72 @@ class Confirmation(Dialog):
 
         self._embed = emb
 
+        self._start_interaction()
         await self._publish(channel, embed=emb)
-        msg = self.message
-
-        for emoji in self.emojis:
-            await msg.add_reaction(emoji)
 
+        reacted = []
         try:
-            reaction = await self._client.wait_for(
-                "raw_reaction_add",
-                check=lambda r: (r.message_id == msg.id)
-                and (r.user_id == user.id)
-                and (str(r.emoji) in self.emojis),
-                timeout=timeout,
-            )
+            with self._listen(self.emojis, {user.id}) as listener:
+                self._manage({user.id})
+                self._seed_reactions(self.emojis)
+                self._mark_interactive()
+                reaction = await self._wait(listener, timeout)
         except asyncio.TimeoutError:
             self._confirmed = None
-            return
         else:
-            self._confirmed = self.emojis[str(reaction.emoji)]
-            return self._confirmed
+            if reaction is None:  # closed by the dialog manager
+                self._confirmed = None
+            else:
+                self._confirmed = self.emojis[str(reaction.emoji)]
+                reacted.append((str(reaction.emoji), reaction.user_id))
         finally:
+            await self._end(reacted if keep_reactions else None)
+
+        self._finish(self._confirmed)
+        return self._confirmed
+
+    async def _end(self, reacted: Optional[Iterable[Tuple[str, int]]] = None):
+        """
+        Stop the confirmation and clean up its reactions, or only the reactions of
+        users in ``reacted`` as ``(emoji, user_id)`` if it is given.
+        """
+
+        self._stop_interaction()
+        await self._stop_seeding()
+        if self._closed:
+            await self.quit(self._close_msg)
+        elif reacted is not None:
+            await self._cleanup(self._remove_reactions(self.message, reacted))
+        else:
+            await self._cleanup(self._clear_reactions(self.message))
+
+    async def _remove_reactions(
+        self, message: discord.Message, reacted: Iterable[Tuple[str, int]]
+    ):
+        for emoji, user_id in reacted:
             try:
-                await msg.clear_reactions()
-            except discord.Forbidden:
-                pass
+                await self._request(
+                    REQUEST,
+                    message.remove_reaction(emoji, discord.Object(user_id)),
+                    method="remove_reaction",
+                )
+            except discord.HTTPException:
+                pass  # e.g. in a DM, where reactions of others can't be removed
 
 
 class BotConfirmation(Confirmation):
+    __slots__ = ("_ctx",)
+
     def __init__(
         self,
         ctx: commands.Context,
         color: hex = 0x000000,
         message: discord.Message = None,
+        **kwargs
     ):
         self._ctx = ctx
 
-        super().__init__(ctx.bot, color, message)
+        super().__init__(ctx.bot, color, message, **kwargs)
 
     async def confirm(
         self,
@@ -113,6 +157,7 @@ class BotConfirmation(Confirmation):
         channel: discord.TextChannel = None,
         hide_author: bool = False,
         timeout: int = 20,
+        keep_reactions: bool = False,
     ) -> bool or None:
 
         if user is None:
@@ -121,4 +166,193 @@ class BotConfirmation(Confirmation):
         if self.message is None and channel is None:
             channel = self._ctx.channel
 
-        return await super().confirm(text, user, channel, hide_author, timeout)
+        return await super().confirm(
+            text, user, channel, hide_author, timeout, keep_reactions
+        )
+
+
+class QuorumConfirmation(Confirmation):
+    """
+    Lets several users vote on a specific action in a single message.
+
+    Votes are counted as reactions are added and removed, and the confirmation
+    ends as soon as its outcome can't change anymore. A user who reacted with both
+    emojis counts as undecided.
+
+    :param policy: How many of the users need to confirm: ``"any"``, ``"all"``,
+        ``"majority"`` or a number.
+    :type policy: Union[:class:`str`, :class:`int`]
+    """
+
+    __slots__ = ("policy", "_votes")
+
+    def __init__(
+        self,
+        client: discord.Client,
+        color: hex = 0x000000,
+        message: discord.Message = None,
+        policy: Union[str, int] = "majority",
+        **kwargs
+    ):
+        super().__init__(client, color, message, **kwargs)
+
+        self.policy = policy
+        self._votes: Dict[int, Set[bool]] = {}
+
+    @property
+    def votes(self) -> Dict[int, Optional[bool]]:
+        """
+        The vote of each user by ID: ``True`` or ``False``, ``None`` if they haven't
+        decided.
+        """
+
+        return {user_id: self._vote(user_id) for user_id in self._votes}
+
+    def _vote(self, user_id: int) -> Optional[bool]:
+        choices = self._votes[user_id]
+        return next(iter(choices)) if len(choices) == 1 else None
+
+    def _required(self, user_count: int) -> int:
+        if self.policy == "any":
+            required = 1
+        elif self.policy == "all":
+            required = user_count
+        elif self.policy == "majority":
+            required = user_count // 2 + 1
+        elif isinstance(self.policy, int):
+            required = self.policy
+        else:
+            raise ValueError(f"unknown policy {self.policy!r}")
+
+        if not 0 < required <= user_count:
+            raise ValueError(f"{required} of {user_count} users can't confirm")
+
+        return required
+
+    def _outcome(self, required: int) -> Optional[bool]:
+        votes = [self._vote(user_id) for user_id in self._votes]
+
+        if votes.count(True) >= required:
+            return True
+        if len(votes) - votes.count(False) < required:
+            return False
+
+        return None  # not settled yet
+
+    async def confirm(
+        self,
+        text: str,
+        users: Iterable[discord.User],
+        channel: discord.TextChannel = None,
+        timeout: int = 20,
+        keep_reactions: bool = False,
+    ) -> bool or None:
+        """
+        Run the confirmation.
+
+        :param text: The confirmation text.
+        :type text: :class:`str`
+
+        :param users: The users who vote.
+        :type users: list[:class:`discord.User`]
+
+        :param channel: The channel the message will be sent to. Must only be specified
+            if ``self.message`` is None.
+        :type channel: :class:`discord.TextChannel`, optional
+
+        :type timeout: int
+        :param timeout:
+            Seconds to wait for the outcome, in total.
+
+        :param keep_reactions: Only remove the reactions of the users afterwards,
+            so the message can be used for another confirmation without adding the
+            reactions again.
+        :type keep_reactions: bool, optional
+
+        :return: True when it's been confirmed, False when it can't be confirmed
+            anymore. Will return None when a timeout occurs.
+        :rtype: :class:`bool`, optional
+        """
+
+        self._votes = {user.id: set() for user in users}
+        required = self._required(len(self._votes))
+
+        emb = discord.Embed(title=text, color=self.color)
+        emb.set_footer(text=f"{required} of {len(self._votes)} confirmations needed")
+
+        self._embed = emb
+        self._confirmed = None
+
+        self._start_interaction()
+        await self._publish(channel, embed=emb)
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        try:
+            with self._listen(self.emojis, self._votes, removals=True) as listener:
+                self._manage(self._votes)
+                self._seed_reactions(self.emojis)
+                self._mark_interactive()
+
+                while self._confirmed is None:
+                    remaining = None
+                    if deadline is not None:
+                        remaining = max(deadline - loop.time(), 0)
+
+                    reaction = await self._wait(listener, remaining)
+                    if reaction is None:  # closed by the dialog manager
+                        break
+
+                    self._touch()
+                    choices = self._votes[reaction.user_id]
+                    choice = self.emojis[str(reaction.emoji)]
+                    if reaction.event_type == "REACTION_REMOVE":
+                        choices.discard(choice)
+                    else:
+                        choices.add(choice)
+
+                    self._confirmed = self._outcome(required)
+        except asyncio.TimeoutError:
+            self._confirmed = None
+        finally:
+            reacted = [
+                (emoji, user_id)
+                for user_id, choices in self._votes.items()
+                for emoji, choice in self.emojis.items()
+                if choice in choices
+            ]
+            await self._end(reacted if keep_reactions else None)
+
+        self._finish(self._confirmed)
+        return self._confirmed
+
+
+class BotQuorumConfirmation(QuorumConfirmation):
+    __slots__ = ("_ctx",)
+
+    def __init__(
+        self,
+        ctx: commands.Context,
+        color: hex = 0x000000,
+        message: discord.Message = None,
+        policy: Union[str, int] = "majority",
+        **kwargs
+    ):
+        self._ctx = ctx
+
+        super().__init__(ctx.bot, color, message, policy, **kwargs)
+
+    async def confirm(
+        self,
+        text: str,
+        users: Iterable[discord.User],
+        channel: discord.TextChannel = None,
+        timeout: int = 20,
+        keep_reactions: bool = False,
+    ) -> bool or None:
+
+        if self.message is None and channel is None:
+            channel = self._ctx.channel
+
+        return await super().confirm(text, users, channel, timeout, keep_reactions)
@@ -0,0 +1,59 @@
+import discord
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+
+class ClientExtension:
+    """
+    Base class for helpers that dialogs of a client use once they are installed for
+    it, like :class:`~disputils.router.ReactionRouter` or
+    :class:`~disputils.manager.DialogManager`.
+
+    A dialog looks up the installed helpers when it is started, so installing or
+    uninstalling one affects dialogs started afterwards. Each kind of helper keeps
+    its own registry in ``_extensions``, so helpers of different kinds can be
+    installed for the same client at once.
+
+    :param client: The :class:`discord.Client` to install the helper for.
+    """
+
+    _extensions: "WeakKeyDictionary[discord.Client, ClientExtension]"
+    _client: Optional[discord.Client] = None
+
+    def __init__(self, client: discord.Client):
+        self._client = client
+
+    @classmethod
+    def of(cls, client: discord.Client) -> Optional["ClientExtension"]:
+        """
+        Get the helper of this kind installed for a client.
+
+        :param client: The client.
+        :rtype: Optional[:class:`ClientExtension`]
+        """
+
+        return cls._extensions.get(client)
+
+    def install(self):
+        """
+        Make dialogs of the client that are started from now on use this helper,
+        instead of the one of the same kind installed before.
+
+        :rtype: ``None``
+        """
+
+        if self._client is None:
+            raise TypeError(f"{type(self).__name__} has no client to install it for")
+
+        self._extensions[self._client] = self
+
+    def uninstall(self):
+        """
+        Stop dialogs of the client that are started from now on from using this
+        helper.
+
+        :rtype: ``None``
+        """
+
+        if self._client is not None and self._extensions.get(self._client) is self:
+            del self._extensions[self._client]
@@ -0,0 +1,266 @@
+import asyncio
+import discord
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from weakref import WeakKeyDictionary
+from .cleanup import CleanupQueue
+from .extension import ClientExtension
+
+
+class _Entry:
+    __slots__ = ("guild_id", "channel_id", "user_ids")
+
+    def __init__(
+        self,
+        guild_id: Optional[int],
+        channel_id: Optional[int],
+        user_ids: Tuple[int, ...],
+    ):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.user_ids = user_ids
+
+
+class DialogManager(ClientExtension):
+    """
+    Keeps track of the running dialogs of a client and limits how many of them may
+    run at once.
+
+    When starting a dialog would exceed a limit, the least recently used dialog
+    within that limit is closed with :meth:`~disputils.abc.Dialog.quit`. A dialog is
+    used when it is started and whenever a user interacts with it.
+
+    .. code-block:: py
+
+        manager = DialogManager(client, max_dialogs=1000, per_user=3)
+        manager.install()
+
+    Without any limits, a manager can still be used to close all dialogs of the
+    client at once with :meth:`close_all`, e.g. when the bot shuts down. Dialogs
+    stay managed until they end, even if the manager is uninstalled meanwhile.
+
+    :param client: The :class:`discord.Client` whose dialogs to manage.
+    :param max_dialogs: Maximal number of dialogs in total.
+    :param per_guild: Maximal number of dialogs per guild.
+    :param per_channel: Maximal number of dialogs per channel.
+    :param per_user: Maximal number of dialogs per user. Only dialogs restricted to
+        certain users count for them.
+    :param evict_msg: Text to display in closed dialogs. If ``None``, their
+        messages are deleted.
+    """
+
+    _extensions = WeakKeyDictionary()
+
+    def __init__(
+        self,
+        client: discord.Client,
+        *,
+        max_dialogs: int = None,
+        per_guild: int = None,
+        per_channel: int = None,
+        per_user: int = None,
+        evict_msg: str = None,
+    ):
+        super().__init__(client)
+        self.max_dialogs = max_dialogs
+        self.per_guild = per_guild
+        self.per_channel = per_channel
+        self.per_user = per_user
+        self.evict_msg = evict_msg
+
+        self._dialogs: "OrderedDict[object, _Entry]" = OrderedDict()  # LRU first
+        self._guilds = Counter()
+        self._channels = Counter()
+        self._users = Counter()
+        self._evicted = 0
+
+    def __len__(self):
+        return len(self._dialogs)
+
+    def __contains__(self, dialog):
+        return dialog in self._dialogs
+
+    @property
+    def counts(self) -> Dict[str, object]:
+        """
+        Current numbers of managed dialogs, for monitoring.
+
+        A dictionary with the ``total`` number of dialogs, the number of dialogs
+        ``evicted`` so far, and dictionaries mapping IDs to numbers of dialogs for
+        ``guilds``, ``channels`` and ``users``.
+        """
+
+        return {
+            "total": len(self._dialogs),
+            "evicted": self._evicted,
+            "guilds": dict(self._guilds),
+            "channels": dict(self._channels),
+            "users": dict(self._users),
+        }
+
+    def add(self, dialog, user_ids: Optional[Iterable[int]] = None):
+        """
+        Start managing a dialog whose message has been published, closing the least
+        recently used dialogs if a limit is exceeded.
+
+        :param dialog: The :class:`~disputils.abc.Dialog`.
+        :param user_ids: IDs of the users who can interact with the dialog.
+        :rtype: ``None``
+        """
+
+        if dialog in self._dialogs:
+            self.touch(dialog)
+            return
+
+        channel = dialog.message.channel
+        guild = getattr(channel, "guild", None)
+        entry = _Entry(
+            guild.id if guild is not None else None,
+            channel.id,
+            tuple(set(user_ids)) if user_ids is not None else (),
+        )
+
+        self._dialogs[dialog] = entry
+        self._count(entry, 1)
+
+        self._enforce(self.max_dialogs, len(self._dialogs), lambda e: True)
+        if entry.guild_id is not None:
+            self._enforce(
+                self.per_guild,
+                self._guilds[entry.guild_id],
+                lambda e: e.guild_id == entry.guild_id,
+            )
+        self._enforce(
+            self.per_channel,
+            self._channels[entry.channel_id],
+            lambda e: e.channel_id == entry.channel_id,
+        )
+        for user_id in entry.user_ids:
+            self._enforce(
+                self.per_user, self._users[user_id], lambda e: user_id in e.user_ids
+            )
+
+    def touch(self, dialog):
+        """
+        Mark a dialog as recently used.
+
+        :param dialog: The :class:`~disputils.abc.Dialog`.
+        :rtype: ``None``
+        """
+
+        if dialog in self._dialogs:
+            self._dialogs.move_to_end(dialog)
+
+    def remove(self, dialog):
+        """
+        Stop managing a dialog, e.g. because it ended.
+
+        :param dialog: The :class:`~disputils.abc.Dialog`.
+        :rtype: ``None``
+        """
+
+        entry = self._dialogs.pop(dialog, None)
+        if entry is not None:
+            self._count(entry, -1)
+
+    def _count(self, entry: _Entry, delta: int):
+        counters = [(self._channels, entry.channel_id)]
+        if entry.guild_id is not None:
+            counters.append((self._guilds, entry.guild_id))
+        counters.extend((self._users, user_id) for user_id in entry.user_ids)
+
+        for counter, key in counters:
+            counter[key] += delta
+            if counter[key] <= 0:
+                del counter[key]
+
+    def _enforce(self, limit: Optional[int], count: int, matches):
+        if limit is None:
+            return
+
+        for _ in range(count - limit):
+            dialog = next(d for d, e in self._dialogs.items() if matches(e))
+            self.evict(dialog)
+
+    def evict(self, dialog):
+        """
+        Close a dialog and stop managing it.
+
+        The dialog stops listening right away and cleans up with
+        :meth:`~disputils.abc.Dialog.quit` in the task running it.
+
+        :param dialog: The :class:`~disputils.abc.Dialog`.
+        :rtype: ``None``
+        """
+
+        self.remove(dialog)
+        self._evicted += 1
+        dialog._close(self.evict_msg)
+
+    async def close_all(
+        self, text: str = None, *, concurrency: int = 10, timeout: float = None
+    ) -> int:
+        """
+        End all managed dialogs, e.g. before the bot shuts down.
+
+        Dialogs are closed with :meth:`~disputils.abc.Dialog.cancel`, at most
+        ``concurrency`` at a time. Dialogs that haven't been closed after
+        ``timeout`` seconds have the tasks running them cancelled, without cleaning
+        up their messages. If a :class:`~disputils.cleanup.CleanupQueue` is
+        installed, it is flushed within the same ``timeout``.
+
+        :param text: Text to display in the closed dialogs. If ``None``, their
+            messages are deleted.
+        :param concurrency: Maximal number of dialogs cleaning up at once.
+        :param timeout: Seconds to wait for the dialogs to clean up.
+        :return: The number of dialogs whose tasks had to be cancelled.
+        :rtype: :class:`int`
+        """
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        dialogs = list(self._dialogs)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def close(d):
+            async with semaphore:
+                await d.cancel(text)
+
+        closing = [asyncio.ensure_future(close(d)) for d in dialogs]
+        done, pending = set(), set()
+        if closing:
+            done, pending = await asyncio.wait(closing, timeout=timeout)
+
+        for future in pending:
+            future.cancel()
+        for future in done:
+            if not future.cancelled() and future.exception() is not None:
+                asyncio.get_event_loop().call_exception_handler(
+                    {
+                        "message": "Exception while closing dialog",
+                        "exception": future.exception(),
+                        "future": future,
+                    }
+                )
+
+        forced = 0
+        for dialog in dialogs:
+            if dialog.running and dialog._task is not None:
+                dialog._task.cancel()
+                # ended without cleaning up, so cancel() doesn't try again
+                dialog._stop_interaction()
+                dialog._finish()
+                forced += 1
+
+        if pending:
+            await asyncio.wait(pending)
+
+        queue = CleanupQueue.of(self._client)
+        if queue is not None:
+            remaining = None
+            if deadline is not None:
+                remaining = max(deadline - loop.time(), 0)
+            await queue.flush(remaining)
+
+        return forced
@@ -0,0 +1,262 @@
+import discord
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import Counter, OrderedDict, namedtuple
+from typing import Dict, Iterable, List, Optional
+from weakref import WeakKeyDictionary
+from .extension import ClientExtension
+
+
+PUBLISH = "publish"  # sending or editing the dialog message to start a run
+INTERACTIVE = "interactive"  # listening for reactions, duration since start
+SEED = "seed"  # adding one control reaction
+REACTION = "reaction"  # a user added or removed a reaction
+REPLY = "reply"  # a user replied to the dialog message
+EDIT = "edit"  # editing the dialog message
+REQUEST = "request"  # any other REST call, e.g. removing a reaction
+TIMEOUT = "timeout"  # no reaction in time
+QUIT = "quit"  # closing the dialog, duration including its REST calls
+SHED = "shed"  # an optional REST call was skipped or delayed to save rate limits
+RESULT = "result"  # the run ended
+
+#: Kinds of events that are a single REST call.
+REST_KINDS = frozenset((PUBLISH, SEED, EDIT, REQUEST))
+
+
+DialogEvent = namedtuple(
+    "DialogEvent", ("kind", "dialog", "timestamp", "duration", "data")
+)
+DialogEvent.__doc__ = """
+Something that happened in a running dialog.
+
+- ``kind``: what happened, e.g. ``"edit"``, see :data:`REST_KINDS` and the other
+  constants of :mod:`disputils.metrics`
+- ``dialog``: the :class:`~disputils.abc.Dialog`
+- ``timestamp``: unix time at which it started
+- ``duration``: seconds it took, e.g. for the REST call, or ``None``
+- ``data``: dictionary with details, e.g. the ``emoji`` of a reaction or the
+  ``result`` of a run
+"""
+
+
+class DialogObserver(ClientExtension, ABC):
+    """
+    Abstract base class for receiving the events of running dialogs, e.g. to export
+    them to a monitoring system.
+
+    An observer receives the events of all dialogs of a client once it is installed
+    for it, or of single dialogs by setting their ``observer``. Events are passed
+    while the dialog runs, so handling them should be quick.
+
+    .. code-block:: py
+
+        metrics = MetricsAggregator(client)
+        metrics.install()
+
+    :param client: The :class:`discord.Client` whose dialogs to observe once
+        installed. Not needed for observers of single dialogs.
+    """
+
+    _extensions = WeakKeyDictionary()
+
+    def __init__(self, client: discord.Client = None):
+        super().__init__(client)
+
+    @abstractmethod
+    def on_event(self, event: DialogEvent):
+        """
+        Handle an event.
+
+        :param event: The event.
+        :rtype: ``None``
+        """
+
+
+class Histogram:
+    """
+    Counts values in buckets.
+
+    :param bounds: Upper bounds of the buckets, in ascending order. Larger values
+        are counted in an additional bucket.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Iterable[float]):
+        self.bounds: List[float] = sorted(bounds)
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """
+        Count a value.
+
+        :param value: The value.
+        :rtype: ``None``
+        """
+
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> Optional[float]:
+        """ Average of the counted values, ``None`` if there are none. """
+
+        return self.sum / self.count if self.count else None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Estimate a percentile as the upper bound of the bucket it falls into.
+
+        :param p: The percentile, e.g. ``99``.
+        :return: The bound, ``inf`` for the bucket of larger values, or ``None`` if
+            there are no values.
+        :rtype: Optional[:class:`float`]
+        """
+
+        if not self.count:
+            return None
+
+        rank = self.count * p / 100
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, object]:
+        """
+        The histogram as a dictionary, e.g. for exporting it as JSON.
+
+        :rtype: :class:`dict`
+        """
+
+        return {
+            "bounds": list(self.bounds),
+            "counts": list(self.counts),
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+
+LATENCY_BOUNDS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # seconds
+CALL_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class _Run:
+    __slots__ = ("api_calls", "clicked_at")
+
+    def __init__(self):
+        self.api_calls = 0
+        self.clicked_at: Optional[float] = None  # oldest reaction not rendered yet
+
+
+class MetricsAggregator(DialogObserver):
+    """
+    Observer keeping histograms of dialog performance in memory.
+
+    - ``time_to_interactive``: seconds from starting a dialog until it listens for
+      reactions
+    - ``click_to_render``: seconds from a reaction or reply until the resulting
+      edit of the dialog message is done
+    - ``api_calls``: REST calls per dialog run
+    - ``request_duration``: seconds per REST call, by kind of event
+    - ``sheds``: optional REST calls shed under rate-limit pressure, by
+      ``action``, see :class:`~disputils.ratelimit.RateLimitBudget`
+
+    :param client: The :class:`discord.Client` whose dialogs to observe once
+        installed.
+    :param latency_bounds: Bucket bounds for the histograms of durations.
+    :param call_bounds: Bucket bounds for the histogram of REST calls.
+    :param max_runs: Maximal number of runs to keep track of at once. Runs that
+        never end, e.g. because their task was cancelled, are dropped when this is
+        exceeded.
+    """
+
+    def __init__(
+        self,
+        client: discord.Client = None,
+        latency_bounds: Iterable[float] = LATENCY_BOUNDS,
+        call_bounds: Iterable[float] = CALL_BOUNDS,
+        max_runs: int = 10000,
+    ):
+        super().__init__(client)
+        self._latency_bounds = tuple(latency_bounds)
+        self.max_runs = max_runs
+
+        self.time_to_interactive = Histogram(self._latency_bounds)
+        self.click_to_render = Histogram(self._latency_bounds)
+        self.api_calls = Histogram(call_bounds)
+        self.request_duration: Dict[str, Histogram] = {}
+        self.events = Counter()
+        self.sheds = Counter()
+
+        self._runs: "OrderedDict[int, _Run]" = OrderedDict()
+
+    def _run(self, dialog) -> _Run:
+        run = self._runs.get(id(dialog))
+        if run is None:
+            run = self._runs[id(dialog)] = _Run()
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+
+        return run
+
+    def on_event(self, event: DialogEvent):
+        self.events[event.kind] += 1
+
+        if event.kind == PUBLISH:
+            self._runs.pop(id(event.dialog), None)  # a new run of the dialog
+
+        run = self._run(event.dialog)
+
+        if event.kind in REST_KINDS:
+            run.api_calls += 1
+            histogram = self.request_duration.get(event.kind)
+            if histogram is None:
+                histogram = Histogram(self._latency_bounds)
+                self.request_duration[event.kind] = histogram
+            histogram.observe(event.duration)
+
+        if event.kind == INTERACTIVE:
+            self.time_to_interactive.observe(event.duration)
+
+        elif event.kind == REPLY or (
+            event.kind == REACTION and not event.data.get("removed")
+        ):
+            if run.clicked_at is None:
+                run.clicked_at = event.timestamp
+
+        elif event.kind == EDIT and run.clicked_at is not None:
+            rendered_at = event.timestamp + event.duration
+            self.click_to_render.observe(rendered_at - run.clicked_at)
+            run.clicked_at = None
+
+        elif event.kind == SHED:
+            self.sheds[event.data["action"]] += 1
+
+        elif event.kind == RESULT:
+            self.api_calls.observe(run.api_calls)
+            self._runs.pop(id(event.dialog), None)
+
+    def to_dict(self) -> Dict[str, object]:
+        """
+        All metrics as a dictionary, e.g. for exporting them as JSON.
+
+        :rtype: :class:`dict`
+        """
+
+        return {
+            "time_to_interactive": self.time_to_interactive.to_dict(),
+            "click_to_render": self.click_to_render.to_dict(),
+            "api_calls": self.api_calls.to_dict(),
+            "request_duration": {
+                k: h.to_dict() for k, h in self.request_duration.items()
+            },
+            "events": dict(self.events),
+            "sheds": dict(self.sheds),
+        }
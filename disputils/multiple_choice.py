@@ -2,8 +2,22 @@ import discord
 from discord import Message, Client, TextChannel, User
 from discord.ext.commands import Context
 import asyncio
-from typing import Tuple, List, Optional, Union
+from typing import Dict, Set, Tuple, List, Optional, Union
 from .abc import Dialog
+from .metrics import REQUEST
+from .ratelimit import REMOVE_REACTION
+from .sources import ListOptionSource, OptionSource
+
+
+# keycap digits 1-9 and the keycap ten emoji
+NUMBER_EMOJIS: Tuple[str, ...] = tuple(f"{i}\u20e3" for i in range(1, 10)) + (
+    "\U0001f51f",
+)
+# regional indicator letters A-Z
+LETTER_EMOJIS: Tuple[str, ...] = tuple(chr(0x1F1E6 + i) for i in range(26))
+
+_NUMBER_INDEX: Dict[str, int] = {e: i for i, e in enumerate(NUMBER_EMOJIS)}
+_LETTER_INDEX: Dict[str, int] = {e: i for i, e in enumerate(LETTER_EMOJIS)}
 
 
 class MultipleChoice(Dialog):
@@ -22,6 +36,17 @@ class MultipleChoice(Dialog):
     :type options: list[:class:`str`]
     """
 
+    __slots__ = (
+        "options",
+        "title",
+        "description",
+        "_emojis",
+        "close_emoji",
+        "_choice",
+        "_tally",
+        "_votes",
+    )
+
     def __init__(
         self,
         client: Client,
@@ -46,30 +71,23 @@ class MultipleChoice(Dialog):
         self.close_emoji = "❌"
 
         self._choice = None
+        self._tally: List[int] = []
+        self._votes: Dict[int, Set[int]] = {}  # option indices by user ID
 
     def _parse_kwargs(self, **kwargs):
         self.message: Message = (
             kwargs.get("message") or kwargs.get("msg") or self.message
         )
 
-    def _generate_emojis(self) -> List[str]:
-        self._emojis.clear()
-
+    def _emoji_table(self) -> Tuple[Tuple[str, ...], Dict[str, int]]:
         if len(self.options) > 10:
-            for i in range(len(self.options)):  # generates unicode emojis [A,B,C,…]
-                hex_str = hex(224 + (6 + i))[2:]
-                emoji = b"\\U0001f1a".replace(b"a", bytes(hex_str, "utf-8"))
-                emoji = emoji.decode("unicode-escape")
-                self._emojis.append(emoji)
+            return LETTER_EMOJIS, _LETTER_INDEX  # [A,B,C,…]
 
-        else:
-            for i in range(len(self.options)):  # generates unicode emojis [1,2,3,…]
-                if i < 9:
-                    emoji = "x\u20e3".replace("x", str(i + 1))
-                else:
-                    emoji = "\U0001f51f"
+        return NUMBER_EMOJIS, _NUMBER_INDEX  # [1,2,3,…]
 
-                self._emojis.append(emoji)
+    def _generate_emojis(self) -> List[str]:
+        emojis, _ = self._emoji_table()
+        self._emojis[:] = emojis[: len(self.options)]
 
         return self._emojis
 
@@ -101,6 +119,10 @@ class MultipleChoice(Dialog):
 
         return self._choice
 
+    def _result(self) -> Tuple[Optional[str], Message]:
+        self._finish(self._choice)
+        return self._choice, self.message
+
     async def run(
         self,
         users: Union[User, List[User]] = None,
@@ -130,7 +152,7 @@ class MultipleChoice(Dialog):
         :rtype: tuple[:class:`str`, :class:`discord.Message`]
         """
 
-        if type(users) == User:
+        if isinstance(users, User):
             users = [users]
 
         self._parse_kwargs(**kwargs)
@@ -141,50 +163,214 @@ class MultipleChoice(Dialog):
         if "text" in kwargs:
             publish_kwargs["content"] = kwargs["text"]
 
+        self._start_interaction()
         await self._publish(channel, **publish_kwargs)
 
-        for emoji in self._emojis:
-            await self.message.add_reaction(emoji)
-
+        emojis = list(self._emojis)
         if closable:
-            await self.message.add_reaction(self.close_emoji)
-
-        def check(r: discord.RawReactionActionEvent):
-            res = (
-                r.message_id == self.message.id
-            ) and r.user_id != self._client.user.id
-
-            if users is not None:
-                res = res and (r.user_id in [_u.id for _u in users])
-
-            is_valid_emoji = str(r.emoji) in self._emojis
-            if closable:
-                is_valid_emoji = is_valid_emoji or str(r.emoji) == self.close_emoji
+            emojis.append(self.close_emoji)
 
-            res = res and is_valid_emoji
-
-            return res
+        user_ids = {_u.id for _u in users} if users is not None else None
 
         try:
-            reaction = await self._client.wait_for(
-                "raw_reaction_add", check=check, timeout=timeout
-            )
+            with self._listen(emojis, user_ids) as listener:
+                self._manage(user_ids)
+                self._seed_reactions(emojis)
+                self._mark_interactive()
+                reaction = await self._wait(listener, timeout)
         except asyncio.TimeoutError:
+            await self._stop_seeding()
             self._choice = None
             if "timeout_msg" in kwargs:
                 await self.quit(kwargs["timeout_msg"])
-            return None, self.message
+            return self._result()
+        finally:
+            self._stop_interaction()
+
+        await self._stop_seeding()
+
+        if reaction is None:  # closed by the dialog manager
+            self._choice = None
+            await self.quit(self._close_msg)
+            return self._result()
 
         if str(reaction.emoji) == self.close_emoji:
             self._choice = None
             if "quit_msg" in kwargs:
                 await self.quit(kwargs["quit_msg"])
-            return None, self.message
+            return self._result()
 
-        index = self._emojis.index(str(reaction.emoji))
-        self._choice = self.options[index]
+        _, emoji_index = self._emoji_table()
+        self._choice = self.options[emoji_index[str(reaction.emoji)]]
 
-        return self._choice, self.message
+        return self._result()
+
+    @property
+    def tally(self) -> Dict[str, int]:
+        """ Number of votes for each option in the last poll. """
+
+        return dict(zip(self.options, self._tally))
+
+    def _tally_embed(self) -> discord.Embed:
+        embed = self.embed.copy()
+        embed.clear_fields()
+
+        for emoji, option, count in zip(self._emojis, self.options, self._tally):
+            embed.add_field(name=f"{emoji} {count}", value=option, inline=False)
+
+        return embed
+
+    async def _refresh(self, text: Optional[str], interval: float):
+        """ Display the tally after ``interval``, with all votes until then. """
+
+        await asyncio.sleep(interval)
+        await self.display(text, self._tally_embed())
+
+    def _count_vote(
+        self, reaction: discord.RawReactionActionEvent, index: int, one_vote: bool
+    ) -> bool:
+        """ Apply a reaction to the tally. Return whether it changed. """
+
+        votes = self._votes.setdefault(reaction.user_id, set())
+
+        if reaction.event_type == "REACTION_REMOVE":
+            if index not in votes:
+                return False  # e.g. removed because the user voted for another
+
+            votes.discard(index)
+            self._tally[index] -= 1
+            return True
+
+        if index in votes:
+            return False
+
+        if one_vote:
+            for other in votes:
+                self._tally[other] -= 1
+                if self._shedding(REMOVE_REACTION):
+                    continue
+                self._spawn(
+                    self._request(
+                        REQUEST,
+                        self.message.remove_reaction(
+                            self._emojis[other], discord.Object(reaction.user_id)
+                        ),
+                        method="remove_reaction",
+                    )
+                )
+            votes.clear()
+
+        votes.add(index)
+        self._tally[index] += 1
+        return True
+
+    async def poll(
+        self,
+        users: Union[User, List[User]] = None,
+        channel: TextChannel = None,
+        **kwargs
+    ) -> Tuple[Dict[str, int], Message]:
+        """
+        Run the dialog as a poll, counting the votes of all users until it closes.
+
+        Votes are counted as reactions are added and removed, so the message
+        doesn't need to be fetched again. The displayed tally is refreshed at most
+        once per ``refresh_interval``.
+
+        :param users: Users that can vote (default: `None`).
+            If this is ``None``: Any user can vote.
+
+        :type users: list[:class:`discord.User`]
+
+        :param channel: The channel to send the message to.
+        :type channel: :class:`discord.TextChannel`, optional
+
+        :param kwargs:
+            - message :class:`discord.Message`
+            - timeout :class:`int` (seconds until the poll closes, default: ``60``)
+            - closable :class:`bool`: Whether users can close the poll early
+              (default: ``False``)
+            - one_vote :class:`bool`: Only count the latest vote of each user and
+              remove their other reactions (default: ``False``)
+            - refresh_interval :class:`float` (seconds, default: ``5``)
+            - text :class:`str`: Text to appear in the message.
+
+        :return: number of votes for each option and used :class:`discord.Message`
+        :rtype: tuple[dict[:class:`str`, :class:`int`], :class:`discord.Message`]
+        """
+
+        if isinstance(users, User):
+            users = [users]
+
+        self._parse_kwargs(**kwargs)
+        timeout = kwargs.get("timeout", 60)
+        closable: bool = kwargs.get("closable", False)
+        one_vote: bool = kwargs.get("one_vote", False)
+        refresh_interval: float = kwargs.get("refresh_interval", 5)
+        text = kwargs.get("text")
+
+        self._tally = [0] * len(self.options)
+        self._votes = {}
+        self._embed = None
+
+        publish_kwargs = {"embed": self._tally_embed()}
+        if text is not None:
+            publish_kwargs["content"] = text
+
+        self._start_interaction()
+        await self._publish(channel, **publish_kwargs)
+
+        _, emoji_index = self._emoji_table()
+        emojis = list(self._emojis)
+        if closable:
+            emojis.append(self.close_emoji)
+
+        user_ids = {_u.id for _u in users} if users is not None else None
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        refreshing: Optional[asyncio.Future] = None
+
+        try:
+            with self._listen(emojis, user_ids, removals=True) as listener:
+                self._manage(user_ids)
+                self._seed_reactions(emojis)
+                self._mark_interactive()
+
+                while True:
+                    try:
+                        reaction = await self._wait(
+                            listener, max(deadline - loop.time(), 0)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+
+                    if reaction is None:  # closed by the dialog manager
+                        break
+
+                    emoji = str(reaction.emoji)
+                    if emoji == self.close_emoji:
+                        if reaction.event_type == "REACTION_ADD":
+                            break
+                        continue
+
+                    self._touch()
+                    changed = self._count_vote(reaction, emoji_index[emoji], one_vote)
+                    if changed and (refreshing is None or refreshing.done()):
+                        refreshing = self._spawn(self._refresh(text, refresh_interval))
+        finally:
+            self._stop_interaction()
+
+        await self._cancel_tasks()
+        await self._stop_seeding()
+
+        if self._closed:
+            await self.quit(self._close_msg)
+        else:
+            await self.display(text, self._tally_embed())
+
+        self._finish(self.tally)
+        return self.tally, self.message
 
 
 class BotMultipleChoice(MultipleChoice):
@@ -192,6 +378,8 @@ class BotMultipleChoice(MultipleChoice):
     Same as :class:`MultipleChoice`, except for the discord.py commands extension.
     """
 
+    __slots__ = ("_ctx",)
+
     def __init__(
         self, ctx: Context, options: list, title: str, description: str = "", **kwargs
     ):
@@ -210,3 +398,286 @@ class BotMultipleChoice(MultipleChoice):
             channel = self._ctx.channel
 
         return await super().run(users, channel, **kwargs)
+
+
+class PaginatedMultipleChoice(Dialog):
+    """
+    A multiple choice dialog for many options, which are split into pages of up to
+    ten options.
+
+    Options are numbered on every page, so the same number reactions are used for
+    all pages and are only added once, along with controls to turn the page.
+    Options are only loaded for the displayed page.
+
+    :param options: Options to choose from, as a list of :class:`str` or an
+        :class:`~disputils.sources.OptionSource` loading them on demand.
+    :param title: Embed title.
+    :type title: :class:`str`
+    :param description: Embed description.
+    :type description: :class:`str`
+    :param per_page: Number of options per page, at most ``10``.
+    :type per_page: :class:`int`
+    """
+
+    __slots__ = (
+        "options",
+        "title",
+        "description",
+        "per_page",
+        "previous_emoji",
+        "next_emoji",
+        "close_emoji",
+        "_source",
+        "_page_index",
+        "_page_options",
+        "_option_count",
+        "_choice",
+    )
+
+    def __init__(
+        self,
+        client: Client,
+        options: Union[List[str], OptionSource],
+        title: str,
+        description: str = "",
+        *,
+        per_page: int = 10,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+
+        if not 0 < per_page <= len(NUMBER_EMOJIS):
+            raise ValueError(f"per_page must be between 1 and {len(NUMBER_EMOJIS)}")
+
+        self._client: Client = client
+        self.options = options
+        self.title: str = title
+        self.description: str = description
+        self.per_page: int = per_page
+
+        self.message: Optional[Message] = kwargs.get("message") or kwargs.get("msg")
+
+        self.previous_emoji = "◀"
+        self.next_emoji = "▶"
+        self.close_emoji = "❌"
+
+        if isinstance(options, OptionSource):
+            self._source: OptionSource = options
+        else:
+            self._source = ListOptionSource(options)
+
+        self._page_index = 0
+        self._page_options: List[str] = []
+        self._option_count: Optional[int] = None
+        self._choice = None
+
+    @property
+    def embed(self) -> Optional[discord.Embed]:
+        """ The embed of the displayed page. """
+
+        return self._embed
+
+    @property
+    def choice(self) -> Optional[str]:
+        """ The option that the user chose. """
+
+        return self._choice
+
+    def _result(self) -> Tuple[Optional[str], Message]:
+        self._finish(self._choice)
+        return self._choice, self.message
+
+    @property
+    def page_index(self) -> int:
+        """ Index of the displayed page. """
+
+        return self._page_index
+
+    def _page_count(self) -> Optional[int]:
+        if self._option_count is None:
+            return None
+
+        return max(-(-self._option_count // self.per_page), 1)
+
+    def _is_last_page(self) -> bool:
+        page_count = self._page_count()
+        if page_count is None:
+            return len(self._page_options) < self.per_page
+
+        return self._page_index >= page_count - 1
+
+    async def _load_page(self, index: int) -> bool:
+        """ Load the options of a page, if it has any. """
+
+        options = await self._source.get_options(index * self.per_page, self.per_page)
+        if self._option_count is None:
+            self._option_count = await self._source.get_option_count()
+
+        if not options and index > 0:
+            return False
+
+        self._page_index = index
+        self._page_options = list(options)
+        self._embed = self._generate_embed()
+        return True
+
+    def _generate_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title=self.title, description=self.description, color=self.color
+        )
+
+        for emoji, option in zip(NUMBER_EMOJIS, self._page_options):
+            embed.add_field(name=emoji, value=option, inline=False)
+
+        page_count = self._page_count()
+        embed.set_footer(
+            text=f"({self._page_index + 1}/{page_count if page_count else '?'})"
+        )
+
+        return embed
+
+    async def run(
+        self,
+        users: Union[User, List[User]] = None,
+        channel: TextChannel = None,
+        **kwargs
+    ) -> Tuple[Optional[str], Message]:
+        """
+        Run the multiple choice dialog.
+
+        :param users: Users that can use the reactions (default: `None`).
+            If this is ``None``: Any user can interact.
+        :type users: list[:class:`discord.User`]
+
+        :param channel: The channel to send the message to.
+        :type channel: :class:`discord.TextChannel`, optional
+
+        :param kwargs:
+            - message :class:`discord.Message`
+            - timeout :class:`int` (seconds, default: ``60``),
+            - closable :class:`bool` (default: ``True``)
+            - text :class:`str`: Text to appear in the message.
+            - timeout_msg :class:`str`: Text to appear when dialog times out.
+            - quit_msg :class:`str`: Text to appear when user quits the dialog.
+
+        :return: selected option and used :class:`discord.Message`
+        :rtype: tuple[:class:`str`, :class:`discord.Message`]
+        """
+
+        if isinstance(users, User):
+            users = [users]
+
+        self.message = kwargs.get("message") or kwargs.get("msg") or self.message
+        timeout = kwargs.get("timeout", 60)
+        closable: bool = kwargs.get("closable", True)
+        text = kwargs.get("text")
+
+        self._start_interaction()
+        self._choice = None
+        await self._load_page(0)
+
+        publish_kwargs = {"embed": self._embed}
+        if text is not None:
+            publish_kwargs["content"] = text
+        await self._publish(channel, **publish_kwargs)
+
+        if self._is_last_page():  # everything fits on one page
+            emojis = list(NUMBER_EMOJIS[: len(self._page_options)])
+        else:
+            emojis = [
+                *NUMBER_EMOJIS[: self.per_page],
+                self.previous_emoji,
+                self.next_emoji,
+            ]
+        if closable:
+            emojis.append(self.close_emoji)
+
+        user_ids = {_u.id for _u in users} if users is not None else None
+
+        try:
+            with self._listen(emojis, user_ids) as listener:
+                self._manage(user_ids)
+                self._seed_reactions(emojis)
+                self._mark_interactive()
+
+                while True:
+                    reaction = await self._wait(listener, timeout)
+                    if reaction is None or str(reaction.emoji) == self.close_emoji:
+                        break
+
+                    self._touch()
+                    emoji = str(reaction.emoji)
+
+                    if emoji in _NUMBER_INDEX:
+                        index = _NUMBER_INDEX[emoji]
+                        if index < len(self._page_options):
+                            self._choice = self._page_options[index]
+                            break
+
+                    elif emoji == self.previous_emoji and self._page_index > 0:
+                        await self._load_page(self._page_index - 1)
+                        self._spawn(self.display(text, self._embed))
+
+                    elif emoji == self.next_emoji and not self._is_last_page():
+                        if await self._load_page(self._page_index + 1):
+                            self._spawn(self.display(text, self._embed))
+
+                    if reaction.member:
+                        self._spawn(self._remove_reaction(reaction))
+
+        except asyncio.TimeoutError:
+            await self._cancel_tasks()
+            await self._stop_seeding()
+            if "timeout_msg" in kwargs:
+                await self.quit(kwargs["timeout_msg"])
+            return self._result()
+
+        finally:
+            self._stop_interaction()
+
+        await self._cancel_tasks()
+        await self._stop_seeding()
+
+        if reaction is None:  # closed by the dialog manager
+            await self.quit(self._close_msg)
+            return self._result()
+
+        if self._choice is None:
+            if "quit_msg" in kwargs:
+                await self.quit(kwargs["quit_msg"])
+            return self._result()
+
+        return self._result()
+
+
+class BotPaginatedMultipleChoice(PaginatedMultipleChoice):
+    """
+    Same as :class:`PaginatedMultipleChoice`, except for the discord.py commands
+    extension.
+    """
+
+    __slots__ = ("_ctx",)
+
+    def __init__(
+        self,
+        ctx: Context,
+        options: Union[List[str], OptionSource],
+        title: str,
+        description: str = "",
+        **kwargs
+    ):
+        super().__init__(ctx.bot, options, title, description, **kwargs)
+
+        self._ctx = ctx
+
+    async def run(
+        self,
+        users: Union[User, List[User]] = None,
+        channel: TextChannel = None,
+        **kwargs
+    ) -> Tuple[Optional[str], Message]:
+
+        if self.message is None and channel is None:
+            channel = self._ctx.channel
+
+        return await super().run(users, channel, **kwargs)
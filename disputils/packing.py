@@ -0,0 +1,365 @@
+from collections import namedtuple
+from discord import Embed
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Union
+
+
+# see https://discord.com/developers/docs/resources/channel#embed-limits
+EMBED_TOTAL_LIMIT = 6000
+EMBED_FIELDS_LIMIT = 25
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+
+FOOTER_RESERVE = 32  # space left on pages for the footer added by the paginator
+# rows a field value can show, with at least one character and a newline per row
+FIELD_ROWS_LIMIT = (FIELD_VALUE_LIMIT + 1) // 2
+
+EMPTY = "\u200b"  # zero width space, Discord doesn't accept empty field names/values
+
+
+Field = namedtuple("Field", ("name", "value", "inline"), defaults=(True,))
+
+Column = namedtuple(
+    "Column", ("key", "header", "align", "format", "width"), defaults=(None,) * 4
+)
+Column.__doc__ = """
+A column of a table.
+
+- ``key``: dictionary key, attribute name or index of the column's value in a row
+- ``header``: heading of the column, ``str(key)`` by default
+- ``align``: ``"<"``, ``">"`` or ``"^"`` to align cells left (default), right or
+  centered in code-block tables
+- ``format``: format spec like ``",d"`` or ``".2f"``, or a function turning the
+  value into a string
+- ``width``: maximal width of the column, longer cells are truncated
+"""
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """
+    Lazily split an iterable into lists of at most ``size`` elements.
+
+    Unlike :meth:`~disputils.EmbedPaginator.generate_sub_lists` this accepts any
+    iterable, including generators, and only holds one chunk at a time.
+
+    :param iterable: the elements
+    :param size: maximal length of a chunk
+    :type size: :class:`int`
+
+    :rtype: Iterator[:class:`list`]
+    """
+
+    if size < 1:
+        raise ValueError("size must be at least 1")
+
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+
+    return text[: limit - 1] + "…"
+
+
+def _split_value(value: str, limit: int = FIELD_VALUE_LIMIT) -> Iterator[str]:
+    """ Split a field value into parts of max. ``limit`` characters, on newlines. """
+
+    while len(value) > limit:
+        cut = value.rfind("\n", 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        yield value[:cut]
+        value = value[cut:].lstrip("\n")
+
+    yield value
+
+
+def _to_field(item: Any) -> Field:
+    if isinstance(item, Field):
+        return item
+
+    if isinstance(item, dict):
+        return Field(item["name"], item["value"], item.get("inline", True))
+
+    return Field(*item)
+
+
+def _fields_of(item: Any) -> Iterator[Field]:
+    """ Normalize an item to fields that fit the field limits. """
+
+    name, value, inline = _to_field(item)
+    name = _truncate(str(name), FIELD_NAME_LIMIT) or EMPTY
+    value = str(value) or EMPTY
+
+    for part in _split_value(value):
+        yield Field(name, part or EMPTY, inline)
+        name = EMPTY  # continuation of a value that was too long for one field
+
+
+def pack_fields(
+    items: Iterable,
+    *,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    color: Optional[int] = None,
+    field: Callable[[Any], Any] = None,
+    max_fields: int = EMBED_FIELDS_LIMIT,
+    reserve: int = FOOTER_RESERVE,
+) -> Iterator[Embed]:
+    """
+    Lazily pack fields into as few embeds as possible, without exceeding Discord's
+    embed limits.
+
+    Items are consumed one at a time and each embed is yielded as soon as it is full,
+    so this works for iterators of any length. The input is never modified.
+
+    Values longer than a field allows are continued in further fields, overlong
+    names are truncated.
+
+    .. code-block:: py
+
+        rows = db.execute("SELECT name, score FROM leaderboard")
+        pages = pack_fields(rows, title="Leaderboard", field=lambda r: (r[0], r[1]))
+        paginator = EmbedPaginator(client, IterPageSource(pages))
+
+    :param items: Fields as :class:`Field`, ``(name, value[, inline])`` tuples or
+        dictionaries with ``name``, ``value`` and optionally ``inline`` keys.
+    :param title: Title of every page.
+    :param description: Description of every page.
+    :param color: Color of every page.
+    :param field: Function to turn each item into a field first, e.g. for database
+        rows.
+    :param max_fields: Maximal number of fields per page, must not be larger than
+        25.
+    :param reserve: Number of characters to leave free on each page, e.g. for the
+        footer added by the paginator.
+
+    :rtype: Iterator[:class:`discord.Embed`]
+    """
+
+    if not 0 < max_fields <= EMBED_FIELDS_LIMIT:
+        raise ValueError(f"max_fields must be between 1 and {EMBED_FIELDS_LIMIT}")
+
+    kwargs = {}
+    header_size = reserve
+    if title is not None:
+        kwargs["title"] = _truncate(title, TITLE_LIMIT)
+        header_size += len(kwargs["title"])
+    if description is not None:
+        kwargs["description"] = _truncate(description, DESCRIPTION_LIMIT)
+        header_size += len(kwargs["description"])
+    if color is not None:
+        kwargs["color"] = color
+
+    if header_size + FIELD_NAME_LIMIT + FIELD_VALUE_LIMIT > EMBED_TOTAL_LIMIT:
+        raise ValueError("title and description leave too little space for fields")
+
+    page_fields: List[Field] = []
+    size = header_size
+
+    for item in items:
+        if field is not None:
+            item = field(item)
+
+        for f in _fields_of(item):
+            field_size = len(f.name) + len(f.value)
+
+            if len(page_fields) == max_fields or size + field_size > EMBED_TOTAL_LIMIT:
+                yield _build_embed(kwargs, page_fields)
+                page_fields = []
+                size = header_size
+
+            page_fields.append(f)
+            size += field_size
+
+    if page_fields:
+        yield _build_embed(kwargs, page_fields)
+
+
+def _build_embed(kwargs: dict, fields: List[Field]) -> Embed:
+    embed = Embed(**kwargs)
+    for name, value, inline in fields:
+        embed.add_field(name=name, value=value, inline=inline)
+
+    return embed
+
+
+def _column(column: Union[Column, Any]) -> Column:
+    return column if isinstance(column, Column) else Column(column)
+
+
+def _value(row: Any, key: Any) -> Any:
+    if isinstance(key, int) or hasattr(row, "keys"):  # sequences, dicts, db rows
+        return row[key]
+
+    return getattr(row, key)
+
+
+def _cell(row: Any, column: Column) -> str:
+    value = _value(row, column.key)
+    if value is None:
+        text = ""
+    elif column.format is None:
+        text = str(value)
+    elif callable(column.format):
+        text = column.format(value)
+    else:
+        text = format(value, column.format)
+
+    text = text.replace("\n", " ")
+    if column.width is not None:
+        text = _truncate(text, column.width)
+
+    return text
+
+
+def _cells(rows: Iterable, columns: Sequence[Column]) -> Iterator[List[str]]:
+    for row in rows:
+        yield [_cell(row, column) for column in columns]
+
+
+def _header(column: Column) -> str:
+    header = str(column.key) if column.header is None else column.header
+    return header if column.width is None else _truncate(header, column.width)
+
+
+def format_table(
+    rows: Iterable,
+    columns: Sequence[Union[Column, Any]],
+    *,
+    code_block: bool = True,
+    max_size: int = DESCRIPTION_LIMIT,
+) -> str:
+    """
+    Render rows as a table with aligned columns, e.g. for an embed description.
+
+    The widths of the columns are taken from a single pass over the rows. If the
+    table would be longer than ``max_size``, the widest columns are narrowed and
+    their cells truncated until it fits.
+
+    .. code-block:: py
+
+        format_table(
+            [{"name": "Alice", "score": 1200}, {"name": "Bob", "score": 950}],
+            [Column("name", "Player"), Column("score", "Score", align=">")],
+        )
+
+    :param rows: Dictionaries, sequences or objects with the values of each row.
+    :param columns: :class:`Column` or just the key of each column.
+    :param code_block: Wrap the table in a code block, so it is rendered in a
+        monospace font.
+    :param max_size: Maximal number of characters of the table.
+
+    :raises ValueError: If the table can't be narrowed to ``max_size``.
+    :rtype: :class:`str`
+    """
+
+    columns = [_column(c) for c in columns]
+    headers = [_header(c) for c in columns]
+    cells = list(_cells(rows, columns))
+
+    widths = [len(h) for h in headers]
+    for row in cells:
+        for i, text in enumerate(row):
+            if len(text) > widths[i]:
+                widths[i] = len(text)
+
+    fences = len("```\n") + len("\n```") if code_block else 0
+    line_count = len(cells) + 2  # headers and rule
+
+    def size() -> int:
+        line = sum(widths) + 2 * (len(widths) - 1)
+        return (line + 1) * line_count - 1 + fences
+
+    while size() > max_size:
+        widest = max(range(len(widths)), key=widths.__getitem__)
+        if widths[widest] <= 1:
+            raise ValueError("the rows don't fit into max_size")
+        widths[widest] -= 1
+
+    def line(texts: List[str]) -> str:
+        parts = []
+        for text, column, width in zip(texts, columns, widths):
+            parts.append(f"{_truncate(text, width):{column.align or '<'}{width}}")
+        return "  ".join(parts).rstrip()
+
+    lines = [line(headers), "  ".join("-" * w for w in widths)]
+    lines.extend(line(row) for row in cells)
+
+    table = "\n".join(lines)
+    return f"```\n{table}\n```" if code_block else table
+
+
+def table_fields(
+    rows: Iterable,
+    columns: Sequence[Union[Column, Any]],
+    inline: bool = True,
+    *,
+    max_size: int = EMBED_TOTAL_LIMIT - FOOTER_RESERVE,
+) -> List[Field]:
+    """
+    Render rows as one field per column, which Discord shows side by side when
+    they are inline. Cells are truncated so each column fits into a field value,
+    and the widest columns are narrowed until all fields together fit into
+    ``max_size``.
+
+    :param rows: Dictionaries, sequences or objects with the values of each row.
+    :param columns: :class:`Column` or just the key of each column, at most 25.
+    :param inline: Whether the fields are inline.
+    :param max_size: Maximal number of characters of all field names and values,
+        e.g. what is left of an embed's limit next to its title and footer.
+
+    :raises ValueError: If there are more than :data:`FIELD_ROWS_LIMIT` rows, or
+        they can't be narrowed to ``max_size``.
+    :rtype: List[:class:`Field`]
+    """
+
+    columns = [_column(c) for c in columns]
+    if len(columns) > EMBED_FIELDS_LIMIT:
+        raise ValueError(f"there can't be more than {EMBED_FIELDS_LIMIT} columns")
+
+    names = [_truncate(_header(c), FIELD_NAME_LIMIT) or EMPTY for c in columns]
+    values: List[List[str]] = [[] for _ in columns]
+    for row in _cells(rows, columns):
+        for i, text in enumerate(row):
+            values[i].append(text or EMPTY)
+
+    if values and len(values[0]) > FIELD_ROWS_LIMIT:
+        raise ValueError(f"there can't be more than {FIELD_ROWS_LIMIT} rows")
+
+    widths = []
+    for texts in values:
+        size = sum(map(len, texts)) + len(texts) - 1
+        if size > FIELD_VALUE_LIMIT:
+            widths.append(max((FIELD_VALUE_LIMIT - len(texts) + 1) // len(texts), 1))
+        else:
+            widths.append(max(map(len, texts), default=len(EMPTY)))
+
+    def value_size(i: int) -> int:
+        texts = values[i]
+        size = sum(min(len(t), widths[i]) for t in texts) + len(texts) - 1
+        return max(size, len(EMPTY))  # a column without rows shows EMPTY
+
+    sizes = [value_size(i) for i in range(len(columns))]
+    names_size = sum(map(len, names))
+
+    while names_size + sum(sizes) > max_size:
+        widest = max(range(len(widths)), key=widths.__getitem__)
+        if widths[widest] <= 1:
+            raise ValueError("the rows don't fit into max_size")
+        widths[widest] -= 1
+        sizes[widest] = value_size(widest)
+
+    fields = []
+    for name, texts, width in zip(names, values, widths):
+        value = "\n".join(_truncate(t, width) for t in texts)
+        fields.append(Field(name, value or EMPTY, inline))
+
+    return fields
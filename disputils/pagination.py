@@ -2,16 +2,77 @@ import discord
 from discord.ext import commands
 import asyncio
 from copy import deepcopy
-from typing import List, Union
-from collections import namedtuple
-from .abc import Dialog
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from collections import namedtuple, OrderedDict
+from weakref import WeakKeyDictionary
+from .abc import Dialog, _current_task
+from .search import PageIndex
+from .shared import SharedPages
+from .sources import CompactPageSource, PageSource
+from .state import DialogState, LeasingStateStore, StateStore, is_expired
 
 
 ControlEmojis = namedtuple(
     "ControlEmojis",
-    ("first", "previous", "next", "last", "close"),
-    defaults=("⏮", "◀", "▶", "⏭", "⏹"),
+    ("first", "previous", "next", "last", "close", "skip_back", "skip_forward"),
+    defaults=("⏮", "◀", "▶", "⏭", "⏹", None, None),
 )
+ControlEmojis.__doc__ = """
+Emojis controlling an :class:`EmbedPaginator`. The skip controls, which go back or
+forward by several pages at once, are left out by default, e.g. use
+``ControlEmojis(skip_back="⏪", skip_forward="⏩")`` to add them.
+"""
+
+
+# recent fetches of pages by refreshing paginators, shared by all viewers of a source
+_fetches: "WeakKeyDictionary[PageSource, Dict[int, Tuple[float, asyncio.Future]]]" = (
+    WeakKeyDictionary()
+)
+
+
+async def _fetch(
+    source: PageSource, index: int
+) -> Tuple[int, discord.Embed, Optional[int]]:
+    page_count = await source.get_page_count()
+    if page_count is not None:
+        index = max(min(index, page_count - 1), 0)  # the source may have shrunk
+
+    return index, await source.get_page(index), page_count
+
+
+def _fetch_page(source: PageSource, index: int, max_age: float) -> asyncio.Future:
+    """
+    Fetch a page again, reusing a fetch of it that started less than ``max_age``
+    seconds ago.
+    """
+
+    now = asyncio.get_event_loop().time()
+    fetches = _fetches.get(source)
+    if fetches is None:
+        fetches = _fetches[source] = {}
+
+    fetched = fetches.get(index)
+    if fetched is not None and now - fetched[0] < max_age:
+        return fetched[1]
+
+    stale = [i for i, (started_at, _) in fetches.items() if now - started_at >= max_age]
+    for i in stale:
+        del fetches[i]
+
+    future = asyncio.ensure_future(_fetch(source, index))
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    fetches[index] = (now, future)
+    return future
+
+
+def _check_leases(state_store: Optional[StateStore]):
+    """ Make sure paginators with an ``owner`` can run under a lease. """
+
+    if not isinstance(state_store, LeasingStateStore):
+        raise TypeError(
+            f"An owner needs a LeasingStateStore, got {type(state_store).__name__}."
+        )
 
 
 class EmbedPaginator(Dialog):
@@ -19,25 +80,138 @@ class EmbedPaginator(Dialog):
     Represents an interactive menu containing multiple embeds.
 
     :param client: The :class:`discord.Client` to use.
-    :param pages: A list of :class:`discord.Embed` to paginate through.
+    :param pages: A list of :class:`discord.Embed` to paginate through, or a
+        :class:`~disputils.sources.PageSource` building the pages on demand.
     :param message: An optional :class:`discord.Message` to edit.
         Otherwise a new message will be sent.
     :param control_emojis: :class:`ControlEmojis`, `tuple` or `list`
         containing control emojis to use, otherwise the default will be used.
         A value of `None` causes a reaction to be left out.
+    :param cache_size: Maximum number of pages to keep built when ``pages`` is a
+        :class:`~disputils.sources.PageSource` (default: ``5``).
+    :param state_store: A :class:`~disputils.state.StateStore` to persist the state
+        of the running paginator in, so it can be re-attached after a restart with
+        :meth:`reattach_all`.
+    :param source_ref: A reference to ``pages`` stored with the state, used to
+        get the pages again when re-attaching.
+    :param compact: Store a list of pages in serialized form and only build the
+        displayed page, to save memory while the paginator is idle.
+        See :class:`~disputils.sources.CompactPageSource`.
+    :param compress: Also compress the stored pages in compact mode.
+    :param skip_size: Number of pages the skip controls go back or forward.
+    :param jump: Let users go to a page by replying to the paginator message with
+        its number.
+    :param search: Let users go to a page by replying to the paginator message
+        with text on it. The first matching page is shown, replying with the same
+        text again shows the next one. ``True`` indexes the pages when they are
+        searched for the first time, which builds every page of a
+        :class:`~disputils.sources.PageSource` once. Pass a
+        :class:`~disputils.search.PageIndex` to use a prepared index instead.
+    :param shared: Use the same copy of a list of pages, and of their formatted
+        versions, as other paginators showing equal pages, e.g. the many
+        instances of a help menu. See :class:`~disputils.shared.SharedPages`.
+        Not applicable to page sources or in compact mode.
+    :param refresh_interval: Seconds after which the displayed page is fetched
+        again from a :class:`~disputils.sources.PageSource` that changes over
+        time, e.g. for a dashboard. The message is only edited if the page
+        changed. Paginators showing the same page of the same source share
+        fetches, so the page is fetched once per interval however many users
+        view it. For a list of pages, replaced pages are shown. A single page is
+        refreshed as well, until the timeout, but without navigation controls.
+    :param owner: Name of this process, to run the paginator under a lease from
+        ``state_store`` so that only one of several processes runs it. The store
+        must be a :class:`~disputils.state.LeasingStateStore`. See
+        :meth:`reattach_all` and :meth:`hand_over`.
+    :param lease_ttl: Seconds a lease lasts. It is renewed while the paginator
+        runs, every third of this time.
+    :param kwargs: Options of every dialog, e.g. ``seed_concurrency`` or
+        ``observer``. See :class:`~disputils.abc.Dialog`.
     """
 
+    __slots__ = (
+        "_pages",
+        "_page_set",
+        "_holding",
+        "_formatted_cache",
+        "_formatted_count",
+        "_window",
+        "_loading",
+        "_prefetching",
+        "_page_count",
+        "_page_index",
+        "_navigation",
+        "_search_index",
+        "_last_query",
+        "cache_size",
+        "skip_size",
+        "jump",
+        "search",
+        "shared",
+        "refresh_interval",
+        "owner",
+        "lease_ttl",
+        "_leased",
+        "_handed_over",
+        "state_store",
+        "source_ref",
+        "control_emojis",
+    )
+
     def __init__(
         self,
         client: discord.Client,
-        pages: [discord.Embed],
+        pages: Union[List[discord.Embed], PageSource],
         message: discord.Message = None,
         *,
         control_emojis: Union[ControlEmojis, tuple, list] = ControlEmojis(),
+        cache_size: int = 5,
+        state_store: StateStore = None,
+        source_ref: str = None,
+        compact: bool = False,
+        compress: bool = False,
+        skip_size: int = 10,
+        jump: bool = False,
+        search: Union[bool, PageIndex] = False,
+        shared: bool = False,
+        refresh_interval: float = None,
+        owner: str = None,
+        lease_ttl: float = 30,
+        **kwargs
     ):
-        super().__init__()
+        super().__init__(**kwargs)
+
+        if owner is not None:
+            _check_leases(state_store)
+
+        if compact and not isinstance(pages, PageSource):
+            pages = CompactPageSource(pages, compress)
+            cache_size = 1
 
         self._client = client
+        self._page_set: Optional[SharedPages] = None
+        self._holding = False  # whether the page set counts this paginator
+        self._formatted_cache: Dict[int, Tuple[discord.Embed, discord.Embed]] = {}
+        self._formatted_count = 0
+        self._window: OrderedDict = OrderedDict()  # LRU of pages built by a source
+        self._loading: Dict[int, asyncio.Future] = {}
+        self._prefetching: Set[asyncio.Future] = set()
+        self._page_count: Optional[int] = None
+        self._page_index = 0
+        self._navigation = 0
+        self._search_index: Optional[PageIndex] = None
+        self._last_query: Optional[str] = None
+        self.cache_size = cache_size
+        self.skip_size = skip_size
+        self.jump = jump
+        self.search = search
+        self.shared = shared
+        self.refresh_interval = refresh_interval
+        self.owner = owner
+        self.lease_ttl = lease_ttl
+        self._leased = False
+        self._handed_over = False
+        self.state_store = state_store
+        self.source_ref = source_ref
         self.pages = pages
         self.message = message
 
@@ -62,29 +236,363 @@ class EmbedPaginator(Dialog):
                     control_emojis[2],
                 )
             else:
-                control_emojis += (None,) * (5 - len(control_emojis))
+                control_emojis += (None,) * (
+                    len(ControlEmojis._fields) - len(control_emojis)
+                )
                 self.control_emojis = ControlEmojis(*control_emojis)
 
+    @property
+    def pages(self) -> Union[List[discord.Embed], PageSource]:
+        """ The embeds or page source to paginate through. """
+
+        return self._pages
+
+    @pages.setter
+    def pages(self, pages: Union[List[discord.Embed], PageSource]):
+        holding = self._holding
+        self._release_pages()
+        self._page_set = None
+        if self.shared and not isinstance(pages, PageSource):
+            self._page_set = SharedPages.get(pages, self._format_page)
+            pages = self._page_set.pages
+            if holding:  # replaced while running
+                self._hold_pages()
+
+        self._pages = pages
+        self._formatted_cache.clear()
+        self._window.clear()
+        self._loading.clear()
+        self._page_count = None
+        self._search_index = None
+
     @property
     def formatted_pages(self) -> List[discord.Embed]:
-        """ The embeds with formatted footers to act as pages. """
+        """
+        The embeds with formatted footers to act as pages.
 
-        pages = deepcopy(self.pages)  # copy by value not reference
-        for page in pages:
-            if page.footer.text == discord.Embed.Empty:
-                page.set_footer(text=f"({pages.index(page)+1}/{len(pages)})")
+        .. note::
+
+            The returned embeds are cached, so they must not be modified. Prefer
+            :meth:`formatted_page` if you only need a single page.
+
+            Not available when :attr:`pages` is a
+            :class:`~disputils.sources.PageSource`.
+        """
+
+        self._ensure_list_pages()
+        return [self.formatted_page(i) for i in range(len(self._pages))]
+
+    def formatted_page(self, index: int) -> discord.Embed:
+        """
+        Get a single page with a formatted footer.
+
+        Pages are formatted the first time they are requested and cached until
+        :attr:`pages` is changed.
+
+        :param index: index of the page
+        :type index: :class:`int`
+
+        :rtype: :class:`discord.Embed`
+        """
+
+        self._ensure_list_pages()
+        if self._page_set is not None:
+            return self._page_set.formatted_page(index)
+
+        page_count = len(self._pages)
+        index = range(page_count)[index]  # normalizes negative indices
+        page = self._pages[index]
+
+        if page_count != self._formatted_count:  # footers contain the page count
+            self._formatted_cache.clear()
+            self._formatted_count = page_count
+
+        cached = self._formatted_cache.get(index)
+        if cached is not None and cached[0] is page:
+            return cached[1]
+
+        formatted = self._format_page(page, index, page_count)
+        self._formatted_cache[index] = (page, formatted)
+
+        return formatted
+
+    @staticmethod
+    def _format_page(
+        page: discord.Embed, index: int, page_count: Optional[int]
+    ) -> discord.Embed:
+        page = deepcopy(page)  # copy by value not reference
+        if page_count is None:  # streamed pages
+            page_count = "?"
+
+        if page.footer.text == discord.Embed.Empty:
+            page.set_footer(text=f"({index+1}/{page_count})")
+        elif page.footer.icon_url == discord.Embed.Empty:
+            page.set_footer(text=f"{page.footer.text} - ({index+1}/{page_count})")
+        else:
+            page.set_footer(
+                icon_url=page.footer.icon_url,
+                text=f"{page.footer.text} - ({index+1}/{page_count})",
+            )
+        return page
+
+    def _hold_pages(self):
+        if self._page_set is not None and not self._holding:
+            self._page_set.hold()
+            self._holding = True
+
+    def _release_pages(self):
+        if self._page_set is not None and self._holding:
+            self._page_set.release()
+            self._holding = False
+
+    def _start_interaction(self):
+        super()._start_interaction()
+        self._hold_pages()
+
+    def _stop_interaction(self):
+        super()._stop_interaction()
+        self._release_pages()
+
+    def _ensure_list_pages(self):
+        if isinstance(self._pages, PageSource):
+            raise TypeError(
+                "Pages are built by a PageSource, use get_page() to build them."
+            )
+
+    async def get_page_count(self) -> Optional[int]:
+        """
+        Get the number of pages.
+
+        :return: The number of pages, or ``None`` if the page source doesn't know it
+            yet.
+        :rtype: Optional[:class:`int`]
+        """
+
+        if not isinstance(self._pages, PageSource):
+            return len(self._pages)
+
+        if self._page_count is None:
+            self._page_count = await self._pages.get_page_count()
+            if self._page_count is not None:
+                self._window.clear()  # footers of built pages lack the page count
+
+        return self._page_count
+
+    async def get_page(self, index: int) -> discord.Embed:
+        """
+        Get a single page with a formatted footer.
+
+        Unlike :meth:`formatted_page` this also works for a
+        :class:`~disputils.sources.PageSource`, in which case only the
+        ``cache_size`` most recently used pages are kept.
+
+        :param index: index of the page
+        :type index: :class:`int`
+
+        :rtype: :class:`discord.Embed`
+        """
+
+        if not isinstance(self._pages, PageSource):
+            return self.formatted_page(index)
+
+        page_count = await self.get_page_count()
+        if page_count is not None:
+            index = range(page_count)[index]
+        elif index < 0:
+            raise IndexError("the last page of the source isn't known yet")
+
+        if index in self._window:
+            self._window.move_to_end(index)
+            return self._window[index]
+
+        return await self._load_page(index)
+
+    def _load_page(self, index: int) -> asyncio.Future:
+        future = self._loading.get(index)
+
+        if future is None:
+            future = asyncio.ensure_future(self._build_page(index))
+            self._loading[index] = future
+            future.add_done_callback(lambda _: self._loading.pop(index, None))
+
+        return future
+
+    async def _build_page(self, index: int) -> discord.Embed:
+        page = await self._pages.get_page(index)
+        page = self._format_page(page, index, await self.get_page_count())
+        self._cache_page(index, page)
+
+        return page
+
+    def _cache_page(self, index: int, page: discord.Embed):
+        self._window[index] = page
+        self._window.move_to_end(index)
+        while len(self._window) > max(self.cache_size, 1):
+            self._window.popitem(last=False)
+
+    def _prefetch(self, *indices: int):
+        """ Start building pages in the background so they are ready when needed. """
+
+        if not isinstance(self._pages, PageSource) or not self._pages.prefetch:
+            return
+
+        for index in indices:
+            if index < 0 or index in self._window:
+                continue
+
+            if self._page_count is None or index < self._page_count:
+                future = self._load_page(index)
+                self._prefetching.add(future)
+                future.add_done_callback(self._prefetch_done)
+
+    def _prefetch_done(self, future: asyncio.Future):
+        self._prefetching.discard(future)
+        if not future.cancelled():
+            future.exception()  # failed pages are built again when requested
+
+    async def _has_page(self, index: int) -> bool:
+        try:
+            await self.get_page(index)
+        except IndexError:
+            return False
+
+        return True
+
+    async def _get_last_index(self) -> int:
+        """ Find the index of the last page, consuming streamed pages if needed. """
+
+        index = max(self._page_index, 0)
+        while await self.get_page_count() is None:
+            try:
+                await self._pages.get_page(index + 1)
+            except IndexError:
+                break
+            index += 1
+
+        page_count = await self.get_page_count()
+        return page_count - 1 if page_count is not None else index
+
+    async def get_search_index(self) -> PageIndex:
+        """
+        Get the index used to search the pages, indexing them if needed.
+
+        :rtype: :class:`~disputils.search.PageIndex`
+        """
+
+        if isinstance(self.search, PageIndex):
+            return self.search
+
+        if self._search_index is None:
+            if isinstance(self._pages, PageSource):
+                self._search_index = await PageIndex.from_source(self._pages)
             else:
-                page_index = pages.index(page)
-                if page.footer.icon_url == discord.Embed.Empty:
-                    page.set_footer(
-                        text=f"{page.footer.text} - ({page_index+1}/{len(pages)})"
-                    )
-                else:
-                    page.set_footer(
-                        icon_url=page.footer.icon_url,
-                        text=f"{page.footer.text} - ({page_index+1}/{len(pages)})",
-                    )
-        return pages
+                self._search_index = PageIndex.from_pages(self._pages)
+
+        return self._search_index
+
+    async def find_page(self, query: str, start: int = 0) -> Optional[int]:
+        """
+        Find the first page containing some text, see
+        :meth:`~disputils.search.PageIndex.find`.
+
+        :param query: Text to search for.
+        :param start: index of the page to start at
+        :type start: :class:`int`
+
+        :return: Index of the page, or ``None`` if no page matches.
+        :rtype: Optional[:class:`int`]
+        """
+
+        index = await self.get_search_index()
+        return index.find(query, start)
+
+    async def _reply_target(self, message: discord.Message) -> Optional[int]:
+        """ Get the index of the page a user replied with, if any. """
+
+        content = message.content.strip()
+
+        if self.jump:
+            try:
+                number = int(content)
+            except ValueError:
+                pass
+            else:
+                if number < 1:
+                    return None
+                page_count = await self.get_page_count()
+                if page_count is not None:
+                    number = min(number, page_count)
+                return number - 1
+
+        if not self.search or not content:
+            return None
+
+        # searching again for the same text goes on to the next match
+        query = content.casefold()
+        start = self._page_index + 1 if query == self._last_query else 0
+        self._last_query = query
+
+        return await self.find_page(query, start)
+
+    def _control_order(self) -> List[str]:
+        """ The control emojis, in the order their reactions are added. """
+
+        e = self.control_emojis
+        order = (
+            e.first,
+            e.skip_back,
+            e.previous,
+            e.next,
+            e.skip_forward,
+            e.last,
+            e.close,
+        )
+        return [emoji for emoji in order if emoji is not None]
+
+    async def _refresh(self, text: Optional[str]):
+        """ Show the latest version of the displayed page, periodically. """
+
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+
+            navigation = self._navigation
+            try:
+                index, page = await self._fetch_current()
+            except Exception as exc:  # try again in the next interval
+                asyncio.get_event_loop().call_exception_handler(
+                    {"message": "Exception while refreshing page", "exception": exc}
+                )
+                continue
+
+            if page is None or navigation != self._navigation:
+                continue  # the user navigated elsewhere meanwhile
+
+            self._page_index = index
+            await self.display(text, page)
+
+    async def _fetch_current(self) -> Tuple[int, Optional[discord.Embed]]:
+        index = self._page_index
+
+        if not isinstance(self._pages, PageSource):
+            if not self._pages:
+                return index, None
+            index = min(index, len(self._pages) - 1)
+            return index, self.formatted_page(index)
+
+        index, page, page_count = await asyncio.shield(
+            _fetch_page(self._pages, index, self.refresh_interval)
+        )
+        if page_count != self._page_count:
+            self._page_count = page_count
+            self._window.clear()  # footers of built pages show the old page count
+
+        page = self._format_page(page, index, page_count)
+        self._cache_page(index, page)
+        return index, page
+
+    def _cancel_prefetch(self):
+        for future in tuple(self._prefetching):
+            future.cancel()
 
     async def run(
         self,
@@ -118,84 +626,413 @@ class EmbedPaginator(Dialog):
         :return: None
         """
 
-        self._embed = self.pages[0]
+        self._start_interaction()
         text = kwargs.get("text")
+        try:
+            page_count = await self.get_page_count()
 
-        if len(self.pages) == 1:  # no pagination needed in this case
-            await self._publish(channel, content=text, embed=self._embed)
+            # no pagination needed in this case
+            single = page_count == 1 or (
+                page_count is None and not await self._has_page(1)
+            )
+            if single and not self.refresh_interval:
+                if isinstance(self._pages, PageSource):
+                    self._embed = await self._pages.get_page(0)
+                else:
+                    self._embed = self._pages[0]
+                await self._publish(channel, content=text, embed=self._embed)
+                self._stop_interaction()
+                self._finish()
+                return
+
+            if isinstance(self._pages, PageSource):
+                self._embed = await self.get_page(0)
+            else:
+                self._embed = self._pages[0]
+
+            channel = await self._publish(
+                channel, content=text, embed=await self.get_page(0)
+            )
+            self._page_index = 0
+            if not single:
+                self._prefetch(1, (page_count or 0) - 1)
+        except BaseException:  # e.g. a page failed to load, or the task was cancelled
+            self._stop_interaction()
+            self._cancel_prefetch()
+            if not self._done.done():
+                self._done.set_result(None)
+            raise
+
+        user_ids = {u.id for u in users} if len(users) > 0 else None
+        # a single page is only kept for refreshing it, without navigation controls
+        await self._paginate(channel, user_ids, timeout, seed=not single, **kwargs)
+
+    async def _paginate(
+        self,
+        channel: discord.abc.Messageable,
+        user_ids: Optional[Set[int]],
+        timeout: int,
+        seed: bool = True,
+        **kwargs,
+    ):
+        text = kwargs.get("text")
+        self._navigation = 0
+        self._last_query = None
+        self._handed_over = False
+
+        if not await self._claim_lease():  # another process runs the paginator
+            self._stop_interaction()
+            self._finish()
             return
 
-        channel = await self._publish(
-            channel, content=text, embed=self.formatted_pages[0]
+        emojis = self._control_order()
+        listener = self._listen(
+            emojis, user_ids, replies=self.jump or bool(self.search)
         )
-        current_page_index = 0
+        try:
+            self._manage(user_ids)
+            if seed:
+                self._seed_reactions(emojis)
+            self._mark_interactive()
+            await self._save_state(user_ids, text, timeout)
+            if self.refresh_interval:
+                self._spawn(self._refresh(text))
+            if self._leased:
+                self._spawn(self._keep_lease())
 
-        for emoji in self.control_emojis:
-            if emoji is not None:
-                await self.message.add_reaction(emoji)
+            while True:
+                try:
+                    reaction = await self._wait(listener, timeout)
+                except asyncio.TimeoutError:
+                    await self._cancel_tasks()
+                    await self._stop_seeding()
+                    await self._delete_state()
+                    clear = not isinstance(
+                        channel, discord.channel.DMChannel
+                    ) and not isinstance(channel, discord.channel.GroupChannel)
+                    await self._cleanup(
+                        self._close_message(
+                            self.message, kwargs.get("timeout_msg"), clear
+                        )
+                    )
+                    break
+
+                if reaction is None:  # closed by the dialog manager
+                    await self._cancel_tasks()
+                    if self._handed_over:  # left to another process
+                        break
+                    await self._delete_state()
+                    await self.quit(self._close_msg)
+                    break
+
+                self._touch()
+                if not isinstance(reaction, discord.RawReactionActionEvent):
+                    load_page_index = await self._reply_target(reaction)
+                    if load_page_index not in (None, self._page_index):
+                        self._navigate(text, load_page_index, user_ids, timeout)
+                    continue
+
+                emoji = str(reaction.emoji)
+                page_count = await self.get_page_count()
+                # index for the last page, unknown while pages are streamed
+                max_index = page_count - 1 if page_count is not None else None
+
+                if emoji == self.control_emojis[0]:
+                    load_page_index = 0
+
+                elif emoji == self.control_emojis[1]:
+                    load_page_index = (
+                        self._page_index - 1
+                        if self._page_index > 0
+                        else self._page_index
+                    )
+
+                elif emoji == self.control_emojis[2]:
+                    load_page_index = (
+                        self._page_index + 1
+                        if max_index is None or self._page_index < max_index
+                        else self._page_index
+                    )
+
+                elif emoji == self.control_emojis[3]:
+                    load_page_index = max_index
+
+                elif emoji == self.control_emojis.skip_back:
+                    load_page_index = max(self._page_index - self.skip_size, 0)
+
+                elif emoji == self.control_emojis.skip_forward:
+                    # past the end of streamed pages the last one is shown
+                    load_page_index = self._page_index + self.skip_size
+                    if max_index is not None:
+                        load_page_index = min(load_page_index, max_index)
+
+                else:
+                    await self._cancel_tasks()
+                    await self._delete_state()
+                    await self.quit(kwargs.get("quit_msg"))
+                    break
+
+                # the page is edited in the background, so further clicks are
+                # handled right away and only the latest page gets displayed
+                if load_page_index != self._page_index:  # e.g. not ◀ on page 1
+                    self._navigate(text, load_page_index, user_ids, timeout)
+
+                # even after no-op clicks, so the user can click the emoji again
+                if reaction.member:
+                    self._spawn(self._remove_reaction(reaction))
+        finally:
+            listener.close()
+            self._stop_interaction()
+            self._cancel_prefetch()
+            await self._cancel_tasks()
+            await self._stop_seeding()
+            await self._release_lease()
+
+        self._finish()
+
+    def _navigate(
+        self,
+        text: Optional[str],
+        index: Optional[int],
+        user_ids: Optional[Set[int]],
+        timeout: int,
+    ):
+        if index is not None:
+            self._page_index = index
+        self._navigation += 1
+        self._spawn(self._show_page(text, index, user_ids, timeout))
+
+    async def _show_page(
+        self,
+        text: Optional[str],
+        index: Optional[int],
+        user_ids: Optional[Set[int]] = None,
+        timeout: int = None,
+    ):
+        navigation = self._navigation
+
+        if index is None:  # last page of streamed pages
+            index = await self._get_last_index()
+
+        try:
+            page = await self.get_page(index)
+        except IndexError:  # went past the end of streamed pages
+            index = await self._get_last_index()
+            page = await self.get_page(index)
+
+        if navigation != self._navigation:
+            return  # the user already navigated elsewhere while the page was built
+
+        self._page_index = index
+        await self.display(text, page)
+        self._prefetch(index - 1, index + 1)
+        if navigation == self._navigation:  # otherwise saved by the later page
+            await self._save_state(user_ids, text, timeout)
+
+    async def _save_state(
+        self, user_ids: Optional[Iterable[int]], text: Optional[str], timeout: int
+    ):
+        if self.state_store is None:
+            return
 
-        def check(r: discord.RawReactionActionEvent):
-            res = (r.message_id == self.message.id) and (
-                str(r.emoji) in self.control_emojis
+        await self.state_store.save(
+            DialogState(
+                self.message.id,
+                self.message.channel.id,
+                self._page_index,
+                tuple(user_ids or ()),
+                self.source_ref,
+                text,
+                time.time() + timeout if timeout is not None else None,
             )
+        )
+
+    async def _delete_state(self):
+        if self.state_store is not None:
+            await self.state_store.delete(self.message.id)
+            await self._release_lease()
+
+    async def _claim_lease(self) -> bool:
+        if self.owner is None or self.state_store is None:
+            return True
 
-            if len(users) > 0:
-                res = res and r.user_id in [u1.id for u1 in users]
+        self._leased = await self.state_store.claim(
+            self.message.id, self.owner, self.lease_ttl
+        )
+        return self._leased
 
-            return res
+    async def _keep_lease(self):
+        """ Renew the lease while running, and stop once another process has it. """
 
         while True:
-            try:
-                reaction = await self._client.wait_for(
-                    "raw_reaction_add", check=check, timeout=timeout
-                )
-            except asyncio.TimeoutError:
-                if not isinstance(
-                    channel, discord.channel.DMChannel
-                ) and not isinstance(channel, discord.channel.GroupChannel):
-                    try:
-                        await self.message.clear_reactions()
-                    except discord.Forbidden:
-                        pass
-                if "timeout_msg" in kwargs:
-                    await self.display(kwargs["timeout_msg"])
+            await asyncio.sleep(self.lease_ttl / 3)
+            renewed = await self.state_store.renew(
+                self.message.id, self.owner, self.lease_ttl
+            )
+            if not renewed:
+                self._leased = False
+                self._handed_over = True
+                self._listener.close()
                 return
 
-            emoji = str(reaction.emoji)
-            max_index = len(self.pages) - 1  # index for the last page
+    async def _release_lease(self):
+        if self._leased:
+            self._leased = False
+            await self.state_store.release(self.message.id, self.owner)
 
-            if emoji == self.control_emojis[0]:
-                load_page_index = 0
+    async def hand_over(self):
+        """
+        Stop running the paginator without cleaning up its message or state, and
+        release its lease, so another process can continue it with
+        :meth:`reattach_all`, e.g. during a rolling restart.
 
-            elif emoji == self.control_emojis[1]:
-                load_page_index = (
-                    current_page_index - 1
-                    if current_page_index > 0
-                    else current_page_index
-                )
+        :rtype: ``None``
+        """
 
-            elif emoji == self.control_emojis[2]:
-                load_page_index = (
-                    current_page_index + 1
-                    if current_page_index < max_index
-                    else current_page_index
-                )
+        if not self.running:
+            return
 
-            elif emoji == self.control_emojis[3]:
-                load_page_index = max_index
+        self._handed_over = True
+        self._close()
 
-            else:
-                await self.quit(kwargs.get("quit_msg"))
-                return
+        task = self._task
+        if task is not None and task is not _current_task() and not task.done():
+            await asyncio.wait((self._done, task), return_when=asyncio.FIRST_COMPLETED)
 
-            await self.display(text, self.formatted_pages[load_page_index])
-            if reaction.member:
-                try:
-                    await self.message.remove_reaction(emoji, reaction.member)
-                except discord.Forbidden:
-                    pass
+    @classmethod
+    async def reattach(
+        cls,
+        client: discord.Client,
+        state: DialogState,
+        pages: Union[List[discord.Embed], PageSource],
+        timeout: int = 100,
+        **kwargs,
+    ):
+        """
+        Continue a paginator from its stored state, e.g. after a restart.
 
-            current_page_index = load_page_index
+        The existing message is used as it is, without sending it again or adding
+        the control reactions again. This returns when the paginator ends, like
+        :meth:`run`.
+
+        :param client: The :class:`discord.Client` to use.
+        :param state: The stored :class:`~disputils.state.DialogState`.
+        :param pages: The pages to paginate through, as referenced by
+            ``state.source``.
+        :param timeout: Seconds to wait until stopping to listen for user
+            interaction.
+        :param kwargs: Keyword arguments for the paginator, like ``state_store``
+            and ``control_emojis``, and for :meth:`run`, like ``timeout_msg``.
+
+        :return: None
+        """
+
+        run_kwargs = {
+            key: kwargs.pop(key) for key in ("timeout_msg", "quit_msg") if key in kwargs
+        }
+        if state.text is not None:
+            run_kwargs["text"] = state.text
+
+        channel = client.get_channel(state.channel_id)
+        if channel is None:
+            channel = await client.fetch_channel(state.channel_id)
+
+        paginator = cls(
+            client,
+            pages,
+            channel.get_partial_message(state.message_id),
+            source_ref=state.source,
+            **kwargs,
+        )
+        paginator._start_interaction()
+
+        page_count = await paginator.get_page_count()
+        paginator._page_index = (
+            min(state.page_index, page_count - 1)
+            if page_count is not None
+            else state.page_index
+        )
+        paginator._prefetch(paginator._page_index - 1, paginator._page_index + 1)
+
+        await paginator._paginate(
+            channel, set(state.user_ids) or None, timeout, seed=False, **run_kwargs
+        )
+
+    @classmethod
+    async def reattach_all(
+        cls,
+        client: discord.Client,
+        state_store: StateStore,
+        get_pages: Callable[[str], Union[List[discord.Embed], PageSource]],
+        timeout: int = 100,
+        **kwargs,
+    ) -> List[asyncio.Task]:
+        """
+        Re-attach to all paginators with a state in ``state_store`` which haven't
+        timed out yet. States of paginators that have timed out are removed.
+
+        If an ``owner`` is passed, only paginators which no process holds a lease
+        on are re-attached, after claiming them. Paginators in channels the client
+        doesn't know are left to other processes, as they receive their reactions,
+        e.g. to the process running their shard. Call this periodically to take
+        over paginators of processes that stopped.
+
+        Call this once the client is ready, e.g. in ``on_ready``:
+
+        .. code-block:: py
+
+            store = SQLiteStateStore("dialogs.db")
+
+            @client.event
+            async def on_ready():
+                await EmbedPaginator.reattach_all(client, store, load_pages)
+
+        :param client: The :class:`discord.Client` to use.
+        :param state_store: The store the states have been saved to.
+        :param get_pages: Function returning the pages for a ``source_ref``.
+        :param timeout: Seconds to wait until stopping to listen for user
+            interaction.
+        :param kwargs: Keyword arguments for :meth:`reattach`.
+
+        :raises TypeError: If an ``owner`` is passed, but ``state_store`` isn't a
+            :class:`~disputils.state.LeasingStateStore`.
+        :return: The tasks running the re-attached paginators.
+        :rtype: List[:class:`asyncio.Task`]
+        """
+
+        owner = kwargs.get("owner")
+        lease_ttl = kwargs.get("lease_ttl", 30)
+        if owner is not None:
+            _check_leases(state_store)
+
+        tasks = []
+        for state in await state_store.all():
+            if is_expired(state):
+                await state_store.delete(state.message_id)
+                continue
+
+            if owner is not None:
+                if client.get_channel(state.channel_id) is None:
+                    continue
+                if await state_store.lease(state.message_id) is not None:
+                    continue  # running here or in another process
+                if not await state_store.claim(state.message_id, owner, lease_ttl):
+                    continue
+
+            tasks.append(
+                asyncio.ensure_future(
+                    cls.reattach(
+                        client,
+                        state,
+                        get_pages(state.source),
+                        timeout,
+                        state_store=state_store,
+                        **kwargs,
+                    )
+                )
+            )
+
+        return tasks
 
     @staticmethod
     def generate_sub_lists(origin_list: list, max_len: int = 25) -> List[list]:
@@ -204,6 +1041,9 @@ class EmbedPaginator(Dialog):
         elements with each sublist containing max. ``max_len`` elements.
 
         This can be used to easily split content for embed-fields across multiple pages.
+        The original list is not modified. To lazily split any iterable, or to pack
+        fields while respecting all embed limits, see :func:`disputils.chunked` and
+        :func:`disputils.pack_fields`.
 
         .. note::
 
@@ -222,19 +1062,12 @@ class EmbedPaginator(Dialog):
         :rtype: ``List[list]``
         """
 
-        if len(origin_list) > max_len:
-            sub_lists = []
+        if len(origin_list) <= max_len:
+            return [origin_list]
 
-            while len(origin_list) > max_len:
-                sub_lists.append(origin_list[:max_len])
-                del origin_list[:max_len]
-
-            sub_lists.append(origin_list)
-
-        else:
-            sub_lists = [origin_list]
-
-        return sub_lists
+        return [
+            origin_list[i : i + max_len] for i in range(0, len(origin_list), max_len)
+        ]
 
 
 class BotEmbedPaginator(EmbedPaginator):
@@ -248,8 +1081,12 @@ class BotEmbedPaginator(EmbedPaginator):
     :param control_emojis: :class:`ControlEmojis`, `tuple` or `list`
         containing control emojis to use, otherwise the default will be used.
         A value of `None` causes a reaction to be left out.
+    :param kwargs: Further keyword arguments of :class:`EmbedPaginator`, e.g.
+        ``shared``.
     """
 
+    __slots__ = ("_ctx",)
+
     def __init__(
         self,
         ctx: commands.Context,
@@ -257,11 +1094,12 @@ class BotEmbedPaginator(EmbedPaginator):
         message: discord.Message = None,
         *,
         control_emojis: Union[ControlEmojis, tuple, list] = ControlEmojis(),
+        **kwargs
     ):
         self._ctx = ctx
 
         super(BotEmbedPaginator, self).__init__(
-            ctx.bot, pages, message, control_emojis=control_emojis
+            ctx.bot, pages, message, control_emojis=control_emojis, **kwargs
         )
 
     async def run(
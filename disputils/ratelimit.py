@@ -0,0 +1,291 @@
+import asyncio
+import discord
+from collections import Counter, deque, namedtuple
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+from .extension import ClientExtension
+from .metrics import EDIT, PUBLISH, SEED
+
+
+REACTIONS = "reactions"  # adding and removing reactions of a message
+MESSAGES = "messages"  # sending, editing and deleting messages
+
+#: Optional calls dialogs shed under pressure, in the order they are shed.
+REMOVE_REACTION = "remove_reaction"  # removing a user's reaction after a click
+COALESCE = "coalesce"  # waiting longer between edits, so more of them coalesce
+PAUSE_SEEDING = "pause_seeding"  # waiting to add the control reactions
+
+_METHOD_ROUTES = {
+    "add_reaction": REACTIONS,
+    "remove_reaction": REACTIONS,
+    "clear_reactions": REACTIONS,
+    "send": MESSAGES,
+    "edit": MESSAGES,
+    "delete": MESSAGES,
+}
+_KIND_ROUTES = {SEED: REACTIONS, EDIT: MESSAGES, PUBLISH: MESSAGES}
+_SHED_ROUTES = {
+    REMOVE_REACTION: REACTIONS,
+    COALESCE: MESSAGES,
+    PAUSE_SEEDING: REACTIONS,
+}
+
+Limit = namedtuple("Limit", ("calls", "per"))
+Limit.__doc__ = """
+A rate limit of ``calls`` per ``per`` seconds.
+"""
+
+#: Limits of the routes used by dialogs, per channel.
+DEFAULT_LIMITS = {REACTIONS: Limit(4, 1.0), MESSAGES: Limit(5, 5.0)}
+
+#: Share of the budget of a route below which an optional call is shed.
+DEFAULT_THRESHOLDS = {REMOVE_REACTION: 0.5, COALESCE: 0.3, PAUSE_SEEDING: 0.2}
+
+
+def route_of(kind: str, method: str = None) -> Optional[str]:
+    """
+    Get the route of a REST call made by a dialog.
+
+    :param kind: The kind of :class:`~disputils.metrics.DialogEvent` of the call.
+    :param method: The method called, for events of kind ``"request"``.
+    :return: The route, or ``None`` if it isn't tracked.
+    :rtype: Optional[:class:`str`]
+    """
+
+    if method is not None:
+        return _METHOD_ROUTES.get(method)
+
+    return _KIND_ROUTES.get(kind)
+
+
+class RateLimitBudget(ClientExtension):
+    """
+    Tracks how much of the rate limits of Discord the dialogs of a client have left,
+    and makes them shed optional REST calls while it runs low.
+
+    Discord limits the calls to each route per channel, so all dialogs in a busy
+    channel share a budget. Calls are counted in a sliding window of each
+    ``limits`` entry, and a route is considered exhausted for a whole window after
+    a call to it was rate limited. When the share of a budget that is left drops
+    below the ``thresholds``, dialogs in the channel
+
+    1. stop removing the reactions of users after a click (``"remove_reaction"``),
+       so a user can't use the same control twice in a row,
+    2. wait up to ``coalesce_delay`` seconds before editing their message
+       (``"coalesce"``), so a burst of clicks results in a single edit,
+    3. pause adding their control reactions (``"pause_seeding"``).
+
+    Required calls, like showing the page a user asked for, are still made. Each
+    shed call is counted in :attr:`sheds` and passed to the observer of the dialog
+    as a ``"shed"`` event. The control reactions a dialog adds don't count against
+    the budget of that dialog itself, so seeding its controls doesn't make it shed
+    calls, but they do count for the other dialogs in the channel.
+
+    .. code-block:: py
+
+        budget = RateLimitBudget(client)
+        budget.install()
+
+    :param client: The :class:`discord.Client` whose dialogs to track.
+    :param limits: :class:`Limit` by route, see :data:`DEFAULT_LIMITS`.
+    :param thresholds: Share of the budget by shed call, see
+        :data:`DEFAULT_THRESHOLDS`.
+    :param coalesce_delay: Maximal seconds to delay an edit while ``"coalesce"``
+        is shed.
+    """
+
+    _extensions = WeakKeyDictionary()
+
+    def __init__(
+        self,
+        client: discord.Client,
+        limits: Dict[str, Limit] = None,
+        thresholds: Dict[str, float] = None,
+        coalesce_delay: float = 1.0,
+    ):
+        super().__init__(client)
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+        self.coalesce_delay = coalesce_delay
+        self.sheds = Counter()
+
+        # times of the calls, with the dialog that made them for its own controls
+        self._windows: Dict[Tuple[str, int], Deque[Tuple[float, Any]]] = {}
+        self._exhausted: Dict[Tuple[str, int], float] = {}  # until loop time
+        self._spent = 0
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_event_loop().time()
+
+    def _window(self, route: str, channel_id: int) -> Deque[Tuple[float, Any]]:
+        """ Calls in the current window, dropping older ones. """
+
+        window = self._windows.get((route, channel_id))
+        if window is None:
+            return deque()
+
+        start = self._now() - self.limits[route].per
+        while window and window[0][0] <= start:
+            window.popleft()
+
+        return window
+
+    def _calls(self, route: str, channel_id: int, exclude: Any) -> List[float]:
+        """ Times of the calls in the window, except the seeding of ``exclude``. """
+
+        window = self._window(route, channel_id)
+        if exclude is None:
+            return [t for t, _ in window]
+
+        return [t for t, seeder in window if seeder is not exclude]
+
+    def spend(self, route: str, channel_id: int, seeder: Any = None):
+        """
+        Count a call.
+
+        :param route: The route, e.g. ``"reactions"``.
+        :param channel_id: ID of the channel.
+        :param seeder: The dialog, if the call adds one of its own control
+            reactions.
+        :rtype: ``None``
+        """
+
+        if route not in self.limits:
+            return
+
+        key = (route, channel_id)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = deque()
+        window.append((self._now(), seeder))
+
+        self._spent += 1
+        if self._spent % 1000 == 0:
+            self._sweep()
+
+    def _sweep(self):
+        """ Forget channels without calls in their current window. """
+
+        now = self._now()
+        for key in [k for k in self._windows if not self._window(*k)]:
+            del self._windows[key]
+        for key in [k for k, until in self._exhausted.items() if until <= now]:
+            del self._exhausted[key]
+
+    def exhaust(self, route: str, channel_id: int, retry_after: float = None):
+        """
+        Mark a route as exhausted, e.g. after a call to it was rate limited.
+
+        :param route: The route.
+        :param channel_id: ID of the channel.
+        :param retry_after: Seconds until it can be used again, by default the
+            length of its window.
+        :rtype: ``None``
+        """
+
+        if route not in self.limits:
+            return
+
+        if retry_after is None:
+            retry_after = self.limits[route].per
+        self._exhausted[(route, channel_id)] = self._now() + retry_after
+
+    def remaining(self, route: str, channel_id: int, exclude: Any = None) -> float:
+        """
+        Get the share of the budget of a route that is left.
+
+        :param route: The route.
+        :param channel_id: ID of the channel.
+        :param exclude: A dialog whose calls for its own control reactions don't
+            count.
+        :return: A value between ``0`` and ``1``.
+        :rtype: :class:`float`
+        """
+
+        limit = self.limits.get(route)
+        if limit is None:
+            return 1.0
+
+        if self._exhausted.get((route, channel_id), 0) > self._now():
+            return 0.0
+
+        used = len(self._calls(route, channel_id, exclude))
+        return max(limit.calls - used, 0) / limit.calls
+
+    def recovery_time(self, route: str, channel_id: int, exclude: Any = None) -> float:
+        """
+        Get the seconds until the budget of a route grows again.
+
+        :param route: The route.
+        :param channel_id: ID of the channel.
+        :param exclude: A dialog whose calls for its own control reactions don't
+            count.
+        :rtype: :class:`float`
+        """
+
+        if route not in self.limits:
+            return 0.0
+
+        now = self._now()
+        until = self._exhausted.get((route, channel_id), 0)
+        if until > now:
+            return until - now
+
+        calls = self._calls(route, channel_id, exclude)
+        if not calls:
+            return 0.0
+
+        return max(calls[0] + self.limits[route].per - now, 0.0)
+
+    def should_shed(self, action: str, channel_id: int, exclude: Any = None) -> bool:
+        """
+        Whether an optional call should be shed.
+
+        :param action: The shed call, e.g. ``"remove_reaction"``.
+        :param channel_id: ID of the channel.
+        :param exclude: The dialog making the call, whose calls for its own control
+            reactions don't count.
+        :rtype: :class:`bool`
+        """
+
+        route = _SHED_ROUTES[action]
+        return self.remaining(route, channel_id, exclude) < self.thresholds[action]
+
+    async def wait(
+        self,
+        action: str,
+        channel_id: int,
+        exclude: Any = None,
+        max_delay: float = None,
+    ):
+        """
+        Wait until an optional call isn't shed anymore.
+
+        :param action: The shed call, e.g. ``"pause_seeding"``.
+        :param channel_id: ID of the channel.
+        :param exclude: The dialog making the call, whose calls for its own control
+            reactions don't count.
+        :param max_delay: Seconds after which to stop waiting anyway.
+        :rtype: ``None``
+        """
+
+        route = _SHED_ROUTES[action]
+        deadline = self._now() + max_delay if max_delay is not None else None
+        while self.should_shed(action, channel_id, exclude):
+            delay = max(self.recovery_time(route, channel_id, exclude), 0.01)
+            if deadline is not None:
+                delay = min(delay, deadline - self._now())
+                if delay <= 0:
+                    return
+            await asyncio.sleep(delay)
+
+    def record_shed(self, action: str):
+        """
+        Count a shed call.
+
+        :param action: The shed call.
+        :rtype: ``None``
+        """
+
+        self.sheds[action] += 1
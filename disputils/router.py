@@ -0,0 +1,344 @@
+import asyncio
+import discord
+from typing import Dict, Iterable, List, Optional, FrozenSet, Union
+from weakref import WeakKeyDictionary
+from .extension import ClientExtension
+
+
+_EVENTS = ("raw_reaction_add", "raw_reaction_remove")
+
+
+class _Route:
+    __slots__ = ("emojis", "user_ids", "removals", "queue")
+
+    def __init__(
+        self,
+        emojis: FrozenSet[str],
+        user_ids: Optional[FrozenSet[int]],
+        removals: bool,
+    ):
+        self.emojis = emojis
+        self.user_ids = user_ids
+        self.removals = removals
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+
+class ReactionRouter(ClientExtension):
+    """
+    Routes reaction events to dialogs by message id.
+
+    Without a router every running dialog registers its own
+    :meth:`discord.Client.wait_for` check, all of which are called for every
+    reaction the bot sees. Once a router is installed, dialogs of that client
+    register with it instead and a single listener looks up the dialog of each
+    event in a dictionary.
+
+    .. code-block:: py
+
+        router = ReactionRouter(client)
+        router.install()
+
+    :param client: The :class:`discord.Client` to route events for.
+    """
+
+    _extensions = WeakKeyDictionary()
+
+    def __init__(self, client: discord.Client):
+        super().__init__(client)
+        self._routes: Dict[int, _Route] = {}
+        self._taps: List[asyncio.Future] = []
+        self._installed = False
+
+    @property
+    def installed(self) -> bool:
+        """ Whether the router is receiving events. """
+
+        return self._installed
+
+    def __len__(self):
+        return len(self._routes)
+
+    def install(self):
+        """
+        Start receiving reaction events and make dialogs of the client use this
+        router.
+
+        For a :class:`discord.ext.commands.Bot` the router is added as a listener.
+        For a plain :class:`discord.Client` it receives the events through
+        :meth:`~discord.Client.wait_for` checks, so ``on_raw_reaction_add`` and
+        ``on_raw_reaction_remove`` events of the client, including ones registered
+        later, are left alone.
+
+        :rtype: ``None``
+        """
+
+        if self._installed:
+            return
+
+        other = self.of(self._client)
+        if other is not None:
+            other.uninstall()
+
+        if hasattr(self._client, "add_listener"):
+            for event in _EVENTS:
+                self._client.add_listener(self._on_reaction, f"on_{event}")
+        else:
+            # checks that never let wait_for finish see every event
+            self._taps = [
+                asyncio.ensure_future(self._client.wait_for(event, check=self._tap))
+                for event in _EVENTS
+            ]
+
+        super().install()
+        self._installed = True
+
+    def uninstall(self):
+        """
+        Stop receiving reaction events. Dialogs started afterwards fall back to
+        :meth:`discord.Client.wait_for`.
+
+        :rtype: ``None``
+        """
+
+        if not self._installed:
+            return
+
+        if hasattr(self._client, "remove_listener"):
+            for event in _EVENTS:
+                self._client.remove_listener(self._on_reaction, f"on_{event}")
+
+        for tap in self._taps:
+            tap.cancel()
+        self._taps.clear()
+
+        super().uninstall()
+        self._installed = False
+
+    def register(
+        self,
+        message_id: int,
+        emojis: Iterable[str],
+        user_ids: Optional[Iterable[int]] = None,
+        removals: bool = False,
+    ) -> asyncio.Queue:
+        """
+        Start routing reactions on a message.
+
+        :param message_id: ID of the message.
+        :param emojis: Emojis to route, others are ignored.
+        :param user_ids: IDs of the users allowed to react. ``None`` allows anyone
+            except the client user itself.
+        :param removals: Whether to route removed reactions as well.
+
+        :return: Queue receiving the matching
+            :class:`discord.RawReactionActionEvent`.
+        :rtype: :class:`asyncio.Queue`
+        """
+
+        route = _Route(
+            frozenset(emojis),
+            frozenset(user_ids) if user_ids is not None else None,
+            removals,
+        )
+        self._routes[message_id] = route
+
+        return route.queue
+
+    def unregister(self, message_id: int, queue: asyncio.Queue = None):
+        """
+        Stop routing reactions on a message.
+
+        :param message_id: ID of the message.
+        :param queue: Only unregister if the message is still routed to this queue.
+        :rtype: ``None``
+        """
+
+        route = self._routes.get(message_id)
+        if route is not None and (queue is None or route.queue is queue):
+            del self._routes[message_id]
+
+    def route(self, payload: discord.RawReactionActionEvent) -> bool:
+        """
+        Deliver a reaction event to the dialog it belongs to.
+
+        :param payload: The event.
+        :return: Whether the event has been delivered.
+        :rtype: :class:`bool`
+        """
+
+        route = self._routes.get(payload.message_id)
+        if route is None:
+            return False
+
+        if payload.event_type == "REACTION_REMOVE" and not route.removals:
+            return False
+
+        if route.user_ids is None:
+            if payload.user_id == self._client.user.id:
+                return False
+        elif payload.user_id not in route.user_ids:
+            return False
+
+        if str(payload.emoji) not in route.emojis:
+            return False
+
+        route.queue.put_nowait(payload)
+        return True
+
+    async def _on_reaction(self, payload: discord.RawReactionActionEvent):
+        self.route(payload)
+
+    def _tap(self, payload: discord.RawReactionActionEvent) -> bool:
+        self.route(payload)
+        return False
+
+
+class ReactionListener:
+    """
+    Waits for reactions on a single message, through the installed
+    :class:`ReactionRouter` if there is one, otherwise with
+    :meth:`discord.Client.wait_for`.
+
+    Reactions are queued from the moment the listener is created until it is
+    closed, so none get lost while the dialog handles an earlier one.
+
+    :param client: The client.
+    :param message_id: ID of the message.
+    :param emojis: Emojis to wait for.
+    :param user_ids: IDs of the users allowed to react. ``None`` allows anyone
+        except the client user itself.
+    :param removals: Whether to wait for removed reactions as well. Their
+        ``event_type`` is ``"REACTION_REMOVE"``.
+    :param replies: Whether to wait for messages replying to the message as well,
+        from the same users.
+    """
+
+    def __init__(
+        self,
+        client: discord.Client,
+        message_id: int,
+        emojis: Iterable[str],
+        user_ids: Optional[Iterable[int]] = None,
+        removals: bool = False,
+        replies: bool = False,
+    ):
+        self._client = client
+        self.message_id = message_id
+        self.emojis = frozenset(emojis)
+        self.user_ids = frozenset(user_ids) if user_ids is not None else None
+        self.removals = removals
+        self.replies = replies
+
+        self._closed = False
+        self._waiter: Optional[asyncio.Future] = None
+        self._router = ReactionRouter.of(client)
+        self._taps: List[asyncio.Future] = []
+        if self._router is not None:
+            self._queue = self._router.register(
+                message_id, self.emojis, self.user_ids, removals
+            )
+        else:
+            # reactions must not get lost between two waits, so they are collected
+            # by checks that never let wait_for finish
+            self._queue = asyncio.Queue()
+            self._taps = [
+                asyncio.ensure_future(client.wait_for(event, check=self._collect))
+                for event in (_EVENTS if removals else _EVENTS[:1])
+            ]
+
+        if replies:
+            self._taps.append(
+                asyncio.ensure_future(
+                    client.wait_for("message", check=self._collect_reply)
+                )
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _check(self, r: discord.RawReactionActionEvent) -> bool:
+        if r.message_id != self.message_id or str(r.emoji) not in self.emojis:
+            return False
+
+        if self.user_ids is None:
+            return r.user_id != self._client.user.id
+
+        return r.user_id in self.user_ids
+
+    def _collect(self, r: discord.RawReactionActionEvent) -> bool:
+        if self._check(r):
+            self._queue.put_nowait(r)
+
+        return False
+
+    def _collect_reply(self, m: discord.Message) -> bool:
+        reference = getattr(m, "reference", None)
+        if reference is None or reference.message_id != self.message_id:
+            return False
+
+        if self.user_ids is None:
+            allowed = m.author.id != self._client.user.id
+        else:
+            allowed = m.author.id in self.user_ids
+
+        if allowed:
+            self._queue.put_nowait(m)
+
+        return False
+
+    @property
+    def closed(self) -> bool:
+        """ Whether the listener has been closed. """
+
+        return self._closed
+
+    async def wait(
+        self, timeout: float = None
+    ) -> Optional[Union[discord.RawReactionActionEvent, discord.Message]]:
+        """
+        Wait for the next matching reaction, or reply if listening for them.
+
+        :param timeout: Seconds to wait.
+        :raises asyncio.TimeoutError: If no reaction arrives in time.
+        :return: The reaction or :class:`discord.Message`, or ``None`` if the
+            listener has been closed.
+        :rtype: Optional[Union[:class:`discord.RawReactionActionEvent`,
+            :class:`discord.Message`]]
+        """
+
+        if self._closed:
+            return None
+
+        self._waiter = asyncio.ensure_future(
+            asyncio.wait_for(self._queue.get(), timeout)
+        )
+        try:
+            return await self._waiter
+        except asyncio.CancelledError:
+            if self._closed and self._waiter.cancelled():
+                return None  # woken up by close()
+            raise
+        finally:
+            self._waiter = None
+
+    def close(self):
+        """
+        Stop listening. A pending :meth:`wait` returns ``None``.
+
+        :rtype: ``None``
+        """
+
+        self._closed = True
+        if self._waiter is not None:
+            self._waiter.cancel()
+
+        if self._router is not None:
+            self._router.unregister(self.message_id, self._queue)
+            self._router = None
+
+        for tap in self._taps:
+            tap.cancel()
+        self._taps.clear()
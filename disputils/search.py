@@ -0,0 +1,170 @@
+import re
+from bisect import bisect_left
+from discord import Embed
+from typing import Dict, Iterable, List, Optional, Set
+from .sources import PageSource
+
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.casefold())
+
+
+def page_text(page: Embed) -> str:
+    """
+    Get the searchable text of a page: its title, description and fields.
+
+    :param page: The page.
+    :rtype: :class:`str`
+    """
+
+    data = page.to_dict()
+    parts = [data.get("title", ""), data.get("description", "")]
+    for field in data.get("fields", ()):
+        parts.append(field.get("name", ""))
+        parts.append(field.get("value", ""))
+
+    return "\n".join(parts)
+
+
+class PageIndex:
+    """
+    Index of the words on the pages of an :class:`~disputils.EmbedPaginator`, to
+    find pages by text.
+
+    Each page is read once when it's added, so searching doesn't build the pages
+    again. A query matches the pages containing all of its words, each as a whole
+    word or as the start of one, ignoring case.
+
+    .. code-block:: py
+
+        index = PageIndex.from_pages(pages)
+        index.find("dragon")  # index of the first page mentioning dragons
+    """
+
+    __slots__ = ("_pages", "_sorted", "_page_count")
+
+    def __init__(self):
+        self._pages: Dict[str, Set[int]] = {}  # pages by word
+        self._sorted: Optional[List[str]] = None  # words, for looking up prefixes
+        self._page_count = 0
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[Embed]) -> "PageIndex":
+        """
+        Index a list of pages.
+
+        :param pages: The :class:`discord.Embed` to index.
+        :rtype: :class:`PageIndex`
+        """
+
+        index = cls()
+        for i, page in enumerate(pages):
+            index.add(i, page)
+
+        return index
+
+    @classmethod
+    async def from_source(cls, source: PageSource) -> "PageIndex":
+        """
+        Index all pages of a page source. Every page is built once, and streamed
+        sources are consumed to their end.
+
+        :param source: The :class:`~disputils.sources.PageSource`.
+        :rtype: :class:`PageIndex`
+        """
+
+        index = cls()
+        page_count = await source.get_page_count()
+
+        i = 0
+        while page_count is None or i < page_count:
+            try:
+                page = await source.get_page(i)
+            except IndexError:
+                break
+
+            index.add(i, page)
+            i += 1
+            if page_count is None:
+                page_count = await source.get_page_count()
+
+        return index
+
+    def __len__(self):
+        return self._page_count
+
+    def add(self, index: int, page: Embed):
+        """
+        Index a page.
+
+        :param index: index of the page
+        :type index: :class:`int`
+        :param page: The page.
+        :rtype: ``None``
+        """
+
+        for word in _words(page_text(page)):
+            pages = self._pages.get(word)
+            if pages is None:
+                pages = self._pages[word] = set()
+                self._sorted = None
+            pages.add(index)
+
+        self._page_count = max(self._page_count, index + 1)
+
+    def _lookup(self, prefix: str) -> Set[int]:
+        if self._sorted is None:
+            self._sorted = sorted(self._pages)
+
+        pages = set()
+        for i in range(bisect_left(self._sorted, prefix), len(self._sorted)):
+            word = self._sorted[i]
+            if not word.startswith(prefix):
+                break
+            pages |= self._pages[word]
+
+        return pages
+
+    def matches(self, query: str) -> List[int]:
+        """
+        Get the pages matching a query.
+
+        :param query: Text to search for.
+        :return: Indices of the matching pages, in ascending order.
+        :rtype: List[:class:`int`]
+        """
+
+        words = _words(query)
+        if not words:
+            return []
+
+        pages = self._lookup(words[0])
+        for word in words[1:]:
+            if not pages:
+                break
+            pages &= self._lookup(word)
+
+        return sorted(pages)
+
+    def find(self, query: str, start: int = 0) -> Optional[int]:
+        """
+        Find the first page matching a query, starting at a page and continuing
+        from the first page if none of the following ones matches.
+
+        :param query: Text to search for.
+        :param start: index of the page to start at
+        :type start: :class:`int`
+
+        :return: Index of the page, or ``None`` if no page matches.
+        :rtype: Optional[:class:`int`]
+        """
+
+        matches = self.matches(query)
+        for index in matches:
+            if index >= start:
+                return index
+
+        return matches[0] if matches else None
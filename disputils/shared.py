@@ -0,0 +1,151 @@
+import hashlib
+import json
+from collections import OrderedDict
+from copy import deepcopy
+from discord import Embed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+_active: Dict[str, "SharedPages"] = {}
+_idle: "OrderedDict[str, SharedPages]" = OrderedDict()
+
+
+def fingerprint(pages: Iterable[Embed]) -> str:
+    """
+    Identify the content of a list of pages.
+
+    :param pages: The :class:`discord.Embed` to identify.
+    :rtype: :class:`str`
+    """
+
+    digest = hashlib.sha256()
+    for page in pages:
+        digest.update(json.dumps(page.to_dict(), sort_keys=True).encode())
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+class SharedPages:
+    """
+    Immutable pages, shared by all paginators showing the same content.
+
+    Paginators created with ``shared=True`` look up the pages by a fingerprint of
+    their content, so paginators over equal pages use one copy of them and of
+    their formatted versions, even if each was given a freshly built list.
+
+    A set of pages counts the paginators running with it. Once none is left, it is
+    kept for new paginators until more than :attr:`max_idle` other sets are
+    unused as well.
+
+    :param key: Fingerprint of the pages.
+    :param pages: The pages, which are copied.
+    :param format_page: Function adding the footer to a page, called with the
+        page, its index and the page count.
+    """
+
+    __slots__ = ("key", "pages", "_format_page", "_formatted", "_refs")
+
+    #: Number of unused sets to keep.
+    max_idle = 32
+
+    def __init__(
+        self,
+        key: str,
+        pages: Iterable[Embed],
+        format_page: Callable[[Embed, int, int], Embed],
+    ):
+        self.key = key
+        self.pages: Tuple[Embed, ...] = tuple(deepcopy(page) for page in pages)
+        self._format_page = format_page
+        self._formatted: List[Optional[Embed]] = [None] * len(self.pages)
+        self._refs = 0
+
+    @classmethod
+    def get(
+        cls,
+        pages: Iterable[Embed],
+        format_page: Callable[[Embed, int, int], Embed],
+    ) -> "SharedPages":
+        """
+        Get the shared set of pages with the same content, creating it if there is
+        none.
+
+        :param pages: The :class:`discord.Embed` to share.
+        :param format_page: Function adding the footer to a page.
+        :rtype: :class:`SharedPages`
+        """
+
+        pages = list(pages)
+        key = fingerprint(pages)
+
+        shared = _active.get(key)
+        if shared is not None:
+            return shared
+
+        shared = _idle.get(key)
+        if shared is not None:
+            _idle.move_to_end(key)
+            return shared
+
+        shared = cls(key, pages, format_page)
+        _idle[key] = shared
+        cls._evict()
+        return shared
+
+    @classmethod
+    def _evict(cls):
+        while len(_idle) > cls.max_idle:
+            _idle.popitem(last=False)
+
+    @property
+    def refs(self) -> int:
+        """ Number of paginators running with these pages. """
+
+        return self._refs
+
+    def __len__(self):
+        return len(self.pages)
+
+    def hold(self):
+        """
+        Count a paginator running with these pages.
+
+        :rtype: ``None``
+        """
+
+        self._refs += 1
+        if self._refs == 1 and _active.get(self.key) is None:
+            _idle.pop(self.key, None)
+            _active[self.key] = self
+
+    def release(self):
+        """
+        Stop counting a paginator running with these pages.
+
+        :rtype: ``None``
+        """
+
+        self._refs -= 1
+        if self._refs == 0 and _active.get(self.key) is self:
+            del _active[self.key]
+            _idle[self.key] = self
+            self._evict()
+
+    def formatted_page(self, index: int) -> Embed:
+        """
+        Get a page with a formatted footer, formatting it on first use.
+
+        :param index: index of the page
+        :type index: :class:`int`
+
+        :rtype: :class:`discord.Embed`
+        """
+
+        index = range(len(self.pages))[index]  # normalizes negative indices
+        formatted = self._formatted[index]
+        if formatted is None:
+            formatted = self._format_page(self.pages[index], index, len(self.pages))
+            self._formatted[index] = formatted
+
+        return formatted
@@ -0,0 +1,594 @@
+import asyncio
+import json
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from discord import Embed
+from typing import (
+    IO,
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from .packing import (
+    DESCRIPTION_LIMIT,
+    EMBED_TOTAL_LIMIT,
+    FIELD_ROWS_LIMIT,
+    FOOTER_RESERVE,
+    TITLE_LIMIT,
+    Column,
+    format_table,
+    table_fields,
+    _column,
+    _truncate,
+)
+
+
+class PageSource(ABC):
+    """
+    Abstract base class for objects providing pages to an
+    :class:`~disputils.EmbedPaginator`.
+
+    Pages are requested one at a time and by index, so a source does not need to
+    build all of its pages up front.
+
+    The paginator builds the pages next to the displayed one in the background,
+    unless ``prefetch`` is set to ``False`` for sources that build pages cheaply.
+    """
+
+    prefetch = True
+
+    @abstractmethod
+    async def get_page_count(self) -> Optional[int]:
+        """
+        Get the total number of pages.
+
+        :return: The number of pages, or ``None`` if it isn't known yet, e.g. while
+            pages are still being streamed.
+        :rtype: Optional[:class:`int`]
+        """
+
+    @abstractmethod
+    async def get_page(self, index: int) -> Embed:
+        """
+        Build a single page.
+
+        :param index: index of the page, ``0 <= index < page_count``
+        :type index: :class:`int`
+
+        :raises IndexError: If there is no page with this index.
+        :rtype: :class:`discord.Embed`
+        """
+
+
+class ListPageSource(PageSource):
+    """
+    A page source serving already built embeds.
+
+    :param pages: A list of :class:`discord.Embed`.
+    """
+
+    prefetch = False
+
+    def __init__(self, pages: List[Embed]):
+        self.pages = pages
+
+    async def get_page_count(self) -> int:
+        return len(self.pages)
+
+    async def get_page(self, index: int) -> Embed:
+        return self.pages[index]
+
+
+class CallablePageSource(PageSource):
+    """
+    A page source that builds pages by calling a coroutine function.
+
+    :param get_page: A coroutine function taking a page index and returning a
+        :class:`discord.Embed`.
+    :param page_count: The total number of pages, or a coroutine function returning
+        it.
+    """
+
+    def __init__(
+        self,
+        get_page: Callable[[int], Awaitable[Embed]],
+        page_count: Union[int, Callable[[], Awaitable[int]]],
+    ):
+        self._get_page = get_page
+        self._page_count = page_count
+
+    async def get_page_count(self) -> int:
+        if callable(self._page_count):
+            return await self._page_count()
+
+        return self._page_count
+
+    async def get_page(self, index: int) -> Embed:
+        return await self._get_page(index)
+
+
+class CompactPageSource(PageSource):
+    """
+    A page source storing embeds in serialized form, to save memory when many
+    paginators are idle. Only requested pages are turned into embeds again.
+
+    :param pages: The :class:`discord.Embed` to store.
+    :param compress: Whether to compress the stored pages with zlib, which saves
+        more memory for pages with a lot of text.
+    """
+
+    prefetch = False
+
+    def __init__(self, pages: Iterable[Embed], compress: bool = False):
+        self._compress = compress
+        self._pages = tuple(self._dump(page) for page in pages)
+
+    def _dump(self, page: Embed) -> bytes:
+        data = json.dumps(page.to_dict(), separators=(",", ":")).encode()
+        return zlib.compress(data) if self._compress else data
+
+    def _load(self, data: bytes) -> Embed:
+        if self._compress:
+            data = zlib.decompress(data)
+        return Embed.from_dict(json.loads(data))
+
+    async def get_page_count(self) -> int:
+        return len(self._pages)
+
+    async def get_page(self, index: int) -> Embed:
+        return self._load(self._pages[index])
+
+
+class IterPageSource(PageSource):
+    """
+    A page source consuming an iterable or async iterable of embeds, e.g. from
+    :func:`~disputils.packing.pack_fields`.
+
+    Pages are only taken from the iterable when they are requested, so the number
+    of pages is unknown until the iterable is exhausted. Taken pages are kept to be
+    able to go back to them.
+
+    :param pages: An iterable or async iterable of :class:`discord.Embed`.
+    """
+
+    def __init__(self, pages: Union[Iterable[Embed], AsyncIterable[Embed]]):
+        if hasattr(pages, "__aiter__"):
+            self._iterator = pages.__aiter__()
+        else:
+            self._iterator = iter(pages)
+
+        self._pages: List[Embed] = []
+        self._exhausted = False
+
+    async def _next(self) -> Embed:
+        if hasattr(self._iterator, "__anext__"):
+            return await self._iterator.__anext__()
+
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def get_page_count(self) -> Optional[int]:
+        return len(self._pages) if self._exhausted else None
+
+    async def get_page(self, index: int) -> Embed:
+        if index < 0:
+            raise IndexError("negative page indices are not supported")
+
+        while index >= len(self._pages) and not self._exhausted:
+            try:
+                self._pages.append(await self._next())
+            except StopAsyncIteration:
+                self._exhausted = True
+
+        return self._pages[index]
+
+
+class _StringReader:
+    """ Minimal file-like reader over a string that doesn't copy it. """
+
+    def __init__(self, text: str):
+        self._text = text
+        self._pos = 0
+
+    def readline(self) -> str:
+        end = self._text.find("\n", self._pos) + 1 or len(self._text)
+        line = self._text[self._pos : end]
+        self._pos = end
+        return line
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, pos: int):
+        self._pos = pos
+
+    def seekable(self) -> bool:
+        return True
+
+
+class TextPageSource(PageSource):
+    """
+    A page source splitting long text, like logs or command output, into pages.
+
+    Text is split on line boundaries so each page fits into an embed description.
+    Lines that are too long by themselves are split as well. Code blocks that span
+    multiple pages are closed at the end of a page and reopened on the next one.
+
+    The text is only read as far as pages are requested. For strings and seekable
+    files just the position of each page is remembered and pages are read again
+    when they are needed, so memory does not grow with the size of the text. Pages
+    read from other sources, e.g. async iterators of lines, are kept to be able to
+    go back to them.
+
+    :param source: A string, a text file object, or an iterable or async iterable of
+        lines.
+    :param title: Title of every page.
+    :param color: Color of every page.
+    :param code_block: Wrap the whole text into code blocks with this language,
+        e.g. ``""`` for no syntax highlighting or ``"py"``.
+    :param max_size: Maximal number of characters per page.
+    """
+
+    _fence = "```"
+
+    def __init__(
+        self,
+        source: Union[str, IO[str], Iterable[str], AsyncIterable[str]],
+        *,
+        title: Optional[str] = None,
+        color: Optional[int] = None,
+        code_block: Optional[str] = None,
+        max_size: int = DESCRIPTION_LIMIT,
+    ):
+        if isinstance(source, str):
+            source = _StringReader(source)
+
+        self._seekable = hasattr(source, "readline") and source.seekable()
+        if hasattr(source, "readline"):
+            self._source = source
+        elif hasattr(source, "__aiter__"):
+            self._source = source.__aiter__()
+        else:
+            self._source = iter(source)
+
+        self.title = title
+        self.color = color
+        self.max_size = max_size
+
+        self._language: Optional[str] = code_block  # of the open code block
+        self._line: Optional[str] = None  # current line, if partially read
+        self._line_pos = None  # position of the current line in the source
+        self._offset = 0  # characters of the current line that have been read
+        self._lock: Optional[asyncio.Lock] = None
+
+        self._page_count: Optional[int] = None
+        self._texts: List[str] = []  # pages of sources that can't seek
+        self._checkpoints: List[Tuple] = []  # page start positions of the others
+        if self._seekable:
+            self._checkpoints.append(self._checkpoint())
+
+    async def _readline(self) -> str:
+        if hasattr(self._source, "readline"):
+            return self._source.readline()
+
+        try:
+            if hasattr(self._source, "__anext__"):
+                return await self._source.__anext__()
+            return next(self._source)
+        except (StopIteration, StopAsyncIteration):
+            return ""
+
+    async def _peek(self) -> Optional[str]:
+        """ Get the next part of a line that fits on a page, without consuming it. """
+
+        if self._line is None:
+            if self._seekable:
+                self._line_pos = self._source.tell()
+            line = await self._readline()
+            if not line:
+                return None
+
+            if not line.endswith("\n"):
+                line += "\n"  # lines of iterators may lack them, files' last line too
+            self._line, self._offset = line, 0
+
+        # long lines are split to leave space for opening and closing code blocks
+        segment_size = max(self.max_size // 2, 1)
+        return self._line[self._offset : self._offset + segment_size]
+
+    def _consume(self, segment: str):
+        self._offset += len(segment)
+        if self._offset >= len(self._line):
+            self._line = None
+
+    def _checkpoint(self) -> Tuple:
+        if self._line is None:
+            return self._source.tell(), 0, self._language
+
+        return self._line_pos, self._offset, self._language
+
+    async def _restore(self, checkpoint: Tuple):
+        pos, offset, self._language = checkpoint
+        self._source.seek(pos)
+        self._line = None
+
+        if offset:
+            await self._peek()
+            self._offset = offset
+
+    async def _read_page(self) -> str:
+        parts = []
+        if self._language is not None:
+            parts.append(f"{self._fence}{self._language}\n")
+
+        size = len(parts[0]) if parts else 0
+        budget = self.max_size - len(self._fence) - 1  # for closing the code block
+
+        while True:
+            line_start = self._line is None or self._offset == 0
+            segment = await self._peek()
+            if segment is None or (size + len(segment) > budget and size):
+                break
+
+            self._consume(segment)
+            parts.append(segment)
+            size += len(segment)
+
+            if line_start:
+                stripped = segment.strip()
+                if self._language is None and stripped.startswith(self._fence):
+                    self._language = stripped[len(self._fence) :]
+                elif stripped == self._fence:  # closing fences have no language
+                    self._language = None
+
+        text = "".join(parts).rstrip("\n")
+        if self._language is not None:
+            text += f"\n{self._fence}"
+
+        return text
+
+    async def _read_text(self, index: int) -> str:
+        if not self._seekable:
+            while len(self._texts) <= index and self._page_count is None:
+                self._texts.append(await self._read_page())
+                if await self._peek() is None:
+                    self._page_count = len(self._texts)
+
+            return self._texts[index]
+
+        if index < len(self._checkpoints):
+            await self._restore(self._checkpoints[index])
+        else:
+            await self._restore(self._checkpoints[-1])
+            while len(self._checkpoints) <= index:
+                await self._read_page()
+                if await self._peek() is None:
+                    self._page_count = len(self._checkpoints)
+                    raise IndexError("page index out of range")
+                self._checkpoints.append(self._checkpoint())
+
+        text = await self._read_page()
+        if index + 1 == len(self._checkpoints):  # remember where the next page starts
+            if await self._peek() is None:
+                self._page_count = index + 1
+            else:
+                self._checkpoints.append(self._checkpoint())
+
+        return text
+
+    async def get_page_count(self) -> Optional[int]:
+        return self._page_count
+
+    async def get_page(self, index: int) -> Embed:
+        if index < 0 or (self._page_count is not None and index >= self._page_count):
+            raise IndexError("page index out of range")
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:  # pages are read with a shared position
+            text = await self._read_text(index)
+
+        kwargs = {"description": text}
+        if self.title is not None:
+            kwargs["title"] = self.title
+        if self.color is not None:
+            kwargs["color"] = self.color
+
+        return Embed(**kwargs)
+
+
+class TablePageSource(PageSource):
+    """
+    A page source rendering rows of tabular data, like rankings or query results.
+
+    Each page shows ``per_page`` rows, either as a table in a code block with
+    aligned columns (``style="table"``) or as one inline field per column
+    (``style="fields"``). Pages are only rendered when they are requested, so a
+    large result only costs the pages that are viewed.
+
+    Rows of a sequence, e.g. a list, are sliced per page. Rows of other iterables
+    and async iterables, e.g. database cursors, are only consumed as far as pages
+    are requested, so the number of pages is unknown until they are exhausted.
+    Consumed rows are kept to be able to go back to them.
+
+    .. code-block:: py
+
+        source = TablePageSource(
+            rows,
+            [Column("name", "Player"), Column("score", "Score", align=">")],
+            title="Leaderboard",
+        )
+        paginator = EmbedPaginator(client, source)
+
+    :param rows: Dictionaries, sequences or objects with the values of each row.
+    :param columns: :class:`~disputils.packing.Column` or just the key of each
+        column.
+    :param per_page: Number of rows per page, at most
+        :data:`~disputils.packing.FIELD_ROWS_LIMIT` with ``style="fields"``.
+    :param style: ``"table"`` or ``"fields"``.
+    :param title: Title of every page.
+    :param color: Color of every page.
+    """
+
+    prefetch = False
+
+    def __init__(
+        self,
+        rows: Union[Iterable, AsyncIterable],
+        columns: Iterable[Union[Column, Any]],
+        *,
+        per_page: int = 15,
+        style: str = "table",
+        title: Optional[str] = None,
+        color: Optional[int] = None,
+    ):
+        if per_page < 1:
+            raise ValueError("per_page must be at least 1")
+        if style not in ("table", "fields"):
+            raise ValueError('style must be "table" or "fields"')
+        if style == "fields" and per_page > FIELD_ROWS_LIMIT:
+            raise ValueError(f"fields can't show more than {FIELD_ROWS_LIMIT} rows")
+
+        self.columns = [_column(c) for c in columns]
+        self.per_page = per_page
+        self.style = style
+        self.title = title
+        self.color = color
+
+        self._rows: Optional[Sequence] = None
+        self._iterator = None
+        if isinstance(rows, Sequence):
+            self._rows = rows
+        elif hasattr(rows, "__aiter__"):
+            self._iterator = rows.__aiter__()
+        else:
+            self._iterator = iter(rows)
+
+        self._chunks: List[list] = []  # rows of the pages consumed from iterators
+        self._page_count: Optional[int] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _next(self):
+        if hasattr(self._iterator, "__anext__"):
+            return await self._iterator.__anext__()
+
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def _read_chunk(self) -> list:
+        chunk = []
+        while len(chunk) < self.per_page:
+            try:
+                chunk.append(await self._next())
+            except StopAsyncIteration:
+                break
+
+        return chunk
+
+    async def _page_rows(self, index: int) -> list:
+        if self._rows is not None:
+            return self._rows[index * self.per_page : (index + 1) * self.per_page]
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:  # rows are consumed from a shared iterator
+            while len(self._chunks) <= index and self._page_count is None:
+                chunk = await self._read_chunk()
+                if chunk or not self._chunks:  # a table without rows has one page
+                    self._chunks.append(chunk)
+                if len(chunk) < self.per_page:
+                    self._page_count = len(self._chunks)
+
+        return self._chunks[index]
+
+    async def get_page_count(self) -> Optional[int]:
+        if self._rows is not None:
+            return max(-(-len(self._rows) // self.per_page), 1)
+
+        return self._page_count
+
+    async def get_page(self, index: int) -> Embed:
+        page_count = await self.get_page_count()
+        if index < 0 or (page_count is not None and index >= page_count):
+            raise IndexError("page index out of range")
+
+        rows = await self._page_rows(index)
+
+        kwargs = {}
+        if self.title is not None:
+            kwargs["title"] = _truncate(self.title, TITLE_LIMIT)
+        if self.color is not None:
+            kwargs["color"] = self.color
+
+        if self.style == "table":
+            return Embed(description=format_table(rows, self.columns), **kwargs)
+
+        max_size = EMBED_TOTAL_LIMIT - FOOTER_RESERVE - len(kwargs.get("title", ""))
+        embed = Embed(**kwargs)
+        for name, value, inline in table_fields(rows, self.columns, max_size=max_size):
+            embed.add_field(name=name, value=value, inline=inline)
+        return embed
+
+
+class OptionSource(ABC):
+    """
+    Abstract base class for objects providing options to a
+    :class:`~disputils.PaginatedMultipleChoice`.
+
+    Options are requested one page at a time, so a source does not need to load
+    all of its options up front.
+    """
+
+    @abstractmethod
+    async def get_option_count(self) -> Optional[int]:
+        """
+        Get the total number of options.
+
+        :return: The number of options, or ``None`` if it isn't known. A page with
+            fewer options than requested is then the last one.
+        :rtype: Optional[:class:`int`]
+        """
+
+    @abstractmethod
+    async def get_options(self, offset: int, limit: int) -> List[str]:
+        """
+        Get a slice of the options.
+
+        :param offset: index of the first option
+        :type offset: :class:`int`
+        :param limit: maximal number of options to return
+        :type limit: :class:`int`
+
+        :return: The options, empty if ``offset`` is past the last option.
+        :rtype: List[:class:`str`]
+        """
+
+
+class ListOptionSource(OptionSource):
+    """
+    An option source serving a list of options.
+
+    :param options: A list of :class:`str`.
+    """
+
+    def __init__(self, options: List[str]):
+        self.options = options
+
+    async def get_option_count(self) -> int:
+        return len(self.options)
+
+    async def get_options(self, offset: int, limit: int) -> List[str]:
+        return self.options[offset : offset + limit]
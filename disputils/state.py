@@ -0,0 +1,355 @@
+import asyncio
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+
+DialogState = namedtuple(
+    "DialogState",
+    (
+        "message_id",
+        "channel_id",
+        "page_index",
+        "user_ids",
+        "source",
+        "text",
+        "expires_at",
+    ),
+    defaults=(0, (), None, None, None),
+)
+DialogState.__doc__ = """
+State of a running dialog, needed to re-attach to its message.
+
+- ``message_id`` / ``channel_id``: where the dialog lives
+- ``page_index``: the currently displayed page
+- ``user_ids``: users who can interact, empty for everyone
+- ``source``: reference to the pages, resolved when re-attaching
+- ``text``: message text displayed along with the pages
+- ``expires_at``: unix time at which the dialog times out
+"""
+
+Lease = namedtuple("Lease", ("message_id", "owner", "expires_at"))
+Lease.__doc__ = """
+Claim of a process on a dialog, so only one process runs it at a time.
+
+- ``message_id``: the dialog message
+- ``owner``: name of the process, e.g. ``"bot-2"``
+- ``expires_at``: unix time at which another process may claim the dialog
+"""
+
+
+class StateStore(ABC):
+    """
+    Abstract base class for storages of :class:`DialogState`.
+
+    Stores shared by several processes can also hand out leases on dialogs, see
+    :class:`LeasingStateStore`.
+    """
+
+    @abstractmethod
+    async def save(self, state: DialogState):
+        """
+        Insert or replace the state of a dialog.
+
+        :param state: The state.
+        :rtype: ``None``
+        """
+
+    @abstractmethod
+    async def load(self, message_id: int) -> Optional[DialogState]:
+        """
+        Get the state of the dialog of a message.
+
+        :param message_id: ID of the dialog message.
+        :rtype: Optional[:class:`DialogState`]
+        """
+
+    @abstractmethod
+    async def delete(self, message_id: int):
+        """
+        Remove the state of the dialog of a message.
+
+        :param message_id: ID of the dialog message.
+        :rtype: ``None``
+        """
+
+    @abstractmethod
+    async def all(self) -> List[DialogState]:
+        """
+        Get all stored states.
+
+        :rtype: List[:class:`DialogState`]
+        """
+
+
+class LeasingStateStore(StateStore):
+    """
+    Abstract base class for storages of :class:`DialogState` that also hand out
+    leases on dialogs, e.g. stores shared by the processes of a bot whose shards
+    are spread over processes.
+
+    A process claims a dialog before running it and renews the lease while it
+    does. If the process stops without releasing the lease, another process may
+    claim the dialog once the lease expired.
+    """
+
+    @abstractmethod
+    async def claim(self, message_id: int, owner: str, ttl: float) -> bool:
+        """
+        Claim the dialog of a message, unless another owner holds an unexpired
+        lease on it. Claiming a dialog again extends the lease.
+
+        :param message_id: ID of the dialog message.
+        :param owner: Name of the claiming process.
+        :param ttl: Seconds until the lease expires.
+        :return: Whether the dialog has been claimed.
+        :rtype: :class:`bool`
+        """
+
+    @abstractmethod
+    async def renew(self, message_id: int, owner: str, ttl: float) -> bool:
+        """
+        Extend the lease of an owner on a dialog.
+
+        :param message_id: ID of the dialog message.
+        :param owner: Name of the process holding the lease.
+        :param ttl: Seconds from now until the lease expires.
+        :return: Whether the lease has been extended, ``False`` if the dialog has
+            been released or claimed by another owner meanwhile.
+        :rtype: :class:`bool`
+        """
+
+    @abstractmethod
+    async def release(self, message_id: int, owner: str):
+        """
+        Release the lease of an owner on a dialog, so any process can claim it.
+
+        :param message_id: ID of the dialog message.
+        :param owner: Name of the process holding the lease.
+        :rtype: ``None``
+        """
+
+    @abstractmethod
+    async def lease(self, message_id: int) -> Optional[Lease]:
+        """
+        Get the unexpired lease on a dialog.
+
+        :param message_id: ID of the dialog message.
+        :rtype: Optional[:class:`Lease`]
+        """
+
+
+class MemoryStateStore(LeasingStateStore):
+    """
+    Keeps dialog states in memory. States survive re-creating dialogs, e.g. after
+    reconnecting, but not a restart of the process.
+    """
+
+    def __init__(self):
+        self._states: Dict[int, DialogState] = {}
+        self._leases: Dict[int, Lease] = {}
+
+    async def save(self, state: DialogState):
+        self._states[state.message_id] = state
+
+    async def load(self, message_id: int) -> Optional[DialogState]:
+        return self._states.get(message_id)
+
+    async def delete(self, message_id: int):
+        self._states.pop(message_id, None)
+
+    async def all(self) -> List[DialogState]:
+        return list(self._states.values())
+
+    async def claim(self, message_id: int, owner: str, ttl: float) -> bool:
+        lease = await self.lease(message_id)
+        if lease is not None and lease.owner != owner:
+            return False
+
+        self._leases[message_id] = Lease(message_id, owner, time.time() + ttl)
+        return True
+
+    async def renew(self, message_id: int, owner: str, ttl: float) -> bool:
+        lease = self._leases.get(message_id)
+        if lease is None or lease.owner != owner:
+            return False
+
+        self._leases[message_id] = Lease(message_id, owner, time.time() + ttl)
+        return True
+
+    async def release(self, message_id: int, owner: str):
+        lease = self._leases.get(message_id)
+        if lease is not None and lease.owner == owner:
+            del self._leases[message_id]
+
+    async def lease(self, message_id: int) -> Optional[Lease]:
+        lease = self._leases.get(message_id)
+        if lease is None or lease.expires_at <= time.time():
+            return None
+
+        return lease
+
+
+class SQLiteStateStore(LeasingStateStore):
+    """
+    Keeps dialog states in a SQLite database, so they survive a restart.
+
+    Queries run on a thread of their own, so waiting for the disk doesn't block the
+    event loop.
+
+    Processes on the same machine can share the database file, e.g. to try out
+    leases before moving to a networked store.
+
+    :param path: Path of the database file.
+    """
+
+    def __init__(self, path: str):
+        self._executor = ThreadPoolExecutor(max_workers=1)  # one query at a time
+        # writes lock the database when they start, so writers of other processes
+        # wait for each other instead of failing on a lock held for reading
+        self._db = sqlite3.connect(
+            path, isolation_level="IMMEDIATE", check_same_thread=False
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS dialog_state ("
+            "message_id INTEGER PRIMARY KEY, channel_id INTEGER NOT NULL, "
+            "page_index INTEGER NOT NULL, user_ids TEXT NOT NULL, source TEXT, "
+            "text TEXT, expires_at REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS dialog_lease ("
+            "message_id INTEGER PRIMARY KEY, owner TEXT NOT NULL, "
+            "expires_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    async def _run(self, func: Callable, *args):
+        """ Run a function using the connection on the thread of the store. """
+
+        return await asyncio.get_event_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    def _write(self, sql: str, parameters: tuple) -> int:
+        rowcount = self._db.execute(sql, parameters).rowcount
+        self._db.commit()
+        return rowcount
+
+    def _fetch(self, sql: str, parameters: tuple) -> List[tuple]:
+        return self._db.execute(sql, parameters).fetchall()
+
+    @staticmethod
+    def _from_row(row: tuple) -> DialogState:
+        message_id, channel_id, page_index, user_ids, source, text, expires_at = row
+        return DialogState(
+            message_id,
+            channel_id,
+            page_index,
+            tuple(json.loads(user_ids)),
+            source,
+            text,
+            expires_at,
+        )
+
+    async def save(self, state: DialogState):
+        await self._run(
+            self._write,
+            "INSERT OR REPLACE INTO dialog_state VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                state.message_id,
+                state.channel_id,
+                state.page_index,
+                json.dumps(list(state.user_ids)),
+                state.source,
+                state.text,
+                state.expires_at,
+            ),
+        )
+
+    async def load(self, message_id: int) -> Optional[DialogState]:
+        rows = await self._run(
+            self._fetch,
+            "SELECT * FROM dialog_state WHERE message_id = ?",
+            (message_id,),
+        )
+
+        return self._from_row(rows[0]) if rows else None
+
+    async def delete(self, message_id: int):
+        await self._run(
+            self._write, "DELETE FROM dialog_state WHERE message_id = ?", (message_id,)
+        )
+
+    async def all(self) -> List[DialogState]:
+        rows = await self._run(self._fetch, "SELECT * FROM dialog_state", ())
+        return [self._from_row(row) for row in rows]
+
+    def _claim(self, message_id: int, owner: str, ttl: float) -> bool:
+        now = time.time()
+        # both statements run in one write transaction, so only one process succeeds
+        claimed = self._db.execute(
+            "UPDATE dialog_lease SET owner = ?, expires_at = ? "
+            "WHERE message_id = ? AND (owner = ? OR expires_at <= ?)",
+            (owner, now + ttl, message_id, owner, now),
+        ).rowcount
+        if not claimed:
+            claimed = self._db.execute(
+                "INSERT OR IGNORE INTO dialog_lease VALUES (?, ?, ?)",
+                (message_id, owner, now + ttl),
+            ).rowcount
+        self._db.commit()
+
+        return bool(claimed)
+
+    async def claim(self, message_id: int, owner: str, ttl: float) -> bool:
+        return await self._run(self._claim, message_id, owner, ttl)
+
+    async def renew(self, message_id: int, owner: str, ttl: float) -> bool:
+        renewed = await self._run(
+            self._write,
+            "UPDATE dialog_lease SET expires_at = ? WHERE message_id = ? AND owner = ?",
+            (time.time() + ttl, message_id, owner),
+        )
+
+        return bool(renewed)
+
+    async def release(self, message_id: int, owner: str):
+        await self._run(
+            self._write,
+            "DELETE FROM dialog_lease WHERE message_id = ? AND owner = ?",
+            (message_id, owner),
+        )
+
+    async def lease(self, message_id: int) -> Optional[Lease]:
+        rows = await self._run(
+            self._fetch,
+            "SELECT * FROM dialog_lease WHERE message_id = ? AND expires_at > ?",
+            (message_id, time.time()),
+        )
+
+        return Lease(*rows[0]) if rows else None
+
+    def close(self):
+        """
+        Wait for running queries and close the database connection.
+
+        :rtype: ``None``
+        """
+
+        self._executor.shutdown()
+        self._db.close()
+
+
+def is_expired(state: DialogState) -> bool:
+    """
+    Whether a dialog has timed out.
+
+    :param state: The state of the dialog.
+    :rtype: :class:`bool`
+    """
+
+    return state.expires_at is not None and state.expires_at <= time.time()
@@ -20,6 +20,6 @@ setup(
     python_requires=">=3.6",
     install_requires=["discord.py >=1,<2"],
     keywords="discord discord-py discord-bot utils utility",
-    packages=find_packages(exclude=["examples", "docs", "tests"]),
+    packages=find_packages(exclude=["examples", "docs", "tests", "benchmarks"]),
     data_files=None,
 )
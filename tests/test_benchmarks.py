@@ -0,0 +1,48 @@
+import asyncio
+import math
+import pytest
+from benchmarks.bench_dialogs import SCENARIOS, run_scenario
+from benchmarks.fake_discord import FakeClient, FakeUser
+
+
+@pytest.mark.parametrize("router", (False, True))
+@pytest.mark.parametrize("scenario", SCENARIOS, ids=lambda s: s.name)
+def test_scenario(scenario, router):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        result = loop.run_until_complete(run_scenario(scenario, 5, router=router))
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+
+    assert result.dialogs == 5
+    assert result.calls_to_start <= 7  # send and one call per reaction
+    assert result.calls_per_interaction <= 2
+    assert not math.isnan(result.latency_ms)
+    assert result.bytes_per_dialog > 0
+
+
+def test_fake_messages_behave_like_discord_py():
+    async def scenario():
+        client = FakeClient()
+        channel = client.channel()
+        message = await channel.send("hi")
+        await message.add_reaction("👍")
+        channel.messages[message.id].click(FakeUser(), "👍")
+
+        cached = client.cached_message(message.id)
+        fetched = await channel.fetch_message(message.id)
+        partial = channel.get_partial_message(message.id)
+        return message, cached, fetched, partial
+
+    loop = asyncio.new_event_loop()
+    try:
+        message, cached, fetched, partial = loop.run_until_complete(scenario())
+    finally:
+        loop.close()
+
+    assert message.reactions == []  # not updated, like a sent discord.Message
+    assert [(r.emoji, r.count, r.me) for r in cached.reactions] == [("👍", 2, True)]
+    assert [(r.emoji, r.count, r.me) for r in fetched.reactions] == [("👍", 2, True)]
+    assert not hasattr(partial, "reactions")
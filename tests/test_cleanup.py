@@ -0,0 +1,81 @@
+import asyncio
+from benchmarks.bench_dialogs import settle
+from benchmarks.fake_discord import FakeClient, FakeUser
+from disputils import CleanupQueue, Confirmation
+
+
+async def step(log: list, name: str, delay: float = 0, fail: bool = False):
+    await asyncio.sleep(delay)
+    if fail:
+        raise RuntimeError(name)
+    log.append(name)
+
+
+def test_cleanups_run_in_order(run):
+    queue = CleanupQueue(FakeClient(), concurrency=1)
+    log = []
+
+    async def scenario():
+        for i, delay in enumerate((0.03, 0, 0.01)):
+            queue.submit(step(log, str(i), delay))
+        await queue.flush()
+
+    run(scenario())
+
+    assert log == ["0", "1", "2"]
+
+
+def test_failed_cleanup_is_reported_and_others_run(run):
+    errors = []
+    queue = CleanupQueue(FakeClient(), concurrency=1, on_error=errors.append)
+    log = []
+
+    async def scenario():
+        queue.submit(step(log, "first"))
+        queue.submit(step(log, "broken", fail=True))
+        queue.submit(step(log, "last"))
+        await queue.flush()
+
+    run(scenario())
+
+    assert log == ["first", "last"]
+    assert [str(e) for e in errors] == ["broken"]
+    assert queue.failed == 1
+
+
+def test_flush_waits_for_pending_cleanups(run):
+    queue = CleanupQueue(FakeClient())
+    log = []
+
+    async def scenario():
+        queue.submit(step(log, "slow", 0.05))
+        cancelled = await queue.flush()
+        queue.submit(step(log, "stuck", 3600))
+        return cancelled, await queue.flush(timeout=0.05)
+
+    assert run(scenario()) == (0, 1)
+    assert log == ["slow"]
+    assert len(queue) == 0
+
+
+def test_dialog_returns_before_its_cleanup(run):
+    client = FakeClient(latency=0.05)
+    CleanupQueue(client).install()
+    channel, user = client.channel(), FakeUser()
+    confirmation = Confirmation(client)
+
+    async def scenario():
+        task = asyncio.ensure_future(confirmation.confirm("Sure?", user, channel))
+        await settle(client)
+        stored = channel.messages[confirmation.message.id]
+        stored.click(user, "✅")
+        result = await task
+        reactions_at_result = dict(stored.users)
+        await CleanupQueue.of(client).flush()
+        return result, reactions_at_result, stored.users
+
+    result, reactions_at_result, reactions = run(scenario())
+
+    assert result is True
+    assert reactions_at_result  # still there when the result was returned
+    assert reactions == {}
@@ -0,0 +1,218 @@
+import asyncio
+import pytest
+from benchmarks.bench_dialogs import settle
+from benchmarks.fake_discord import FakeClient, FakeUser
+from disputils import Confirmation, QuorumConfirmation
+
+
+@pytest.mark.parametrize(
+    "policy, users, required",
+    (
+        ("any", 5, 1),
+        ("all", 5, 5),
+        ("majority", 5, 3),
+        ("majority", 4, 3),
+        ("majority", 1, 1),
+        (2, 5, 2),
+    ),
+)
+def test_required_confirmations(run, policy, users, required):
+    assert QuorumConfirmation(FakeClient(), policy=policy)._required(users) == required
+
+
+@pytest.mark.parametrize("policy, users", (("some", 3), (0, 3), (4, 3)))
+def test_invalid_policies(run, policy, users):
+    with pytest.raises(ValueError):
+        QuorumConfirmation(FakeClient(), policy=policy)._required(users)
+
+
+@pytest.mark.parametrize(
+    "votes, required, outcome",
+    (
+        ([True, True, None], 2, True),
+        ([True, None, None], 2, None),
+        ([True, False, None], 2, None),
+        ([True, False, False], 2, False),
+        ([None, None, None], 3, None),
+        ([True, True, False], 3, False),
+        ([{True, False}, True, None], 2, None),  # both emojis count as undecided
+        ([{True, False}, True, False], 2, None),
+        ([{True, False}, False, False], 2, False),
+    ),
+)
+def test_outcome(run, votes, required, outcome):
+    confirmation = QuorumConfirmation(FakeClient())
+    for user_id, vote in enumerate(votes):
+        if vote is None:
+            confirmation._votes[user_id] = set()
+        elif isinstance(vote, set):
+            confirmation._votes[user_id] = set(vote)
+        else:
+            confirmation._votes[user_id] = {vote}
+
+    assert confirmation._outcome(required) is outcome
+
+
+def vote(run, policy, clicks, timeout=60):
+    """
+    Run a quorum confirmation of three users, who click and unclick emojis in
+    turn.
+    """
+
+    client = FakeClient()
+    channel = client.channel()
+    users = [FakeUser() for _ in range(3)]
+    confirmation = QuorumConfirmation(client, policy=policy)
+
+    async def scenario():
+        task = asyncio.ensure_future(
+            confirmation.confirm("Deploy?", users, channel, timeout=timeout)
+        )
+        await settle(client)
+        message = channel.messages[confirmation.message.id]
+        for user, emoji, added in clicks:
+            if task.done():
+                break
+            if added:
+                message.click(users[user], emoji)
+            else:
+                message.unclick(users[user], emoji)
+            await settle(client)
+
+        return await task, confirmation.votes
+
+    result, votes = run(scenario())
+    return result, [votes[u.id] for u in users]
+
+
+def test_majority_confirms_once_reached(run):
+    result, votes = vote(run, "majority", [(0, "✅", True), (1, "✅", True)])
+
+    assert result is True
+    assert votes == [True, True, None]
+
+
+def test_all_is_refused_by_one_user(run):
+    result, votes = vote(run, "all", [(0, "✅", True), (1, "❌", True)])
+
+    assert result is False
+    assert votes == [True, False, None]
+
+
+def test_removed_votes_are_taken_back(run):
+    clicks = [
+        (0, "✅", True),
+        (0, "✅", False),
+        (1, "❌", True),
+        (2, "❌", True),
+    ]
+
+    assert vote(run, "majority", clicks)[0] is False
+
+
+def test_both_emojis_count_as_undecided(run):
+    clicks = [
+        (0, "✅", True),
+        (0, "❌", True),  # undecided, so all users haven't confirmed yet
+        (1, "✅", True),
+        (2, "✅", True),
+        (0, "❌", False),
+    ]
+
+    result, votes = vote(run, "all", clicks)
+
+    assert result is True
+    assert votes == [True, True, True]
+
+
+def test_undecided_user_keeps_the_vote_open(run):
+    clicks = [(0, "✅", True), (0, "❌", True), (1, "✅", True), (2, "✅", True)]
+
+    result, votes = vote(run, "all", clicks, timeout=0.05)
+
+    assert result is None
+    assert votes == [None, True, True]
+
+
+def test_k_of_n_times_out_without_quorum(run):
+    result, votes = vote(run, 2, [(0, "✅", True)], timeout=0.05)
+
+    assert result is None
+    assert votes == [True, None, None]
+
+
+def test_confirmation_ignores_other_users(run):
+    client = FakeClient()
+    channel, user, other = client.channel(), FakeUser(), FakeUser()
+    confirmation = Confirmation(client)
+
+    async def scenario():
+        task = asyncio.ensure_future(confirmation.confirm("Sure?", user, channel))
+        await settle(client)
+        message = channel.messages[confirmation.message.id]
+        message.click(other, "✅")
+        message.click(user, "❌")
+        return await task
+
+    assert run(scenario()) is False
+
+
+def test_reused_confirmation_keeps_its_reactions(run):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+    confirmation = Confirmation(client)
+
+    async def confirm(text: str, emoji: str, channel=None):
+        task = asyncio.ensure_future(
+            confirmation.confirm(text, user, channel, keep_reactions=True)
+        )
+        await settle(client)
+        stored = confirmation.message.channel.messages[confirmation.message.id]
+        stored.click(user, emoji)
+        result = await task
+        await settle(client)
+        return result, stored
+
+    async def scenario():
+        first, _ = await confirm("Sure?", "✅", channel)
+        client.transport.reset()
+        second, stored = await confirm("Really sure?", "❌")
+        return first, second, dict(client.transport.calls), stored.users
+
+    first, second, calls, users = run(scenario())
+
+    assert (first, second) == (True, False)
+    assert calls == {"edit": 1, "remove_reaction": 1}  # no reactions added again
+    assert users == {"✅": {client.user.id}, "❌": {client.user.id}}
+
+
+def test_reused_quorum_keeps_its_reactions(run):
+    client = FakeClient()
+    channel = client.channel()
+    users = [FakeUser() for _ in range(3)]
+    confirmation = QuorumConfirmation(client, policy="majority")
+
+    async def confirm(channel=None):
+        task = asyncio.ensure_future(
+            confirmation.confirm("Deploy?", users, channel, keep_reactions=True)
+        )
+        await settle(client)
+        stored = confirmation.message.channel.messages[confirmation.message.id]
+        stored.click(users[0], "❌")
+        stored.click(users[1], "✅")
+        stored.click(users[2], "✅")
+        result = await task
+        await settle(client)
+        return result, stored
+
+    async def scenario():
+        await confirm(channel)
+        client.transport.reset()
+        result, stored = await confirm()
+        return result, dict(client.transport.calls), stored.users
+
+    result, calls, reacted = run(scenario())
+
+    assert result is True
+    assert calls == {"remove_reaction": 3}
+    assert reacted == {"✅": {client.user.id}, "❌": {client.user.id}}
@@ -0,0 +1,184 @@
+import asyncio
+import discord
+import pytest
+from benchmarks.bench_dialogs import settle
+from benchmarks.fake_discord import (
+    FakeClient,
+    FakeMessage,
+    FakePartialMessage,
+    FakeUser,
+)
+from disputils import Confirmation, DialogManager, EmbedPaginator
+
+
+PAGES = [discord.Embed(title=f"page {i}") for i in range(3)]
+
+
+class _Response:
+    status = 403
+    reason = "Forbidden"
+
+
+@pytest.fixture
+def failing_emoji(monkeypatch):
+    """ Make adding the ``◀`` reaction fail. """
+
+    add_reaction = FakeMessage.add_reaction
+
+    async def add(self, emoji):
+        if str(emoji) == "◀":
+            raise discord.Forbidden(_Response(), "missing permissions")
+        await add_reaction(self, emoji)
+
+    monkeypatch.setattr(FakeMessage, "add_reaction", add)
+
+
+@pytest.mark.parametrize("seed_concurrency", (1, 3))
+def test_failed_reaction_keeps_other_controls(run, failing_emoji, seed_concurrency):
+    client = FakeClient()
+    channel = client.channel()
+    paginator = EmbedPaginator(client, PAGES, seed_concurrency=seed_concurrency)
+
+    async def scenario():
+        task = asyncio.ensure_future(paginator.run([FakeUser()], channel, timeout=60))
+        await asyncio.sleep(0.01)
+        await paginator._seeding
+
+        stored = channel.messages[paginator.message.id]
+        emojis = set(stored.users)
+        await paginator.cancel()
+        await task
+        return emojis
+
+    assert run(scenario()) == {"⏮", "▶", "⏭", "⏹"}
+
+
+def test_dialog_options_are_forwarded(run):
+    client = FakeClient()
+
+    assert EmbedPaginator(client, PAGES, seed_concurrency=4).seed_concurrency == 4
+    assert Confirmation(client, seed_concurrency=4).seed_concurrency == 4
+
+
+async def edit_elsewhere(confirmation):
+    await confirmation.message.edit(content="Confirmed", embed=None)
+
+
+async def forget_message(confirmation):
+    confirmation._client._connection._messages.clear()
+
+
+@pytest.mark.parametrize(
+    "text, meanwhile, edits",
+    (
+        ("Sure?", None, 0),
+        ("Really sure?", None, 1),
+        ("Sure?", edit_elsewhere, 1),
+        ("Sure?", forget_message, 1),  # unknown whether it changed
+    ),
+    ids=("unchanged", "changed", "edited elsewhere", "not cached"),
+)
+def test_rerun_on_unchanged_message_skips_edit(run, text, meanwhile, edits):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+    confirmation = Confirmation(client)
+
+    async def confirm(text: str, channel=None):
+        task = asyncio.ensure_future(confirmation.confirm(text, user, channel))
+        await settle(client)
+        channel = confirmation.message.channel
+        channel.messages[confirmation.message.id].click(user, "✅")
+        return await task
+
+    async def scenario():
+        assert await confirm("Sure?", channel) is True
+        if meanwhile is not None:
+            await meanwhile(confirmation)
+        client.transport.reset()
+        assert await confirm(text) is True
+        stored = channel.messages[confirmation.message.id]
+        return client.transport.calls["edit"], stored.embeds[0].title
+
+    assert run(scenario()) == (edits, text)
+
+
+def test_cancel_stops_run_and_cleans_up(run):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+    paginator = EmbedPaginator(client, PAGES)
+
+    async def scenario():
+        task = asyncio.ensure_future(paginator.run([user], channel, timeout=60))
+        await settle(client)
+        stored = channel.messages[paginator.message.id]
+        await paginator.cancel("Cancelled")
+        return task.done(), paginator.running, stored
+
+    done, running, stored = run(scenario())
+
+    assert done and not running
+    assert stored.content == "Cancelled"
+    assert stored.users == {}  # reactions cleared
+
+
+def test_context_manager_cleans_up_cancelled_run(run):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+    paginator = EmbedPaginator(client, PAGES)
+
+    async def use():
+        async with paginator:
+            await paginator.run([user], channel, timeout=60)
+
+    async def scenario():
+        task = asyncio.ensure_future(use())
+        await settle(client)
+        stored = channel.messages[paginator.message.id]
+        task.cancel()  # e.g. the command was cancelled
+        await asyncio.gather(task, return_exceptions=True)
+        return task.cancelled(), paginator.running, stored
+
+    cancelled, running, stored = run(scenario())
+
+    assert cancelled and not running
+    assert stored.deleted
+
+
+@pytest.fixture
+def hanging_cleanup(monkeypatch):
+    """ Make clearing reactions never finish. """
+
+    async def clear_reactions(self):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(FakePartialMessage, "clear_reactions", clear_reactions)
+
+
+def test_close_all_meets_its_deadline(run, hanging_cleanup):
+    client = FakeClient()
+    manager = DialogManager(client)
+    manager.install()
+    channel, user = client.channel(), FakeUser()
+    paginators = [EmbedPaginator(client, PAGES) for _ in range(3)]
+
+    async def scenario():
+        tasks = [
+            asyncio.ensure_future(p.run([user], channel, timeout=60))
+            for p in paginators
+        ]
+        await settle(client)
+
+        loop = asyncio.get_event_loop()
+        started_at = loop.time()
+        forced = await manager.close_all("Bye", timeout=0.1)
+        elapsed = loop.time() - started_at
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return forced, elapsed, tasks
+
+    forced, elapsed, tasks = run(scenario())
+
+    assert forced == 3  # stuck clearing their reactions
+    assert elapsed < 0.5
+    assert all(task.cancelled() for task in tasks)
+    assert not any(p.running for p in paginators)
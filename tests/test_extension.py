@@ -0,0 +1,75 @@
+import discord
+import pytest
+from benchmarks.fake_discord import FakeClient, FakeUser
+from disputils import (
+    CleanupQueue,
+    DialogManager,
+    DialogObserver,
+    EmbedPaginator,
+    MetricsAggregator,
+    RateLimitBudget,
+    ReactionRouter,
+)
+
+
+KINDS = (
+    ReactionRouter,
+    DialogManager,
+    CleanupQueue,
+    RateLimitBudget,
+    MetricsAggregator,
+)
+
+
+def test_kinds_are_installed_independently(run):
+    client, other = FakeClient(), FakeClient()
+    extensions = [kind(client) for kind in KINDS]
+
+    for extension in extensions:
+        extension.install()
+
+    for kind, extension in zip(KINDS, extensions):
+        assert kind.of(client) is extension
+        assert kind.of(other) is None
+
+    for kind, extension in zip(KINDS, extensions):
+        extension.uninstall()
+        assert kind.of(client) is None
+
+
+def test_install_replaces_the_previous_one(run):
+    client = FakeClient()
+    first, second = DialogManager(client), DialogManager(client)
+
+    first.install()
+    second.install()
+    first.uninstall()  # not installed anymore, keeps the second one
+
+    assert DialogManager.of(client) is second
+
+
+def test_observers_share_a_registry(run):
+    client = FakeClient()
+    metrics = MetricsAggregator(client)
+    metrics.install()
+
+    assert DialogObserver.of(client) is metrics
+
+    with pytest.raises(TypeError):
+        MetricsAggregator().install()  # only usable for single dialogs
+
+
+def test_installed_observer_receives_events(run):
+    client = FakeClient()
+    metrics = MetricsAggregator(client)
+    metrics.install()
+
+    async def scenario():
+        paginator = EmbedPaginator(client, [discord.Embed(title="page")])
+        await paginator.run([FakeUser()], client.channel(), timeout=0)
+
+    run(scenario())
+
+    assert metrics.events["publish"] == 1
+    assert metrics.events["result"] == 1
+    assert metrics.api_calls.count == 1
@@ -0,0 +1,101 @@
+import asyncio
+import discord
+from benchmarks.bench_dialogs import settle
+from benchmarks.fake_discord import FakeClient, FakeUser
+from disputils import DialogManager, EmbedPaginator
+
+
+PAGES = [discord.Embed(title=f"page {i}") for i in range(5)]
+
+
+async def start(client, channel, user):
+    """
+    Start a paginator and wait until it is set up. Returns it along with its
+    message as Discord stores it, which is kept once the message is deleted.
+    """
+
+    paginator = EmbedPaginator(client, PAGES)
+    asyncio.ensure_future(paginator.run([user], channel, timeout=60))
+    await settle(client)
+    return paginator, channel.messages[paginator.message.id]
+
+
+async def stop(*paginators):
+    for paginator in paginators:
+        await paginator.cancel()
+
+
+def test_per_channel_cap_evicts_least_recently_used(run):
+    client = FakeClient()
+    manager = DialogManager(client, per_channel=2)
+    manager.install()
+    channel, other_channel, user = client.channel(), client.channel(), FakeUser()
+
+    async def scenario():
+        first, first_message = await start(client, channel, user)
+        second, second_message = await start(client, channel, user)
+        elsewhere, _ = await start(client, other_channel, user)
+
+        first_message.click(user, "▶")  # used more recently than the second one
+        await settle(client)
+        third, third_message = await start(client, channel, user)
+
+        third_message.click(user, "▶")  # the new dialog still runs
+        await settle(client)
+        result = (
+            [p.running for p in (first, second, elsewhere, third)],
+            second_message.deleted,
+            third_message.embeds[0].title,
+            manager.counts,
+        )
+        await stop(first, elsewhere, third)
+        return result
+
+    running, deleted, title, counts = run(scenario())
+
+    assert running == [True, False, True, True]
+    assert deleted  # closed with the default evict_msg
+    assert title == "page 1"
+    assert counts["total"] == 3
+    assert counts["evicted"] == 1
+    assert sorted(counts["channels"].values()) == [1, 2]
+
+
+def test_global_cap_evicts_oldest(run):
+    client = FakeClient()
+    DialogManager(client, max_dialogs=2, evict_msg="Closed").install()
+    user = FakeUser()
+
+    async def scenario():
+        started = [await start(client, client.channel(), user) for _ in range(3)]
+        paginators = [paginator for paginator, _ in started]
+        result = [p.running for p in paginators], started[0][1].content
+        await stop(*paginators)
+        return result
+
+    running, content = run(scenario())
+
+    assert running == [False, True, True]
+    assert content == "Closed"
+
+
+def test_close_all(run):
+    client = FakeClient()
+    manager = DialogManager(client)
+    manager.install()
+    channel, user = client.channel(), FakeUser()
+
+    async def scenario():
+        started = [await start(client, channel, user) for _ in range(3)]
+        forced = await manager.close_all("Bye", timeout=5)
+        await settle(client)
+        return forced, started
+
+    forced, started = run(scenario())
+
+    assert forced == 0
+    for paginator, message in started:
+        assert not paginator.running
+        assert message.content == "Bye"
+        assert not message.users  # reactions cleared
+    assert len(manager) == 0
@@ -0,0 +1,22 @@
+import pytest
+from disputils import DialogEvent, MetricsAggregator
+
+
+@pytest.mark.parametrize("max_runs", (0, 1))
+def test_results_of_runs_no_longer_tracked(max_runs):
+    metrics = MetricsAggregator(max_runs=max_runs)
+    first, second = object(), object()
+
+    for kind, dialog in (
+        ("publish", first),
+        ("publish", second),  # may push the first run out
+        ("edit", first),
+        ("result", first),
+        ("result", second),
+        ("result", second),  # e.g. cancelled after it ended
+    ):
+        metrics.on_event(DialogEvent(kind, dialog, 0.0, 0.01, {}))
+
+    assert metrics.events["result"] == 3
+    assert metrics.api_calls.count == 3
+    assert not metrics._runs
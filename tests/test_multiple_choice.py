@@ -0,0 +1,209 @@
+import asyncio
+import pytest
+from benchmarks.bench_dialogs import settle
+from benchmarks.fake_discord import FakeClient, FakeUser
+from disputils import MultipleChoice, PaginatedMultipleChoice
+
+
+OPTIONS = ["red", "green", "blue"]
+RED, GREEN, BLUE = "1⃣", "2⃣", "3⃣"
+
+
+def poll(run, clicks, users=3, **kwargs):
+    """
+    Run a poll until all clicks are handled, returning its result, the REST calls
+    made meanwhile and the emojis the users reacted with by then.
+    """
+
+    client = FakeClient()
+    channel = client.channel()
+    voters = [FakeUser() for _ in range(users)]
+    choice = MultipleChoice(client, OPTIONS, "Favourite color?")
+    kwargs.setdefault("timeout", 60)
+    kwargs.setdefault("refresh_interval", 0)
+
+    async def scenario():
+        task = asyncio.ensure_future(choice.poll(channel=channel, **kwargs))
+        await settle(client)
+        message = channel.messages[choice.message.id]
+        client.transport.reset()
+
+        for user, emoji, added in clicks:
+            if added:
+                message.click(voters[user], emoji)
+            else:
+                message.unclick(voters[user], emoji)
+            await settle(client)
+
+        calls = dict(client.transport.calls)
+        reacted = {
+            emoji: len(users - {client.user.id})
+            for emoji, users in message.users.items()
+            if users - {client.user.id}
+        }
+        await choice.cancel("closed")
+        tally, _ = await task
+        return tally, calls, reacted
+
+    return run(scenario())
+
+
+def test_votes_are_counted(run):
+    tally, _, reacted = poll(run, [(0, RED, True), (1, RED, True), (2, BLUE, True)])
+
+    assert tally == {"red": 2, "green": 0, "blue": 1}
+    assert reacted == {RED: 2, BLUE: 1}  # reactions of polls aren't removed
+
+
+def test_removed_votes_are_taken_back(run):
+    clicks = [(0, RED, True), (1, GREEN, True), (0, RED, False)]
+
+    tally, _, _ = poll(run, clicks)
+
+    assert tally == {"red": 0, "green": 1, "blue": 0}
+
+
+def test_multiple_votes_per_user(run):
+    tally, _, _ = poll(run, [(0, RED, True), (0, GREEN, True)])
+
+    assert tally == {"red": 1, "green": 1, "blue": 0}
+
+
+def test_one_vote_keeps_the_latest(run):
+    clicks = [(0, RED, True), (0, GREEN, True), (0, BLUE, True)]
+
+    tally, calls, reacted = poll(run, clicks, one_vote=True)
+
+    assert tally == {"red": 0, "green": 0, "blue": 1}
+    assert calls["remove_reaction"] == 2
+    assert reacted == {BLUE: 1}  # the earlier reactions have been removed
+
+
+def test_closed_poll_shows_the_final_tally(run):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+    choice = MultipleChoice(client, OPTIONS, "Favourite color?")
+
+    async def scenario():
+        task = asyncio.ensure_future(
+            choice.poll(channel=channel, closable=True, refresh_interval=60)
+        )
+        await settle(client)
+        message = channel.messages[choice.message.id]
+        message.click(user, GREEN)
+        message.click(user, "❌")
+        tally, _ = await task
+        return tally, message
+
+    tally, message = run(scenario())
+
+    assert tally == {"red": 0, "green": 1, "blue": 0}
+    assert [f.name for f in message.embeds[0].fields] == [
+        f"{RED} 0",
+        f"{GREEN} 1",
+        f"{BLUE} 0",
+    ]
+
+
+@pytest.mark.parametrize("interval, edits", ((0, range(1, 6)), (60, (0,))))
+def test_tally_refresh_is_throttled(run, interval, edits):
+    clicks = [(user, RED, True) for user in range(5)]
+
+    tally, calls, _ = poll(run, clicks, users=5, refresh_interval=interval)
+
+    assert tally["red"] == 5
+    assert calls.get("edit", 0) in edits
+
+
+def test_coalesced_refresh_shows_every_vote(run):
+    client = FakeClient(latency=0.01)
+    channel = client.channel()
+    voters = [FakeUser() for _ in range(5)]
+    choice = MultipleChoice(client, OPTIONS, "Favourite color?")
+
+    async def scenario():
+        task = asyncio.ensure_future(
+            choice.poll(channel=channel, refresh_interval=0.05, timeout=60)
+        )
+        await settle(client)
+        message = channel.messages[choice.message.id]
+        client.transport.reset()
+        for user in voters:
+            message.click(user, RED)
+        await asyncio.sleep(0.2)
+
+        edits = client.transport.calls["edit"]
+        title = message.embeds[0].fields[0].name
+        await choice.cancel("closed")
+        await task
+        return edits, title
+
+    edits, title = run(scenario())
+
+    assert edits == 1  # five votes within one interval
+    assert title == f"{RED} 5"
+
+
+@pytest.mark.parametrize(
+    "options, cached, calls",
+    (
+        (OPTIONS, True, {}),
+        (OPTIONS[:2], True, {"edit": 1, "remove_reaction": 1}),
+        (OPTIONS, False, {"edit": 1, "add_reaction": 4}),
+    ),
+    ids=("same options", "fewer options", "not cached"),
+)
+def test_rerun_on_message_reconciles_reactions(run, options, cached, calls):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+    choice = MultipleChoice(client, OPTIONS, "Favourite color?")
+
+    async def choose(emoji: str, channel=None):
+        task = asyncio.ensure_future(choice.run([user], channel))
+        await settle(client)
+        stored = choice.message.channel.messages[choice.message.id]
+        stored.click(user, emoji)
+        return (await task)[0]
+
+    async def scenario():
+        assert await choose(RED, channel) == "red"
+
+        choice.options = options
+        choice._embed = None
+        if not cached:
+            client._connection._messages.clear()
+        client.transport.reset()
+
+        assert await choose(GREEN) == "green"
+        return dict(client.transport.calls)
+
+    assert run(scenario()) == calls
+
+
+def test_paginated_choice_on_second_page(run):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+    options = [f"option {i}" for i in range(25)]
+    choice = PaginatedMultipleChoice(client, options, "Pick one")
+
+    async def scenario():
+        task = asyncio.ensure_future(choice.run([user], channel, timeout=60))
+        await settle(client)
+        message = channel.messages[choice.message.id]
+        footers = [message.embeds[0].footer.text]
+
+        for emoji in ("◀", "▶"):  # going back from the first page does nothing
+            message.click(user, emoji)
+            await settle(client)
+            footers.append(message.embeds[0].footer.text)
+        fields = [f.value for f in message.embeds[0].fields]
+
+        message.click(user, "3⃣")
+        result, _ = await task
+        return footers, fields, result
+
+    footers, fields, result = run(scenario())
+
+    assert footers == ["(1/3)", "(1/3)", "(2/3)"]
+    assert fields == options[10:20]
+    assert result == "option 12"
@@ -0,0 +1,222 @@
+import pytest
+from disputils import Column, Field, chunked, format_table, pack_fields, table_fields
+from disputils.packing import (
+    EMBED_FIELDS_LIMIT,
+    EMBED_TOTAL_LIMIT,
+    EMPTY,
+    FIELD_NAME_LIMIT,
+    FIELD_ROWS_LIMIT,
+    FIELD_VALUE_LIMIT,
+    FOOTER_RESERVE,
+    _split_value,
+)
+
+
+def embed_size(embed) -> int:
+    size = len(embed.title or "") + len(embed.description or "")
+    return size + sum(len(f.name) + len(f.value) for f in embed.fields)
+
+
+def test_chunked():
+    assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked(iter(range(3)), 3)) == [[0, 1, 2]]
+    assert list(chunked([], 3)) == []
+
+
+def test_chunked_is_lazy():
+    consumed = []
+
+    def items():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    chunks = chunked(items(), 2)
+    assert next(chunks) == [0, 1]
+    assert consumed == [0, 1]
+
+
+def test_chunked_rejects_empty_chunks():
+    with pytest.raises(ValueError):
+        next(chunked([1], 0))
+
+
+def test_split_value_on_newlines():
+    value = "\n".join("x" * 10 for _ in range(10))  # 109 characters
+
+    parts = list(_split_value(value, 32))
+
+    assert all(len(p) <= 32 for p in parts)
+    assert parts[0] == "\n".join(["x" * 10] * 3)  # cut at the last fitting newline
+    assert [line for p in parts for line in p.split("\n")] == ["x" * 10] * 10
+
+
+def test_split_value_without_newlines():
+    parts = list(_split_value("x" * 70, 32))
+
+    assert parts == ["x" * 32, "x" * 32, "x" * 6]
+
+
+def test_split_value_short():
+    assert list(_split_value("short", 32)) == ["short"]
+
+
+def test_pack_fields_respects_limits():
+    items = [(f"name {i}" * 40, "v" * (i * 97 % 3000)) for i in range(200)]
+
+    pages = list(pack_fields(items, title="T" * 300, description="D" * 100))
+
+    assert pages
+    for page in pages:
+        assert len(page.fields) <= EMBED_FIELDS_LIMIT
+        assert embed_size(page) <= EMBED_TOTAL_LIMIT - 32  # the footer reserve
+        assert len(page.title) <= 256
+        for field in page.fields:
+            assert 0 < len(field.name) <= FIELD_NAME_LIMIT
+            assert 0 < len(field.value) <= FIELD_VALUE_LIMIT
+
+
+def test_pack_fields_keeps_values_and_order():
+    items = [Field(f"n{i}", "line\n" * (i * 50), False) for i in range(1, 20)]
+
+    pages = list(pack_fields(items))
+
+    fields = [f for page in pages for f in page.fields]
+    assert [f.name for f in fields if f.name != EMPTY] == [f.name for f in items]
+    assert all(f.inline is False for f in fields)
+    values = {}
+    name = None
+    for f in fields:
+        name = f.name if f.name != EMPTY else name  # continued in unnamed fields
+        values[name] = values.get(name, []) + [f.value]
+    for item in items:
+        lines = [line for v in values[item.name] for line in v.split()]
+        assert lines == ["line"] * (len(item.value) // 5)
+
+
+def test_pack_fields_leaves_input_unmodified():
+    items = [{"name": "a", "value": "x" * 3000}, ("b", "", False)]
+    copy = [dict(items[0]), items[1]]
+
+    pages = list(pack_fields(items))
+
+    assert items == copy
+    assert [f.value for f in pages[0].fields][-1] == EMPTY  # empty value
+
+
+def test_pack_fields_fills_pages():
+    pages = list(pack_fields((str(i), "x") for i in range(60)))
+
+    assert [len(p.fields) for p in pages] == [25, 25, 10]
+
+
+def test_pack_fields_max_fields():
+    pages = list(pack_fields(((str(i), "x") for i in range(10)), max_fields=4))
+
+    assert [len(p.fields) for p in pages] == [4, 4, 2]
+
+    with pytest.raises(ValueError):
+        list(pack_fields([], max_fields=26))
+
+
+def test_pack_fields_empty():
+    assert list(pack_fields([])) == []
+
+
+def test_pack_fields_field_function():
+    rows = [("alice", 3), ("bob", 2)]
+
+    (page,) = pack_fields(rows, field=lambda r: (r[0], f"{r[1]} points"))
+
+    assert [(f.name, f.value) for f in page.fields] == [
+        ("alice", "3 points"),
+        ("bob", "2 points"),
+    ]
+
+
+def wide_rows(columns: int, rows: int, width: int) -> list:
+    return [[f"{r}:" + "x" * (width - len(f"{r}:"))] * columns for r in range(rows)]
+
+
+def test_format_table_aligns_columns():
+    rows = [{"name": "Alice", "score": 1200}, {"name": "Bob", "score": 950}]
+
+    table = format_table(
+        rows, [Column("name", "Player"), Column("score", "Score", align=">")]
+    )
+
+    assert table.split("\n") == [
+        "```",
+        "Player  Score",
+        "------  -----",
+        "Alice    1200",
+        "Bob       950",
+        "```",
+    ]
+
+
+def test_format_table_narrows_to_max_size():
+    table = format_table(wide_rows(10, 15, 200), range(10), max_size=4096)
+
+    assert len(table) <= 4096
+    lines = table.split("\n")[1:-1]
+    assert len(lines) == 17  # headers, rule and all rows
+    assert [line[:3] for line in lines[2:]] == [f"{r}:x"[:3] for r in range(15)]
+
+
+def test_format_table_too_many_rows():
+    with pytest.raises(ValueError):
+        format_table(wide_rows(10, 1000, 20), range(10), max_size=4096)
+
+
+def test_table_fields_respect_field_limit():
+    (field,) = table_fields(wide_rows(1, 15, 200), [Column(0, "Long")])
+
+    assert field.name == "Long"
+    assert len(field.value) <= FIELD_VALUE_LIMIT
+    assert len(field.value.split("\n")) == 15
+
+
+def test_table_fields_respect_total_limit():
+    fields = table_fields(wide_rows(10, 15, 200), range(10))
+
+    assert len(fields) == 10
+    size = sum(len(f.name) + len(f.value) for f in fields)
+    assert size <= EMBED_TOTAL_LIMIT - FOOTER_RESERVE
+    for field in fields:
+        assert len(field.value) <= FIELD_VALUE_LIMIT
+        assert [line[:2] for line in field.value.split("\n")][:10] == [
+            f"{r}:" for r in range(10)
+        ]
+
+
+def test_table_fields_max_size():
+    fields = table_fields(wide_rows(3, 5, 50), range(3), max_size=300)
+
+    assert sum(len(f.name) + len(f.value) for f in fields) <= 300
+
+    with pytest.raises(ValueError):
+        table_fields(wide_rows(3, 5, 50), range(3), max_size=20)
+
+
+def test_table_fields_too_many_rows():
+    (field,) = table_fields(wide_rows(1, FIELD_ROWS_LIMIT, 20), [0])
+
+    assert len(field.value) <= FIELD_VALUE_LIMIT
+    assert len(field.value.split("\n")) == FIELD_ROWS_LIMIT
+
+    with pytest.raises(ValueError):
+        table_fields(wide_rows(1, FIELD_ROWS_LIMIT + 1, 20), [0])
+
+
+def test_table_fields_keep_short_cells():
+    rows = [("alice", 3, None), ("bob", 12, "x")]
+
+    fields = table_fields(rows, [Column(0, "Player"), Column(1, "Score"), 2])
+
+    assert [(f.name, f.value) for f in fields] == [
+        ("Player", "alice\nbob"),
+        ("Score", "3\n12"),
+        ("2", f"{EMPTY}\nx"),
+    ]
+    assert table_fields([], ["a"]) == [Field("a", EMPTY)]
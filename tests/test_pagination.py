@@ -0,0 +1,177 @@
+import asyncio
+import discord
+import pytest
+from benchmarks.bench_dialogs import settle
+from benchmarks.fake_discord import FakeClient, FakeUser
+from disputils import (
+    CompactPageSource,
+    ControlEmojis,
+    EmbedPaginator,
+    PageIndex,
+    ReactionRouter,
+)
+
+
+PAGES = [discord.Embed(title=f"page {i}") for i in range(10)]
+
+
+async def start(paginator: EmbedPaginator, channel, user) -> asyncio.Future:
+    """ Run a paginator until its controls have been added. """
+
+    task = asyncio.ensure_future(paginator.run([user], channel, timeout=60))
+    while paginator._seeding is None:
+        await asyncio.sleep(0)
+    await paginator._seeding
+    return task
+
+
+@pytest.mark.parametrize("router", (False, True))
+def test_every_click_advances(run, router):
+    client = FakeClient()
+    if router:
+        ReactionRouter(client).install()
+    channel, user = client.channel(), FakeUser()
+    paginator = EmbedPaginator(client, PAGES)
+
+    async def scenario():
+        task = await start(paginator, channel, user)
+        stored = channel.messages[paginator.message.id]
+        for _ in range(5):
+            stored.click(user, "▶")
+            stored.unclick(user, "▶")  # as if removed by the paginator
+        await settle(client)
+
+        title = stored.embeds[0].title
+        await paginator.cancel()
+        await task
+        return title
+
+    assert run(scenario()) == "page 5"
+
+
+@pytest.mark.parametrize("compress", (False, True))
+def test_compact_pages_round_trip(run, compress):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+    pages = [
+        discord.Embed(title=f"page {i}", description="text " * 50, color=i)
+        .add_field(name="field", value=str(i))
+        .set_footer(text="footer")
+        for i in range(3)
+    ]
+    expected = [p.to_dict() for p in pages]
+    paginator = EmbedPaginator(client, pages, compact=True, compress=compress)
+    assert isinstance(paginator.pages, CompactPageSource)
+
+    async def scenario():
+        task = await start(paginator, channel, user)
+        message = channel.messages[paginator.message.id]
+        shown = [message.embeds[0].to_dict()]
+        for emoji in ("▶", "▶", "◀"):
+            message.click(user, emoji)
+            message.unclick(user, emoji)
+            await settle(client)
+            shown.append(message.embeds[0].to_dict())
+        await paginator.cancel()
+        await task
+        return shown
+
+    shown = run(scenario())
+
+    for page, index in zip(shown, (0, 1, 2, 1)):
+        assert page["footer"]["text"] == f"footer - ({index + 1}/3)"
+        page["footer"]["text"] = "footer"
+        assert page == expected[index]
+    assert [p.to_dict() for p in pages] == expected  # the pages are left unmodified
+
+
+LONG = [discord.Embed(title=f"page {i}") for i in range(25)]
+SKIPS = ControlEmojis(skip_back="⏪", skip_forward="⏩")
+
+
+def navigate(run, paginator, actions) -> list:
+    """
+    Run a paginator and apply clicks and replies to it, returning the index of the
+    displayed page after each of them.
+    """
+
+    client = paginator._client
+    channel, user = client.channel(), FakeUser()
+
+    async def scenario():
+        task = await start(paginator, channel, user)
+        message = channel.messages[paginator.message.id]
+        shown = []
+        for kind, value in actions:
+            if kind == "click":
+                message.click(user, value)
+                message.unclick(user, value)
+            else:
+                channel.say(user, value, reply_to=message)
+            await settle(client)
+            title = message.embeds[0].title
+            shown.append(int(title.split()[1]))
+        await paginator.cancel()
+        await task
+        return shown
+
+    return run(scenario())
+
+
+def test_skip_controls_stop_at_both_ends(run):
+    paginator = EmbedPaginator(FakeClient(), LONG, control_emojis=SKIPS)
+    actions = [("click", "⏩")] * 3 + [("click", "⏪")] * 3
+
+    assert navigate(run, paginator, actions) == [10, 20, 24, 14, 4, 0]
+
+
+def test_jump_to_page(run):
+    paginator = EmbedPaginator(FakeClient(), LONG, jump=True)
+    replies = ["7", "99", "0", "-3", "three", " 2 "]
+
+    shown = navigate(run, paginator, [("reply", r) for r in replies])
+
+    # numbers are clamped to the last page, other replies are ignored
+    assert shown == [6, 24, 24, 24, 24, 1]
+
+
+SEARCHABLE = [
+    discord.Embed(
+        title=f"page {i}",
+        description="A dragon appears." if i in (3, 8, 15) else "Nothing here.",
+    )
+    for i in range(20)
+]
+
+
+def test_repeated_search_goes_to_next_match(run):
+    paginator = EmbedPaginator(FakeClient(), SEARCHABLE, search=True)
+    replies = ["dragon", "Dragon", "DRAGON", "dragon", "nothing", "unicorn"]
+
+    shown = navigate(run, paginator, [("reply", r) for r in replies])
+
+    # wraps around after the last match, a new query starts at the first page
+    assert shown == [3, 8, 15, 3, 0, 0]
+
+
+def test_page_index_matches_word_prefixes():
+    index = PageIndex.from_pages(
+        [
+            discord.Embed(title="Red dragons"),
+            discord.Embed(description="A dragon", color=1).add_field(
+                name="Hoard", value="gold coins"
+            ),
+            discord.Embed(title="Dragonfly"),
+        ]
+    )
+
+    assert index.matches("drag") == [0, 1, 2]
+    assert index.matches("DRAGON") == [0, 1, 2]
+    assert index.matches("dragons") == [0]
+    assert index.matches("ragon") == []  # only the start of a word
+    assert index.matches("dragon gold") == [1]  # all words, also in fields
+    assert index.matches("dragon silver") == []
+    assert index.matches("!!") == []
+    assert index.find("drag", start=1) == 1
+    assert index.find("red", start=1) == 0  # wraps around
+    assert index.find("unicorn") is None
@@ -0,0 +1,128 @@
+import asyncio
+import discord
+from benchmarks.bench_dialogs import settle
+from benchmarks.fake_discord import FakeClient, FakeUser
+from disputils import EmbedPaginator, RateLimitBudget
+from disputils.ratelimit import MESSAGES, REACTIONS, Limit
+
+
+PAGES = [discord.Embed(title=f"page {i}") for i in range(10)]
+
+
+def start(client, channel, user):
+    paginator = EmbedPaginator(client, PAGES)
+    task = asyncio.ensure_future(paginator.run([user], channel, timeout=60))
+    return paginator, task
+
+
+def test_own_seeding_does_not_shed(run):
+    client = FakeClient()
+    budget = RateLimitBudget(client)
+    budget.install()
+    channel, user = client.channel(), FakeUser()
+
+    async def scenario():
+        paginator, task = start(client, channel, user)
+        await settle(client)
+        stored = channel.messages[paginator.message.id]
+        seeded = set(stored.users)
+
+        stored.click(user, "▶")
+        await settle(client)
+        await paginator.cancel()
+        await task
+        return seeded, stored.users["▶"]
+
+    seeded, clicked = run(scenario())
+
+    assert seeded == {"⏮", "◀", "▶", "⏭", "⏹"}
+    assert clicked == {client.user.id}  # the click was removed
+    assert not budget.sheds
+
+
+def test_remove_reaction_is_shed(run):
+    client = FakeClient()
+    budget = RateLimitBudget(client)
+    budget.install()
+    channel, user = client.channel(), FakeUser()
+
+    async def scenario():
+        paginator, task = start(client, channel, user)
+        await settle(client)
+        stored = channel.messages[paginator.message.id]
+
+        for _ in range(3):  # other dialogs in the channel
+            budget.spend(REACTIONS, channel.id)
+
+        stored.click(user, "▶")
+        await settle(client)
+        title = stored.embeds[0].title
+        await paginator.cancel()
+        await task
+        return title, stored.users["▶"]
+
+    title, clicked = run(scenario())
+
+    assert title == "page 1"
+    assert clicked == {client.user.id, user.id}
+    assert budget.sheds == {"remove_reaction": 1}
+
+
+def test_coalesced_edits_are_bounded(run):
+    client = FakeClient()
+    budget = RateLimitBudget(client, coalesce_delay=0.05)
+    budget.install()
+    channel, user = client.channel(), FakeUser()
+
+    async def scenario():
+        paginator, task = start(client, channel, user)
+        await settle(client)
+        stored = channel.messages[paginator.message.id]
+        client.transport.reset()
+
+        budget.exhaust(MESSAGES, channel.id, retry_after=60)
+        for _ in range(4):
+            stored.click(user, "▶")
+            await asyncio.sleep(0)
+            stored.unclick(user, "▶")
+            await asyncio.sleep(0)
+
+        await asyncio.sleep(0.1)
+        await settle(client)
+        title = stored.embeds[0].title
+        await paginator.cancel()
+        await task
+        return title
+
+    assert run(scenario()) == "page 4"
+    assert client.transport.calls["edit"] < 4
+    assert budget.sheds["coalesce"] >= 1
+
+
+def test_seeding_pauses_for_other_dialogs(run):
+    client = FakeClient()
+    budget = RateLimitBudget(client, limits={REACTIONS: Limit(4, 0.2)})
+    budget.install()
+    channel, user = client.channel(), FakeUser()
+
+    async def scenario():
+        for _ in range(4):  # other dialogs in the channel
+            budget.spend(REACTIONS, channel.id)
+
+        paginator, task = start(client, channel, user)
+        await settle(client)
+        stored = channel.messages[paginator.message.id]
+        paused = set(stored.users)
+
+        await asyncio.sleep(0.3)
+        await settle(client)
+        seeded = set(stored.users)
+        await paginator.cancel()
+        await task
+        return paused, seeded
+
+    paused, seeded = run(scenario())
+
+    assert paused == set()
+    assert seeded == {"⏮", "◀", "▶", "⏭", "⏹"}
+    assert budget.sheds["pause_seeding"] >= 1
@@ -0,0 +1,51 @@
+import asyncio
+import discord
+from benchmarks.bench_dialogs import settle
+from benchmarks.fake_discord import FakeClient, FakeUser
+from disputils import EmbedPaginator, ReactionRouter
+
+
+PAGES = [discord.Embed(title=f"page {i}") for i in range(5)]
+
+
+def test_client_events_registered_after_install(run):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+    seen = []
+
+    @client.event
+    async def on_raw_reaction_remove(payload):
+        seen.append(("remove", str(payload.emoji)))
+
+    async def scenario():
+        router = ReactionRouter(client)
+        router.install()
+
+        @client.event
+        async def on_raw_reaction_add(payload):
+            seen.append(("add", str(payload.emoji)))
+
+        paginator = EmbedPaginator(client, PAGES)
+        task = asyncio.ensure_future(paginator.run([user], channel, timeout=60))
+        await settle(client)
+        message = channel.messages[paginator.message.id]
+        seen.clear()  # the control reactions
+
+        for _ in range(2):
+            message.click(user, "▶")
+            await settle(client)  # removed by the paginator
+        title = message.embeds[0].title
+
+        await paginator.cancel()
+        await task
+        router.uninstall()
+        await asyncio.sleep(0)
+        return title, len(router)
+
+    title, routes = run(scenario())
+
+    assert title == "page 2"
+    assert seen == [("add", "▶"), ("remove", "▶")] * 2
+    assert routes == 0
+    taps = client._listeners.get("raw_reaction_add", ())
+    assert all(future.cancelled() for future, _ in taps)  # stopped listening
@@ -0,0 +1,92 @@
+import asyncio
+import discord
+import pytest
+from benchmarks.bench_dialogs import settle
+from benchmarks.fake_discord import FakeChannel, FakeClient, FakeUser
+from disputils import EmbedPaginator, SharedPages
+from disputils.shared import _active, _idle
+
+
+class _Response:
+    status = 403
+    reason = "Forbidden"
+
+
+def pages():
+    """ A freshly built list of the same pages. """
+
+    return [discord.Embed(title=f"shared page {i}") for i in range(3)]
+
+
+def test_paginators_share_and_count_the_pages(run):
+    client = FakeClient()
+    channel = client.channel()
+    first = EmbedPaginator(client, pages(), shared=True)
+    second = EmbedPaginator(client, pages(), shared=True)
+    shared = first._page_set
+
+    async def scenario():
+        tasks = [
+            asyncio.ensure_future(p.run([FakeUser()], channel, timeout=60))
+            for p in (first, second)
+        ]
+        await settle(client)
+        running = shared.refs
+
+        await first.cancel()
+        await tasks[0]
+        after_one = shared.refs
+
+        await second.cancel()
+        await tasks[1]
+        return running, after_one
+
+    assert second._page_set is shared
+    assert run(scenario()) == (2, 1)
+    assert shared.refs == 0
+    assert shared.key not in _active
+    assert _idle[shared.key] is shared
+
+
+def test_pages_are_released_on_error(run, monkeypatch):
+    async def send(self, content=None, *, embed=None):
+        raise discord.Forbidden(_Response(), "missing permissions")
+
+    monkeypatch.setattr(FakeChannel, "send", send)
+    client = FakeClient()
+    paginator = EmbedPaginator(client, pages(), shared=True)
+
+    with pytest.raises(discord.Forbidden):
+        run(paginator.run([FakeUser()], client.channel(), timeout=60))
+
+    assert paginator._page_set.refs == 0
+    assert paginator._page_set.key not in _active
+    assert not paginator.running
+
+
+def test_pages_are_released_on_cancellation(run):
+    client = FakeClient(latency=0.05)
+    paginator = EmbedPaginator(client, pages(), shared=True)
+
+    async def scenario():
+        task = asyncio.ensure_future(
+            paginator.run([FakeUser()], client.channel(), timeout=60)
+        )
+        await asyncio.sleep(0.01)  # while the message is sent
+        holding = paginator._page_set.refs
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return holding
+
+    assert run(scenario()) == 1
+    assert paginator._page_set.refs == 0
+    assert paginator._page_set.key not in _active
+
+
+def test_equal_pages_are_shared_while_idle():
+    first = SharedPages.get(pages(), lambda page, index, count: page)
+    second = SharedPages.get(pages(), lambda page, index, count: page)
+
+    assert first is second
+    assert first.refs == 0
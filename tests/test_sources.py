@@ -0,0 +1,357 @@
+import asyncio
+import discord
+import io
+import pytest
+from benchmarks.bench_dialogs import settle
+from benchmarks.fake_discord import FakeClient, FakeUser
+from disputils import (
+    CallablePageSource,
+    EmbedPaginator,
+    IterPageSource,
+    TablePageSource,
+    TextPageSource,
+)
+from disputils.packing import (
+    EMBED_TOTAL_LIMIT,
+    FIELD_ROWS_LIMIT,
+    FIELD_VALUE_LIMIT,
+    FOOTER_RESERVE,
+)
+
+
+LINES = [f"line {i}: " + "x" * (i % 40) for i in range(300)]
+TEXT = "\n".join(LINES)
+CODE = "intro\n```py\n" + "\n".join(f"print({i})" for i in range(400)) + "\n```\nend"
+
+
+async def read_all(source: TextPageSource, backwards: bool = False) -> list:
+    """ Read all pages of a source, forward or, once counted, backwards. """
+
+    pages = []
+    index = 0
+    while True:
+        try:
+            pages.append((await source.get_page(index)).description)
+        except IndexError:
+            break
+        index += 1
+
+    if backwards:
+        pages = [
+            (await source.get_page(i)).description for i in reversed(range(index))
+        ][::-1]
+
+    return pages
+
+
+async def aiter_lines(text: str):
+    for line in text.splitlines(keepends=True):
+        yield line
+
+
+def lines_of(pages: list) -> list:
+    return [line for page in pages for line in page.split("\n")]
+
+
+@pytest.mark.parametrize(
+    "make_source",
+    (
+        lambda text: text,
+        io.StringIO,
+        lambda text: iter(text.splitlines(keepends=True)),
+        aiter_lines,
+    ),
+    ids=("str", "file", "iterator", "async iterator"),
+)
+def test_pages_fit_and_keep_all_lines(run, make_source):
+    pages = run(read_all(TextPageSource(make_source(TEXT), max_size=200)))
+
+    assert len(pages) > 1
+    assert all(len(page) <= 200 for page in pages)
+    assert lines_of(pages) == LINES
+    assert run(TextPageSource(TEXT, max_size=200).get_page_count()) is None
+
+
+def test_page_count_once_read(run):
+    source = TextPageSource(TEXT, max_size=200)
+    pages = run(read_all(source))
+
+    assert run(source.get_page_count()) == len(pages)
+    with pytest.raises(IndexError):
+        run(source.get_page(len(pages)))
+
+
+def test_random_access_backwards_matches_forward_reads(run):
+    forward = run(read_all(TextPageSource(CODE, max_size=120)))
+    backwards = run(read_all(TextPageSource(CODE, max_size=120), backwards=True))
+
+    assert backwards == forward
+
+
+def test_random_access_without_reading_in_order(run):
+    forward = run(read_all(TextPageSource(TEXT, max_size=150)))
+    source = TextPageSource(TEXT, max_size=150)
+
+    for index in (5, 2, len(forward) - 1, 0, 5):
+        assert run(source.get_page(index)).description == forward[index]
+
+
+def test_code_block_fences_stay_balanced(run):
+    pages = run(read_all(TextPageSource(CODE, max_size=120)))
+
+    assert len(pages) > 2
+    for page in pages:
+        assert len(page) <= 120
+        fences = [line for line in page.split("\n") if line.startswith("```")]
+        assert len(fences) % 2 == 0, page
+    assert pages[1].startswith("```py\n")  # reopened with its language
+    assert pages[-1].endswith("end")
+
+
+def test_code_block_option(run):
+    pages = run(read_all(TextPageSource(TEXT, code_block="", max_size=200)))
+
+    assert all(p.startswith("```\n") and p.endswith("\n```") for p in pages)
+    assert all(len(p) <= 200 for p in pages)
+
+
+def test_long_lines_are_split(run):
+    pages = run(read_all(TextPageSource("y" * 1000, max_size=100)))
+
+    assert all(len(page) <= 100 for page in pages)
+    assert "".join(pages) == "y" * 1000
+
+
+def test_input_is_left_unmodified(run):
+    lines = [line + "\n" for line in LINES]
+    copy = list(lines)
+
+    run(read_all(TextPageSource(lines, max_size=200)))
+
+    assert lines == copy
+
+
+def test_one_page_for_empty_input(run):
+    source = TextPageSource("", title="Log")
+
+    assert run(read_all(source)) == [""]
+    assert run(source.get_page_count()) == 1
+    assert run(source.get_page(0)).title == "Log"
+
+
+@pytest.mark.parametrize("style", ("table", "fields"))
+def test_table_pages_fit_embed_limits(run, style):
+    rows = [[f"{r}:" + "x" * 197] * 10 for r in range(30)]
+    source = TablePageSource(rows, range(10), style=style, title="T" * 300)
+
+    for index in range(run(source.get_page_count())):
+        page = run(source.get_page(index))
+        size = len(page.title) + len(page.description or "")
+        size += sum(len(f.name) + len(f.value) for f in page.fields)
+        assert size <= EMBED_TOTAL_LIMIT - FOOTER_RESERVE
+        assert all(len(f.value) <= FIELD_VALUE_LIMIT for f in page.fields)
+
+
+def test_table_fields_per_page_is_limited():
+    TablePageSource([], range(3), per_page=FIELD_ROWS_LIMIT, style="fields")
+    TablePageSource([], range(3), per_page=FIELD_ROWS_LIMIT + 1, style="table")
+
+    with pytest.raises(ValueError):
+        TablePageSource([], range(3), per_page=FIELD_ROWS_LIMIT + 1, style="fields")
+
+
+def test_paginator_keeps_cache_size_pages(run):
+    built = []
+
+    async def get_page(index):
+        built.append(index)
+        return discord.Embed(title=f"page {index}")
+
+    paginator = EmbedPaginator(
+        FakeClient(), CallablePageSource(get_page, 10), cache_size=2
+    )
+
+    async def scenario():
+        for index in (0, 1, 0, 2, 0, 1):
+            assert (await paginator.get_page(index)).title == f"page {index}"
+
+    run(scenario())
+
+    assert built == [0, 1, 2, 1]  # page 1 was evicted by page 2, page 0 was used
+    assert list(paginator._window) == [0, 1]
+
+
+def test_prefetch_is_cancelled_when_paginator_ends(run):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+    building, cancelled = set(), set()
+
+    async def get_page(index):
+        if index > 0:  # pages being prefetched never finish
+            building.add(index)
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                cancelled.add(index)
+                raise
+        return discord.Embed(title=f"page {index}")
+
+    paginator = EmbedPaginator(client, CallablePageSource(get_page, 10))
+
+    async def scenario():
+        task = asyncio.ensure_future(paginator.run([user], channel, timeout=60))
+        await settle(client)
+        assert building == {1, 9}  # the next and the last page
+        await paginator.cancel()
+        await task
+        await asyncio.sleep(0)
+
+    run(scenario())
+
+    assert cancelled == {1, 9}
+
+
+@pytest.mark.parametrize("lazy", (False, True), ids=("iterable", "async iterable"))
+def test_first_and_last_page_of_unknown_length(run, lazy):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+    taken = []
+
+    def pages():
+        for i in range(6):
+            taken.append(i)
+            yield discord.Embed(title=f"page {i}")
+
+    async def async_pages():
+        for page in pages():
+            yield page
+
+    source = IterPageSource(async_pages() if lazy else pages())
+    paginator = EmbedPaginator(client, source)
+
+    async def scenario():
+        task = asyncio.ensure_future(paginator.run([user], channel, timeout=60))
+        await settle(client)
+        message = channel.messages[paginator.message.id]
+        footer = message.embeds[0].footer.text
+        shown = []
+        for emoji in ("⏭", "⏮", "⏭"):
+            message.click(user, emoji)
+            await settle(client)
+            shown.append(message.embeds[0].title)
+        footer_at_end = message.embeds[0].footer.text
+        await paginator.cancel()
+        await task
+        return footer, shown, footer_at_end
+
+    footer, shown, footer_at_end = run(scenario())
+
+    assert footer == "(1/?)"
+    assert shown == ["page 5", "page 0", "page 5"]
+    assert footer_at_end == "(6/6)"
+    assert taken == list(range(6))  # every page was taken once
+
+
+def dashboard(page_count: int = 3):
+    """ A source whose pages show ``version``, counting the fetches of each page. """
+
+    fetches = {}
+    version = {"value": 0}
+
+    async def get_page(index):
+        fetches[index] = fetches.get(index, 0) + 1
+        return discord.Embed(title=f"page {index} v{version['value']}")
+
+    return CallablePageSource(get_page, page_count), fetches, version
+
+
+def test_refresh_fetches_once_for_all_viewers(run):
+    client = FakeClient()
+    channel = client.channel()
+    source, fetches, _ = dashboard()
+    paginators = [
+        EmbedPaginator(client, source, refresh_interval=0.05) for _ in range(3)
+    ]
+
+    async def scenario():
+        tasks = [
+            asyncio.ensure_future(p.run([FakeUser()], channel, timeout=60))
+            for p in paginators
+        ]
+        await settle(client)
+        fetches.clear()
+        await asyncio.sleep(0.23)  # 4 intervals
+        for paginator in paginators:
+            await paginator.cancel()
+        await asyncio.gather(*tasks)
+
+    run(scenario())
+
+    assert 3 <= fetches[0] <= 5  # not once per viewer
+
+
+def test_refresh_edits_only_changed_pages(run):
+    client = FakeClient()
+    channel = client.channel()
+    source, _, version = dashboard()
+    paginator = EmbedPaginator(client, source, refresh_interval=0.05)
+
+    async def scenario():
+        task = asyncio.ensure_future(paginator.run([FakeUser()], channel, timeout=60))
+        await settle(client)
+        stored = channel.messages[paginator.message.id]
+        client.transport.reset()
+
+        await asyncio.sleep(0.12)
+        unchanged = client.transport.calls["edit"]
+
+        version["value"] = 1
+        await asyncio.sleep(0.12)
+        await settle(client)
+        title = stored.embeds[0].title
+        await paginator.cancel()
+        await task
+        return unchanged, title
+
+    unchanged, title = run(scenario())
+
+    assert unchanged == 0
+    assert title == "page 0 v1"
+    assert client.transport.calls["edit"] == 1
+
+
+@pytest.mark.parametrize("streamed", (False, True))
+def test_single_page_is_refreshed(run, streamed):
+    client = FakeClient()
+    channel = client.channel()
+    source, _, version = dashboard(None if streamed else 1)
+    if streamed:
+        get_page = source.get_page
+
+        async def only_first(index):  # a streamed source with just one page
+            if index > 0:
+                raise IndexError(index)
+            return await get_page(index)
+
+        source.get_page = only_first
+
+    paginator = EmbedPaginator(client, source, refresh_interval=0.05)
+
+    async def scenario():
+        task = asyncio.ensure_future(paginator.run([FakeUser()], channel, timeout=60))
+        await settle(client)
+        stored = channel.messages[paginator.message.id]
+
+        version["value"] = 1
+        await asyncio.sleep(0.12)
+        await settle(client)
+        running, title = paginator.running, stored.embeds[0].title
+        await paginator.cancel()
+        await task
+        return running, title, stored.users
+
+    running, title, reactions = run(scenario())
+
+    assert running
+    assert title == "page 0 v1"
+    assert not any(reactions.values())  # no navigation controls
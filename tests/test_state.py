@@ -0,0 +1,207 @@
+import asyncio
+import discord
+import pytest
+import time
+from benchmarks.bench_dialogs import settle
+from benchmarks.fake_discord import FakeClient, FakeUser
+from disputils import (
+    DialogState,
+    EmbedPaginator,
+    MemoryStateStore,
+    SQLiteStateStore,
+    StateStore,
+)
+
+
+PAGES = [discord.Embed(title=f"page {i}") for i in range(5)]
+
+
+async def page_saved(store, message_id: int, page_index: int):
+    """ Wait until a page index has been saved, in the background. """
+
+    for _ in range(100):
+        state = await store.load(message_id)
+        if state is not None and state.page_index == page_index:
+            return
+        await asyncio.sleep(0.01)
+
+    raise AssertionError(f"page {page_index} hasn't been saved")
+
+
+@pytest.fixture(params=("memory", "sqlite"))
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryStateStore()
+    else:
+        store = SQLiteStateStore(str(tmp_path / "dialogs.db"))
+        yield store
+        store.close()
+
+
+def test_save_load_round_trip(run, store):
+    state = DialogState(1, 2, 3, (4, 5), "help", "text", 123.5)
+    other = DialogState(6, 7)
+
+    run(store.save(state))
+    run(store.save(other))
+
+    assert run(store.load(1)) == state
+    assert run(store.load(6)) == DialogState(6, 7, 0, (), None, None, None)
+    assert run(store.load(8)) is None
+    assert sorted(run(store.all())) == sorted([state, run(store.load(6))])
+
+
+def test_save_replaces_and_delete_removes(run, store):
+    run(store.save(DialogState(1, 2, 3)))
+    run(store.save(DialogState(1, 2, 4)))
+    assert run(store.load(1)).page_index == 4
+
+    run(store.delete(1))
+    run(store.delete(1))  # deleting twice is fine
+    assert run(store.load(1)) is None
+    assert run(store.all()) == []
+
+
+def test_sqlite_states_survive_reopening(run, tmp_path):
+    path = str(tmp_path / "dialogs.db")
+    state = DialogState(1, 2, 3, (4,), "help", None, None)
+
+    store = SQLiteStateStore(path)
+    run(store.save(state))
+    store.close()
+
+    store = SQLiteStateStore(path)
+    try:
+        assert run(store.load(1)) == state
+    finally:
+        store.close()
+
+
+def test_reattach_all_continues_paginators(run, store):
+    client = FakeClient()
+    channel, user = client.channel(), FakeUser()
+
+    async def scenario():
+        paginator = EmbedPaginator(client, PAGES, state_store=store, source_ref="pages")
+        task = asyncio.ensure_future(paginator.run([user], channel, timeout=60))
+        await settle(client)
+        message = channel.messages[paginator.message.id]
+        message.click(user, "▶")
+        await page_saved(store, message.id, 1)
+
+        task.cancel()  # the process stopped
+        await asyncio.gather(task, return_exceptions=True)
+        client.transport.reset()
+
+        expired = DialogState(1, channel.id, 0, (), "pages", None, time.time() - 1)
+        await store.save(expired)
+
+        tasks = await EmbedPaginator.reattach_all(
+            client, store, {"pages": PAGES}.get, timeout=60
+        )
+        await settle(client)
+        message.click(user, "▶")
+        await page_saved(store, message.id, 2)
+        await settle(client)
+
+        state = await store.load(message.id)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return len(tasks), message, state, client.transport.calls
+
+    count, message, state, calls = run(scenario())
+
+    assert count == 1
+    assert message.embeds[0].title == "page 2"
+    assert state.page_index == 2
+    assert "send" not in calls and "add_reaction" not in calls
+    assert run(store.load(1)) is None  # the expired state has been removed
+
+
+class PlainStore(StateStore):
+    """ A store without leases. """
+
+    def __init__(self):
+        self.states = {}
+
+    async def save(self, state):
+        self.states[state.message_id] = state
+
+    async def load(self, message_id):
+        return self.states.get(message_id)
+
+    async def delete(self, message_id):
+        self.states.pop(message_id, None)
+
+    async def all(self):
+        return list(self.states.values())
+
+
+def test_claim_renew_release(run, store):
+    assert run(store.claim(1, "a", 30))
+    assert run(store.claim(1, "a", 30))  # claiming again extends the lease
+    assert not run(store.claim(1, "b", 30))
+    assert run(store.lease(1)).owner == "a"
+    assert run(store.lease(2)) is None
+
+    assert run(store.renew(1, "a", 60))
+    assert run(store.lease(1)).expires_at > time.time() + 30
+    assert not run(store.renew(1, "b", 60))
+    assert not run(store.renew(2, "a", 60))
+
+    run(store.release(1, "b"))  # only the owner can release its lease
+    assert run(store.lease(1)).owner == "a"
+    run(store.release(1, "a"))
+    assert run(store.lease(1)) is None
+    assert not run(store.renew(1, "a", 60))
+    assert run(store.claim(1, "b", 30))
+
+
+def test_expired_lease_can_be_claimed(run, store):
+    assert run(store.claim(1, "a", 0))
+
+    assert run(store.lease(1)) is None
+    assert run(store.claim(1, "b", 30))
+    assert not run(store.renew(1, "a", 30))  # taken over meanwhile
+    assert run(store.lease(1)).owner == "b"
+
+
+def test_sqlite_connections_compete_for_leases(run, tmp_path):
+    path = str(tmp_path / "dialogs.db")
+    stores = [SQLiteStateStore(path), SQLiteStateStore(path)]
+
+    async def compete():
+        claims = [
+            store.claim(message_id, f"bot-{i}", 30)
+            for message_id in range(20)
+            for i, store in enumerate(stores)
+        ]
+        return await asyncio.gather(*claims)
+
+    try:
+        claimed = run(compete())
+        leases = [run(stores[1].lease(message_id)) for message_id in range(20)]
+    finally:
+        for store in stores:
+            store.close()
+
+    for message_id, lease in enumerate(leases):
+        first, second = claimed[2 * message_id : 2 * message_id + 2]
+        assert first != second  # exactly one process got the dialog
+        assert lease.owner == ("bot-0" if first else "bot-1")
+
+
+def test_owner_needs_a_leasing_store(run):
+    client = FakeClient()
+    channel = client.channel()
+
+    with pytest.raises(TypeError):
+        EmbedPaginator(client, PAGES, state_store=PlainStore(), owner="bot-1")
+    with pytest.raises(TypeError):
+        EmbedPaginator(client, PAGES, owner="bot-1")
+    with pytest.raises(TypeError):
+        run(EmbedPaginator.reattach_all(client, PlainStore(), {}.get, owner="bot-1"))
+
+    assert channel.messages == {}
+    assert client.transport.calls == {}